@@ -0,0 +1,126 @@
+"""
+Asyncio evaluation engine: many model lookups in flight on a single event loop.
+
+Selected with ``--async``. Produces the same records as main.process_model and
+reports each outcome through the same callback contract as the threaded path.
+Requires the optional aiohttp dependency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, cast
+
+from .endpoints import aprobe_endpoints, served_scope
+from .http_client import open_async_session
+from .incremental import get_previous
+from .metrics.hf_api_async import abuild_context_from_api
+from .pipeline import OutcomeHandler
+from .report import extract_model_name
+from .retry import model_scope
+from .scoring import compute_all_scores
+from .stages import arun_in
+
+_END = object()
+
+
+async def aprocess_model(
+    session: Any, url: str, model_info: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    # May raise ModelLookupError
+    await aprobe_endpoints()
+    previous = get_previous()
+    with model_scope() as retries, served_scope() as served:
+        if previous is not None:
+            reused = await previous.aunchanged(session, url, model_info)
+            if reused is not None:
+                return {**reused, "endpoint": ",".join(served), "retry_stats": retries.as_record()}
+        ctx = await abuild_context_from_api(session, url, model_info=model_info)
+    fields = await arun_in("cpu", compute_all_scores, ctx)
+    model_name = extract_model_name(url)
+    return {
+        "name": model_name,
+        "category": "MODEL",
+        **fields,
+        "sha": ctx.get("sha", ""),
+        "endpoint": ",".join(served),
+        "retry_stats": retries.as_record(),
+    }
+
+
+async def evaluate_models(
+    urls: Iterable[Optional[str]],
+    on_outcome: OutcomeHandler,
+    concurrency: int = 256,
+    session_factory: Callable[[int], Any] = open_async_session,
+    model_infos: Optional[Dict[str, Dict[str, Any]]] = None,
+    blocking_source: bool = False,
+) -> None:
+    """Evaluate ``urls`` with at most ``concurrency`` models in flight.
+
+    ``urls`` is pulled only as a slot frees up, so it may be an unbounded
+    stream; a None from it is a stall (pipeline.py) and waits for an outcome.
+    Outcomes are delivered in completion order; returning False from
+    ``on_outcome`` cancels everything still pending. ``model_infos`` maps a URL
+    to already-known info metadata (listing mode), skipping its info call;
+    entries are consumed as their model starts. With ``blocking_source``
+    (``urls`` makes requests, like the HF listing) each pull runs on the hf
+    stage, so in-flight models keep going while a page loads.
+    """
+    infos = model_infos if model_infos is not None else {}
+    limit = max(1, concurrency)
+    stream = iter(urls)
+
+    async with session_factory(limit) as session:
+
+        async def _one(u: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[BaseException]]:
+            try:
+                return u, await aprocess_model(session, u, infos.pop(u, None)), None
+            except Exception as e:
+                return u, None, e
+
+        pending: Set["asyncio.Future[Any]"] = set()
+        try:
+            keep_going = True
+            while keep_going:
+                while len(pending) < limit:
+                    if blocking_source:
+                        nxt = await arun_in("hf", next, stream, _END)
+                    else:
+                        nxt = next(stream, _END)
+                    if nxt is _END or (nxt is None and pending):
+                        break
+                    if nxt is None:
+                        raise RuntimeError("pipeline stalled with no model in flight")
+                    pending.add(asyncio.ensure_future(_one(cast(str, nxt))))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    u, rec, exc = fut.result()
+                    if not on_outcome(u, rec, exc):
+                        keep_going = False
+                        break
+        finally:
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def run_models_async(
+    urls: Iterable[Optional[str]],
+    on_outcome: OutcomeHandler,
+    concurrency: int,
+    model_infos: Optional[Dict[str, Dict[str, Any]]] = None,
+    blocking_source: bool = False,
+) -> None:
+    """Blocking entry point used by the CLI."""
+    asyncio.run(
+        evaluate_models(
+            urls,
+            on_outcome,
+            concurrency=concurrency,
+            model_infos=model_infos,
+            blocking_source=blocking_source,
+        )
+    )
@@ -0,0 +1,350 @@
+"""
+Where Hugging Face requests are sent: one endpoint, or several mirrors with
+health/latency probing and failover.
+
+Model URLs always name huggingface.co; the API and raw-file requests they turn
+into go to hf_endpoint() instead, so a mirror or the bundled mock server
+(``python -m acmecli.mock_hf``) can stand in for the Hub.
+
+With several endpoints (comma-separated), each one is probed once
+(``GET /api/models?limit=1``) before first use. Requests go to the fastest
+healthy one; its latency estimate then follows real traffic. Requests made
+while the probe runs wait for it. A request that fails with a network error or
+5xx (after retries) is re-sent to the next healthy endpoint; a connection error
+is not retried on the same mirror while another one can take the request.
+One failed request doesn't take a mirror out: once ACME_HF_FAIL_THRESHOLD
+requests have failed on it within ACME_HF_FAIL_WINDOW_S, it is skipped until it
+passes a re-probe (a failed probe takes it out at once).
+Each model's record names the endpoint(s) that served it (served_scope), or
+"cache"/"replay" for responses read from the HTTP cache or a replay tape.
+
+Env:
+- ACME_HF_ENDPOINT: base URL(s) of the Hugging Face server, comma-separated
+  (default https://huggingface.co); --hf-endpoint overrides it
+- ACME_HF_PROBE_TIMEOUT_S: probe timeout (default 3)
+- ACME_HF_PROBE_INTERVAL_S: seconds before a failed endpoint is probed again (default 30)
+- ACME_HF_FAIL_THRESHOLD: failed requests that mark an endpoint down (default 3)
+- ACME_HF_FAIL_WINDOW_S: window those failures are counted over (default 60)
+"""
+
+from __future__ import annotations
+
+import concurrent.futures as cf
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+from urllib.parse import urlsplit
+
+from .env import env_float
+from .stages import arun_in
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_HF_ENDPOINT = "https://huggingface.co"
+
+# Weight of the newest sample in an endpoint's latency estimate
+_EWMA_ALPHA = 0.2
+
+
+class Endpoint:
+    """One base URL with its health and smoothed latency."""
+
+    def __init__(self, base: str) -> None:
+        self.base = base
+        self.healthy = True
+        self.latency_ms: Optional[float] = None
+        self.retry_at = 0.0  # monotonic time after which a failed endpoint is re-probed
+        self.failures: Deque[float] = deque()  # monotonic times of recent failed requests
+
+    @property
+    def host(self) -> str:
+        return (urlsplit(self.base).hostname or "").lower()
+
+
+class EndpointPool:
+    """Endpoints in configured order; picks the fastest healthy one."""
+
+    def __init__(self, bases: List[str]) -> None:
+        self.endpoints = [Endpoint(b) for b in bases]
+        self.probed = len(self.endpoints) < 2  # a single endpoint is never probed
+        self._probing = False
+        self._probe_done = threading.Event()
+        self._lock = threading.Lock()
+
+    def best(self) -> Endpoint:
+        if not self.probed:
+            self.probe_all()
+        self._reprobe_due()
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy] or self.endpoints
+            # Unmeasured endpoints sort by configured order after measured ones
+            return min(healthy, key=lambda e: (e.latency_ms is None, e.latency_ms or 0.0))
+
+    def owner(self, url: str) -> Optional[Endpoint]:
+        """The endpoint ``url`` was built from, if any."""
+        return next((e for e in self.endpoints if url.startswith(e.base + "/")), None)
+
+    def alternative(self, tried: List[Endpoint]) -> Optional[Endpoint]:
+        """Next endpoint to fail over to (healthy, untried, fastest first)."""
+        with self._lock:
+            options = [e for e in self.endpoints if e.healthy and e not in tried]
+        options.sort(key=lambda e: (e.latency_ms is None, e.latency_ms or 0.0))
+        return options[0] if options else None
+
+    def observe(self, ep: Endpoint, ms: float) -> None:
+        with self._lock:
+            ep.healthy = True
+            prev = ep.latency_ms
+            ep.latency_ms = ms if prev is None else (1 - _EWMA_ALPHA) * prev + _EWMA_ALPHA * ms
+
+    def fail(self, ep: Endpoint, why: str) -> None:
+        """Count a request that failed on ``ep``; mark it down once failures repeat."""
+        if len(self.endpoints) < 2:
+            return
+        threshold = max(1, int(env_float("ACME_HF_FAIL_THRESHOLD", 3)))
+        window = env_float("ACME_HF_FAIL_WINDOW_S", 60)
+        now = time.monotonic()
+        with self._lock:
+            ep.failures.append(now)
+            while ep.failures and ep.failures[0] < now - window:
+                ep.failures.popleft()
+            down = len(ep.failures) >= threshold
+            if down:
+                ep.failures.clear()
+        if down:
+            self.mark_down(ep, f"{why}; {threshold} failed requests in {window:g}s")
+        else:
+            logger.info(f"HF endpoint {ep.base}: request failed ({why})")
+
+    def mark_down(self, ep: Endpoint, why: str) -> None:
+        if len(self.endpoints) < 2:
+            return
+        with self._lock:
+            was_healthy, ep.healthy = ep.healthy, False
+            ep.retry_at = time.monotonic() + env_float("ACME_HF_PROBE_INTERVAL_S", 30)
+        if was_healthy:
+            logger.warning(f"HF endpoint {ep.base} marked down ({why}); failing over")
+
+    def probe(self, ep: Endpoint) -> None:
+        """One health/latency probe; a network error or 5xx marks ``ep`` down."""
+        from .http_client import get_session
+
+        timeout = env_float("ACME_HF_PROBE_TIMEOUT_S", 3)
+        t0 = time.perf_counter()
+        try:
+            r = get_session().get(f"{ep.base}/api/models?limit=1", timeout=timeout)
+            ok, why = r.status_code < 500, f"HTTP {r.status_code}"
+        except Exception as e:
+            ok, why = False, type(e).__name__
+        if ok:
+            self.observe(ep, (time.perf_counter() - t0) * 1000)
+        else:
+            self.mark_down(ep, f"probe failed: {why}")
+
+    def probe_all(self) -> None:
+        from .replay import get_tape
+
+        with self._lock:
+            if self.probed:
+                return
+            first, self._probing = not self._probing, True
+        if not first:
+            self._probe_done.wait()  # choose among measured endpoints, not configured order
+            return
+        try:
+            if get_tape() is None:  # record/replay runs keep the configured order
+                with cf.ThreadPoolExecutor(max_workers=len(self.endpoints)) as ex:
+                    list(ex.map(self.probe, self.endpoints))
+                logger.info(f"HF endpoints probed: {self.summary()}")
+        finally:
+            with self._lock:
+                self.probed = True
+            self._probe_done.set()
+
+    def _reprobe_due(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            due = [e for e in self.endpoints if not e.healthy and e.retry_at <= now]
+            for e in due:
+                e.retry_at = now + env_float("ACME_HF_PROBE_INTERVAL_S", 30)
+        for e in due:
+            threading.Thread(target=self.probe, args=(e,), daemon=True).start()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                e.base: {"healthy": e.healthy, "latency_ms": round(e.latency_ms or 0.0, 1)}
+                for e in self.endpoints
+            }
+
+
+_override: Optional[str] = None
+_pool: Optional[EndpointPool] = None
+_pool_spec = ""
+_pool_lock = threading.Lock()
+_served: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "acme_served_endpoints", default=None
+)
+
+
+def configure_hf_endpoint(url: Optional[str]) -> None:
+    """Send HF requests to ``url`` (comma-separated mirrors allowed; None = env/Hub)."""
+    global _override
+    _override = url or None
+
+
+def get_pool() -> EndpointPool:
+    """Pool for the current configuration (rebuilt when it changes)."""
+    global _pool, _pool_spec
+    spec = _override or os.getenv("ACME_HF_ENDPOINT") or DEFAULT_HF_ENDPOINT
+    with _pool_lock:
+        if _pool is None or spec != _pool_spec:
+            bases = [b.strip().rstrip("/") for b in spec.split(",") if b.strip()]
+            _pool, _pool_spec = EndpointPool(bases or [DEFAULT_HF_ENDPOINT]), spec
+        return _pool
+
+
+def hf_endpoint() -> str:
+    """Base URL for HF API and raw-file requests, without a trailing slash."""
+    return get_pool().best().base
+
+
+async def aprobe_endpoints() -> None:
+    """Run the first-use probe on the hf stage, so its blocking requests stay off the loop."""
+    pool = get_pool()
+    if not pool.probed:
+        await arun_in("hf", pool.probe_all)
+
+
+def can_fail_over(url: str) -> bool:
+    """True if ``url`` goes to a configured endpoint and another healthy one exists."""
+    pool = get_pool()
+    ep = pool.owner(url)
+    return ep is not None and pool.alternative([ep]) is not None
+
+
+def hf_hosts() -> FrozenSet[str]:
+    """Host names of every configured endpoint (lower-case)."""
+    return frozenset(e.host for e in get_pool().endpoints)
+
+
+def canonical_url(url: str) -> str:
+    """``url`` with a configured endpoint's base replaced by the Hub's."""
+    ep = get_pool().owner(url)
+    return url if ep is None else DEFAULT_HF_ENDPOINT + url[len(ep.base) :]
+
+
+@contextmanager
+def served_scope() -> Iterator[List[str]]:
+    """Collect, in first-use order, the endpoints that answer requests in this scope."""
+    served: List[str] = []
+    token = _served.set(served)
+    try:
+        yield served
+    finally:
+        _served.reset(token)
+
+
+def note_origin(origin: str) -> None:
+    """Note what answered a request in this served_scope (a base URL, "cache", "replay")."""
+    served = _served.get()
+    if served is not None and origin not in served:
+        served.append(origin)
+
+
+def _note_served(ep: Endpoint) -> None:
+    note_origin(ep.base)
+
+
+def with_failover(
+    url: str,
+    send: Callable[[str], T],
+    status_of: Callable[[T], int],
+    elapsed_ms: Callable[[T], float],
+    errors: Any,
+) -> T:
+    """Run ``send(url)``; on ``errors`` or a 5xx, re-send to the next healthy endpoint."""
+    pool = get_pool()
+    ep = pool.owner(url)
+    tried: List[Endpoint] = []
+    while True:
+        try:
+            result = send(url)
+        except errors as e:
+            if ep is None:
+                raise
+            nxt = _fail(pool, ep, tried, type(e).__name__)
+            if nxt is None:
+                raise
+        else:
+            if ep is None:
+                return result
+            status = status_of(result)
+            if status < 500:
+                pool.observe(ep, elapsed_ms(result))
+                _note_served(ep)
+                return result
+            nxt = _fail(pool, ep, tried, f"HTTP {status}")
+            if nxt is None:
+                _note_served(ep)
+                return result
+        url, ep = nxt.base + url[len(ep.base) :], nxt
+
+
+async def awith_failover(
+    url: str,
+    send: Callable[[str], Awaitable[T]],
+    status_of: Callable[[T], int],
+    elapsed_ms: Callable[[T], float],
+    errors: Any,
+) -> T:
+    """Event-loop version of with_failover."""
+    pool = get_pool()
+    ep = pool.owner(url)
+    tried: List[Endpoint] = []
+    while True:
+        try:
+            result = await send(url)
+        except errors as e:
+            if ep is None:
+                raise
+            nxt = _fail(pool, ep, tried, type(e).__name__)
+            if nxt is None:
+                raise
+        else:
+            if ep is None:
+                return result
+            status = status_of(result)
+            if status < 500:
+                pool.observe(ep, elapsed_ms(result))
+                _note_served(ep)
+                return result
+            nxt = _fail(pool, ep, tried, f"HTTP {status}")
+            if nxt is None:
+                _note_served(ep)
+                return result
+        url, ep = nxt.base + url[len(ep.base) :], nxt
+
+
+def _fail(pool: EndpointPool, ep: Endpoint, tried: List[Endpoint], why: str) -> Optional[Endpoint]:
+    tried.append(ep)
+    pool.fail(ep, why)
+    return pool.alternative(tried)
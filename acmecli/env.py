@@ -0,0 +1,24 @@
+"""
+Numeric settings read from the environment.
+
+A variable that is unset or doesn't parse falls back to the default, so a typo
+in an ACME_* setting never stops a run.
+"""
+
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
@@ -0,0 +1,225 @@
+"""
+Hedged GETs: when a request to an endpoint is slower than that endpoint's
+observed p95, send a duplicate and keep whichever answers first.
+
+Latencies are tracked per endpoint kind ("info", "tree", "readme") over a
+sliding window, whatever cache class ("pinned") the request has; hedging starts
+once enough samples exist. Hedges are capped at a fraction of requests so a
+slow server doesn't get twice the load.
+The thread path cannot abort the losing request: its response is closed once
+it arrives, returning the connection to the pool. The asyncio path cancels it.
+The thread path's hedge pool is sized from the hf stage (two sends per hf
+worker), so hedging never caps HF concurrency below --hf-workers.
+
+Env:
+- ACME_HEDGE: enable hedging (default off)
+- ACME_HEDGE_QUANTILE: latency quantile that triggers a hedge (default 0.95)
+- ACME_HEDGE_MAX_RATE: max hedges per request sent (default 0.05)
+- ACME_HEDGE_MIN_SAMPLES: samples needed before an endpoint is hedged (default 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures as cf
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from .env import env_float
+from .stages import get_stage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Endpoint kinds worth hedging (the HF fetches in metrics.hf_api)
+HEDGED_KINDS = frozenset({"info", "tree", "readme"})
+
+_WINDOW = 200
+_MIN_DELAY_S = 0.05
+
+
+def hedging_enabled(kind: Optional[str]) -> bool:
+    flag = (os.getenv("ACME_HEDGE") or "").strip().lower()
+    return kind in HEDGED_KINDS and flag in {"1", "true", "yes", "on"}
+
+
+class Hedger:
+    """Per-endpoint latency windows plus the run-wide hedge-rate cap."""
+
+    def __init__(self, quantile: float, max_rate: float, min_samples: int) -> None:
+        self.quantile = min(0.999, max(0.5, quantile))
+        self.max_rate = max(0.0, max_rate)
+        self.min_samples = max(1, min_samples)
+        self.samples: Dict[str, Deque[float]] = {}
+        self.stats: Dict[str, int] = {"requests": 0, "hedged": 0, "hedge_won": 0}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(kind, deque(maxlen=_WINDOW)).append(seconds)
+
+    def delay(self, kind: str) -> Optional[float]:
+        """Seconds to wait before hedging ``kind``; None while samples are too few."""
+        with self._lock:
+            window = sorted(self.samples.get(kind, ()))
+        if len(window) < self.min_samples:
+            return None
+        idx = min(len(window) - 1, math.ceil(self.quantile * len(window)) - 1)
+        return max(_MIN_DELAY_S, window[idx])
+
+    def note_request(self) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge if the rate cap allows it."""
+        with self._lock:
+            if self.stats["hedged"] + 1 > self.max_rate * self.stats["requests"]:
+                return False
+            self.stats["hedged"] += 1
+            return True
+
+    def note_win(self) -> None:
+        with self._lock:
+            self.stats["hedge_won"] += 1
+
+
+_hedger: Optional[Hedger] = None
+_hedge_pool: Optional[cf.ThreadPoolExecutor] = None
+_hedge_pool_size = 0
+_state_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    global _hedger
+    with _state_lock:
+        if _hedger is None:
+            _hedger = Hedger(
+                env_float("ACME_HEDGE_QUANTILE", 0.95),
+                env_float("ACME_HEDGE_MAX_RATE", 0.05),
+                int(env_float("ACME_HEDGE_MIN_SAMPLES", 20)),
+            )
+        return _hedger
+
+
+def reset_hedger() -> None:
+    global _hedger
+    with _state_lock:
+        _hedger = None
+
+
+def _get_hedge_pool() -> cf.ThreadPoolExecutor:
+    # Separate from the hf stage pool: hedged calls block on these futures.
+    # Every hf worker may have a primary and a backup send in flight.
+    global _hedge_pool, _hedge_pool_size
+    size = 2 * get_stage("hf").workers
+    with _state_lock:
+        old = None
+        if _hedge_pool is None or _hedge_pool_size != size:
+            old, _hedge_pool_size = _hedge_pool, size
+            _hedge_pool = cf.ThreadPoolExecutor(max_workers=size, thread_name_prefix="hf-hedge")
+        pool = _hedge_pool
+    if old is not None:
+        old.shutdown(wait=False)
+    return pool
+
+
+def _close_when_done(fut: "cf.Future[Any]") -> None:
+    """Close the losing send's response (if it gets one) so its connection is freed."""
+
+    def _close(f: "cf.Future[Any]") -> None:
+        if not f.cancelled() and f.exception() is None:
+            close = getattr(f.result(), "close", None)
+            if callable(close):
+                close()
+
+    fut.add_done_callback(_close)
+
+
+def hedged(kind: str, send: Callable[[], T]) -> T:
+    """Run ``send``; duplicate it past the endpoint's p95 and return the first success."""
+    hedger = get_hedger()
+    hedger.note_request()
+    delay = hedger.delay(kind)
+    if delay is None:
+        t0 = time.perf_counter()
+        result = send()
+        hedger.observe(kind, time.perf_counter() - t0)
+        return result
+
+    pool = _get_hedge_pool()
+    t0 = time.perf_counter()
+    primary = pool.submit(contextvars.copy_context().run, send)
+    done, _ = cf.wait([primary], timeout=delay)
+    if done or not hedger.try_hedge():
+        result = primary.result()
+        hedger.observe(kind, time.perf_counter() - t0)
+        return result
+
+    logger.debug(f"hedging slow {kind} request after {delay * 1000:.0f} ms")
+    backup = pool.submit(contextvars.copy_context().run, send)
+    pending = {primary, backup}
+    first_error: Optional[BaseException] = None
+    while pending:
+        done, pending = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is not None:
+                first_error = first_error or fut.exception()
+                continue
+            hedger.observe(kind, time.perf_counter() - t0)
+            if fut is backup:
+                hedger.note_win()
+            _close_when_done(primary if fut is backup else backup)
+            return fut.result()
+    assert first_error is not None
+    raise first_error
+
+
+async def ahedged(kind: str, send: Callable[[], Awaitable[T]]) -> T:
+    """Event-loop hedged(): the losing request is cancelled."""
+    hedger = get_hedger()
+    hedger.note_request()
+    delay = hedger.delay(kind)
+    t0 = time.perf_counter()
+    if delay is None:
+        result = await send()
+        hedger.observe(kind, time.perf_counter() - t0)
+        return result
+
+    tasks: List["asyncio.Future[T]"] = [asyncio.ensure_future(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not hedger.try_hedge():
+            result = await tasks[0]
+            hedger.observe(kind, time.perf_counter() - t0)
+            return result
+
+        tasks.append(asyncio.ensure_future(send()))
+        pending = set(tasks)
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is not None:
+                    first_error = first_error or fut.exception()
+                    continue
+                hedger.observe(kind, time.perf_counter() - t0)
+                if fut is tasks[1]:
+                    hedger.note_win()
+                return fut.result()
+        assert first_error is not None
+        raise first_error
+    finally:
+        for fut in tasks:
+            fut.cancel()
+
+
+def hedge_summary() -> Dict[str, Any]:
+    return dict(get_hedger().stats)
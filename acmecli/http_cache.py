@@ -0,0 +1,251 @@
+"""
+Persistent on-disk HTTP response cache with ETag / Last-Modified revalidation.
+
+Enabled by --cache-dir or $ACME_CACHE_DIR. Env:
+- ACME_CACHE_TTL_INFO / ACME_CACHE_TTL_TREE / ACME_CACHE_TTL_README: seconds an entry is
+  served without contacting the server (defaults 600 / 3600 / 3600; 0 = always revalidate)
+- ACME_CACHE_TTL_NEGATIVE: seconds a 401/403/404 model lookup is remembered (default 300;
+  0 = off); see hf_api.cached_lookup_error
+- ACME_CACHE_TTL_PINNED: seconds a response addressed by commit sha is served (default
+  unlimited: the content cannot change); also covers hf_api.save_artifact values
+- ACME_CACHE_MAX_MB: size cap; least-recently-used entries are evicted past it (default 512)
+
+Stale entries are revalidated with If-None-Match / If-Modified-Since, so unchanged
+resources cost a 304 with no body. Only 200 responses are stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .endpoints import canonical_url, note_origin
+from .env import env_float
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "info": 600.0,
+    "tree": 3600.0,
+    "readme": 3600.0,
+    "negative": 300.0,
+    # Tree pages and READMEs addressed by commit sha never change
+    "pinned": float("inf"),
+}
+_KEPT_HEADERS = ("ETag", "Last-Modified", "Content-Type", "Link")
+
+
+class HttpCache:
+    """Directory-backed response store with per-endpoint TTLs and LRU size cap."""
+
+    def __init__(self, root: str, max_bytes: int, ttls: Optional[Dict[str, float]] = None) -> None:
+        self.root = root
+        self.max_bytes = max(0, max_bytes)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        # key -> (size bytes, last access time); rebuilt from disk on open
+        self._index: Dict[str, Tuple[int, float]] = {}
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] = self.stats.get(stat, 0) + 1
+
+    # ----- keys and files -----
+
+    @staticmethod
+    def key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Cache key: URL plus a digest of the credential, so tokens never share entries.
+
+        Mirror URLs are keyed as the Hub's, so entries survive a failover. A Range
+        (a bounded read) is part of the key: a prefix never answers a longer read.
+        """
+        auth = (headers or {}).get("Authorization", "")
+        target = f"{canonical_url(url)}\n{auth}"
+        span = (headers or {}).get("Range")
+        if span:
+            target += f"\n{span}"
+        return hashlib.sha256(target.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _scan(self) -> None:
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                self._index[name[:-5]] = (st.st_size, st.st_mtime)
+                self._total += st.st_size
+
+    # ----- entries -----
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def is_fresh(self, entry: Dict[str, Any], kind: str) -> bool:
+        ttl = self.ttls.get(kind, 0.0)
+        return ttl > 0 and (time.time() - float(entry.get("stored_at", 0))) < ttl
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating ``entry``."""
+        h = entry.get("headers", {})
+        out: Dict[str, str] = {}
+        if h.get("ETag"):
+            out["If-None-Match"] = h["ETag"]
+        if h.get("Last-Modified"):
+            out["If-Modified-Since"] = h["Last-Modified"]
+        return out
+
+    def save(self, key: str, url: str, headers: Any, body: str) -> Dict[str, Any]:
+        kept = {k: headers[k] for k in _KEPT_HEADERS if headers.get(k)}
+        entry = {"url": url, "headers": kept, "body": body, "stored_at": time.time()}
+        self._write(key, entry)
+        return entry
+
+    def mark_revalidated(self, key: str, entry: Dict[str, Any]) -> None:
+        """Server confirmed ``entry`` unchanged (304): restart its TTL."""
+        entry["stored_at"] = time.time()
+        self._write(key, entry)
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed for {entry.get('url')}: {e}")
+            return
+        with self._lock:
+            old = self._index.get(key)
+            self._total += len(data) - (old[0] if old else 0)
+            self._index[key] = (len(data), time.time())
+            self._evict_locked()
+
+    def note_access(self, key: str) -> None:
+        """Record a hit for LRU ordering (in memory and via file mtime across runs)."""
+        now = time.time()
+        with self._lock:
+            if key in self._index:
+                self._index[key] = (self._index[key][0], now)
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        if self.max_bytes <= 0 or self._total <= self.max_bytes:
+            return
+        # Trim to 90% of the cap so we don't evict on every subsequent write
+        target = int(self.max_bytes * 0.9)
+        for key, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._total <= target:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._total -= size
+            self.stats["evicted"] = self.stats.get("evicted", 0) + 1
+
+
+def response_from_entry(entry: Dict[str, Any]) -> requests.Response:
+    """Rebuild a 200 requests.Response from a cache entry (no network time)."""
+    r = requests.Response()
+    r.status_code = 200
+    r.reason = "OK"
+    r.url = str(entry.get("url", ""))
+    r.encoding = "utf-8"
+    r._content = str(entry.get("body", "")).encode("utf-8")
+    r.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    r.elapsed = timedelta(0)
+    return r
+
+
+def cached_get(
+    cache: HttpCache,
+    url: str,
+    kind: str,
+    headers: Optional[Dict[str, str]],
+    send: Callable[[Dict[str, str]], requests.Response],
+) -> requests.Response:
+    """Serve ``url`` from ``cache`` when fresh, else revalidate or fetch via ``send``."""
+    key = cache.key(url, headers)
+    entry = cache.load(key)
+    if entry is not None and cache.is_fresh(entry, kind):
+        cache.count("hits")
+        cache.note_access(key)
+        note_origin("cache")
+        return response_from_entry(entry)
+    req_headers = dict(headers or {})
+    if entry is not None:
+        req_headers.update(cache.validators(entry))
+    r = send(req_headers)
+    if r.status_code == 304 and entry is not None:
+        cache.count("revalidated")
+        cache.mark_revalidated(key, entry)
+        resp = response_from_entry(entry)
+        resp.elapsed = r.elapsed
+        return resp
+    cache.count("misses")
+    if r.status_code == 200:
+        cache.save(key, url, r.headers, r.text)
+    return r
+
+
+_cache: Optional[HttpCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def configure_cache(root: Optional[str]) -> Optional[HttpCache]:
+    """Enable the cache under ``root`` (None disables it)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache_configured = True
+        if not root:
+            _cache = None
+            return None
+        ttls = {
+            kind: env_float(f"ACME_CACHE_TTL_{kind.upper()}", default)
+            for kind, default in DEFAULT_TTLS.items()
+        }
+        max_bytes = int(env_float("ACME_CACHE_MAX_MB", 512) * 1024 * 1024)
+        _cache = HttpCache(root, max_bytes, ttls)
+        return _cache
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Active cache; configured lazily from $ACME_CACHE_DIR on first use."""
+    if not _cache_configured:
+        configure_cache(os.getenv("ACME_CACHE_DIR"))
+    return _cache
@@ -0,0 +1,250 @@
+"""
+Shared HTTP transport: one pooled keep-alive session for every outbound call.
+
+Env:
+- ACME_HTTP_POOL_SIZE: keep-alive connections kept per host (default 32)
+- ACME_HTTP_RETRIES: connect-level retries mounted on the shared adapter (default 2)
+
+The asyncio engine uses an aiohttp session instead (optional dependency,
+``pip install 'acmecli[async]'``), opened via open_async_session().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .endpoints import can_fail_over, with_failover
+from .env import env_int
+from .hedge import hedged, hedging_enabled
+from .http_cache import cached_get, get_cache
+from .ratelimit import THROTTLE_STATUSES, get_limiter, parse_retry_after, throttle_retries
+from .replay import replayable
+from .retry import call_with_retries, clamp_timeout
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ACME-CLI/0.1.0"
+
+# Failures worth re-sending an idempotent GET for (see retry.py)
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# Failures that mean the host can't be reached: not retried while a mirror can take over
+CONNECT_ERRORS = (requests.ConnectionError,)
+
+# Number of distinct hosts whose pools are kept alive (HF API, HF raw, GitHub, LLM)
+_POOL_HOSTS = 8
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """Create a session whose adapters keep per-host pools and retry connects."""
+    pool_size = max(1, env_int("ACME_HTTP_POOL_SIZE", 32))
+    retries = max(0, env_int("ACME_HTTP_RETRIES", 2))
+    # Only connection establishment is retried here: it is safe for any method and
+    # never re-sends a request the server may already have processed.
+    retry = Retry(total=None, connect=retries, read=0, status=0, other=0, redirect=10)
+    adapter = HTTPAdapter(
+        pool_connections=_POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry, pool_block=False
+    )
+    s = requests.Session()
+    s.headers["User-Agent"] = USER_AGENT
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    logger.debug(f"HTTP session created (pool_size={pool_size}, connect_retries={retries})")
+    return s
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session (created lazily, thread-safe)."""
+    global _session
+    s = _session
+    if s is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+            s = _session
+    return s
+
+
+def reset_session() -> None:
+    """Close pooled connections; the next call builds a fresh session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def http_get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10,
+    cache_kind: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    hedge_kind: Optional[str] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """GET through the shared pool.
+
+    Transient failures are retried per retry.py (backoff, model deadline, run budget);
+    with $ACME_HEDGE set, slow HF fetches are hedged per hedge.py. Under --record or
+    --replay the final response is taped or read back (replay.py).
+    ``cache_kind`` ("info", "tree", "readme") opts the request into the on-disk
+    response cache when one is configured; ``hedge_kind`` names the latency window
+    it is hedged by (default: ``cache_kind``). ``max_bytes`` asks for a byte range
+    and streams at most that much of the body (see read_bounded).
+    """
+    cache = get_cache() if cache_kind else None
+    hedge_key = hedge_kind or cache_kind
+    if max_bytes is not None:
+        headers = {**(headers or {}), "Range": f"bytes=0-{max(1, max_bytes) - 1}"}
+        kwargs["stream"] = True
+
+    def _once(u: str, h: Optional[Dict[str, str]]) -> requests.Response:
+        def _get() -> requests.Response:
+            r = get_session().get(u, headers=h, timeout=clamp_timeout(timeout), **kwargs)
+            return r if max_bytes is None else read_bounded(r, max_bytes)
+
+        def _limited() -> requests.Response:
+            return rate_limited(u, _get)
+
+        if hedge_key is not None and hedging_enabled(hedge_key):
+            return hedged(hedge_key, _limited)
+        return _limited()
+
+    def _retried(u: str, h: Optional[Dict[str, str]]) -> requests.Response:
+        # An unreachable mirror is left to failover rather than retried
+        fail_fast = CONNECT_ERRORS if can_fail_over(u) else ()
+        return call_with_retries(u, lambda: _once(u, h), _status, RETRYABLE_ERRORS, fail_fast)
+
+    def _send(h: Optional[Dict[str, str]]) -> requests.Response:
+        # Mirrors (endpoints.py): a request that still fails is re-sent elsewhere
+        return with_failover(url, lambda u: _retried(u, h), _status, _elapsed, RETRYABLE_ERRORS)
+
+    def _fetch() -> requests.Response:
+        if cache is None or cache_kind is None:
+            return _send(headers)
+        return cached_get(cache, url, cache_kind, headers, _send)
+
+    return replayable("GET", url, None, _fetch)
+
+
+def read_bounded(r: requests.Response, max_bytes: int) -> requests.Response:
+    """Load at most ``max_bytes`` of a streamed body into ``r``.
+
+    A 206 answer to our Range request is reported as 200 (the body is the prefix we
+    asked for), and 416 (range past the end of an empty file) as an empty 200. When
+    the server ignored the Range and more remains, the connection is dropped rather
+    than drained.
+    """
+    buf = bytearray()
+    truncated = r.status_code == 416
+    if truncated:
+        r.status_code = 200
+    else:
+        for chunk in r.iter_content(chunk_size=16 * 1024):
+            buf += chunk
+            if len(buf) > max_bytes:
+                truncated = True
+                break
+    r._content = bytes(buf[:max_bytes])
+    setattr(r, "_content_consumed", True)  # r.text/r.json() now use the bounded body
+    if truncated:
+        r.close()
+    if r.status_code == 206:
+        r.status_code = 200
+    return r
+
+
+def _status(r: requests.Response) -> int:
+    return r.status_code if isinstance(r.status_code, int) else 0
+
+
+def _elapsed(r: requests.Response) -> float:
+    elapsed = getattr(r, "elapsed", None)
+    return elapsed.total_seconds() * 1000 if isinstance(elapsed, timedelta) else 0.0
+
+
+def rate_limited(url: str, send: Callable[[], requests.Response]) -> requests.Response:
+    """Run ``send`` under the host's shared limiter, waiting out and re-sending on 429/503."""
+    limiter = get_limiter(url)
+    if limiter is None:
+        return send()
+    attempts = throttle_retries() + 1
+    for attempt in range(attempts):
+        limiter.acquire()
+        try:
+            r = send()
+        except requests.RequestException:
+            limiter.release(None)
+            raise
+        throttled = r.status_code in THROTTLE_STATUSES
+        retry_after = parse_retry_after(r.headers.get("Retry-After")) if throttled else None
+        limiter.release(r.status_code, retry_after)
+        if not throttled or attempt == attempts - 1:
+            break
+        logger.info(f"HTTP {r.status_code} from {url}; retrying after backoff")
+    return r
+
+
+def http_post(
+    url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 20, **kwargs: Any
+) -> requests.Response:
+    """POST through the shared pool (recorded/replayed by its JSON body, see replay.py)."""
+    return replayable(
+        "POST",
+        url,
+        kwargs.get("json"),
+        lambda: get_session().post(url, headers=headers, timeout=timeout, **kwargs),
+    )
+
+
+def open_async_session(limit: int) -> Any:
+    """Open an aiohttp session allowing ``limit`` concurrent connections.
+
+    Must be called from a running event loop. Raises RuntimeError when aiohttp
+    is not installed.
+    """
+    try:
+        aiohttp: Any = importlib.import_module("aiohttp")
+    except ImportError as e:
+        raise RuntimeError("asyncio mode requires aiohttp (pip install 'acmecli[async]')") from e
+    connector = aiohttp.TCPConnector(limit=max(1, limit), ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT})
+
+
+def async_network_errors() -> Tuple[Type[BaseException], ...]:
+    """Exception types that mean "network failure" on the asyncio path."""
+    errors: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, OSError)
+    try:
+        aiohttp: Any = importlib.import_module("aiohttp")
+        errors = errors + (aiohttp.ClientError,)
+    except ImportError:
+        pass
+    return errors
+
+
+def async_connect_errors() -> Tuple[Type[BaseException], ...]:
+    """Asyncio counterpart of CONNECT_ERRORS."""
+    errors: Tuple[Type[BaseException], ...] = (ConnectionError,)
+    try:
+        aiohttp: Any = importlib.import_module("aiohttp")
+        errors = errors + (aiohttp.ClientConnectionError,)
+    except ImportError:
+        pass
+    return errors
@@ -0,0 +1,108 @@
+"""
+Incremental re-evaluation (--incremental PREV.jsonl).
+
+A model whose commit sha is the same as in the previous run's output has the
+same files and README, so its previous record is emitted again instead of being
+rebuilt and rescored. The current sha costs one small uncached request
+(fetch_model_sha); it is free when the URL pins a commit or a listing entry
+already carries it. Models that changed, are new, or whose sha can't be told
+are evaluated as usual.
+
+Popularity fields (downloads, likes) in a reused record are as of the run
+that produced it. Fields that describe the earlier run rather than the model
+(RUN_KEYS: shard tags, endpoints, retry counts) are dropped on load; the
+current run fills them in again. The CLI loads the file once with configure_previous();
+process_model and aprocess_model consult get_previous().
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .io_utils import read_ndjson
+from .metrics.hf_api import extract_model_ref, fetch_model_sha, pinned_revision
+from .report import extract_model_name
+from .stages import run_in
+
+logger = logging.getLogger(__name__)
+
+# Record fields set per run (main.process_model, the --shard tag), never reused
+RUN_KEYS = frozenset({"endpoint", "retry_stats", "shard", "seq"})
+
+
+class PreviousRun:
+    """Records of an earlier run, indexed by (record name, commit sha)."""
+
+    def __init__(self, records: Dict[Tuple[str, str], Dict[str, Any]]) -> None:
+        self.records = records
+        self.reused = 0
+        self.checked = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "PreviousRun":
+        records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for rec in read_ndjson(path):
+            name, sha = rec.get("name"), rec.get("sha")
+            if isinstance(name, str) and isinstance(sha, str) and sha:
+                records[(name, sha)] = {k: v for k, v in rec.items() if k not in RUN_KEYS}
+        logger.info(f"incremental: {len(records)} previous records with a sha in {path}")
+        return cls(records)
+
+    def lookup(self, url: str, sha: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The previous record for ``url`` if it was computed at commit ``sha``."""
+        rec = self.records.get((extract_model_name(url), sha)) if sha else None
+        with self._lock:
+            self.checked += 1
+            self.reused += rec is not None
+        return rec
+
+    def unchanged(
+        self, url: str, model_info: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Previous record for ``url`` if its commit is unchanged (at most one request)."""
+        if not self.records:
+            return None
+        model_id, revision = extract_model_ref(url)
+        if model_info is not None:
+            sha: Optional[str] = pinned_revision(model_info, "")  # listings carry the sha
+        else:
+            sha = run_in("hf", fetch_model_sha, model_id, revision=revision)
+        return self.lookup(url, sha)
+
+    async def aunchanged(
+        self, session: Any, url: str, model_info: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Asyncio counterpart of unchanged()."""
+        from .metrics.hf_api_async import afetch_model_sha
+
+        if not self.records:
+            return None
+        model_id, revision = extract_model_ref(url)
+        if model_info is not None:
+            sha: Optional[str] = pinned_revision(model_info, "")
+        else:
+            sha = await afetch_model_sha(session, model_id, revision=revision)
+        return self.lookup(url, sha)
+
+    def summary(self) -> str:
+        return f"incremental: {self.reused} of {self.checked} models unchanged (records reused)"
+
+
+_previous: Optional[PreviousRun] = None
+
+
+def configure_previous(path: Optional[str]) -> Optional[PreviousRun]:
+    """Load the previous run's output from ``path`` (None turns incremental mode off).
+
+    Raises OSError when the file can't be read.
+    """
+    global _previous
+    _previous = PreviousRun.load(path) if path else None
+    return _previous
+
+
+def get_previous() -> Optional[PreviousRun]:
+    return _previous
@@ -3,14 +3,24 @@ Streaming I/O helpers for reading URL lists and writing NDJSON results.
 """
 
 import sys
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterator, Optional, TextIO
 
 import orjson
 
 
-def read_urls(path: str) -> Iterable[str]:
-    """Yield URLs from a file; supports newline- or comma-separated entries."""
-    with open(path, "r", encoding="utf-8") as f:
+def read_urls(path: str) -> Iterator[str]:
+    """Yield URLs from a file (``-`` = stdin); supports newline- or comma-separated entries.
+
+    The file is opened before the first URL is asked for, so a missing file
+    raises OSError here; it is read lazily, one line at a time.
+    """
+    if path == "-":
+        return _split_urls(sys.stdin)
+    return _split_urls(open(path, "r", encoding="utf-8"), close=True)
+
+
+def _split_urls(f: TextIO, close: bool = False) -> Iterator[str]:
+    try:
         for line in f:
             line = line.strip()
             if line:
@@ -19,8 +29,25 @@ def read_urls(path: str) -> Iterable[str]:
                     url = url.strip()
                     if url:  # Skip empty URLs after splitting
                         yield url
+    finally:
+        if close:
+            f.close()
+
+
+def read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the JSON objects of an NDJSON file, skipping blank and malformed lines."""
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                yield obj
 
 
-def write_ndjson_line(d: Dict[str, Any]) -> None:
-    """Write dictionary as one NDJSON line to stdout using orjson."""
-    sys.stdout.write(orjson.dumps(d).decode() + "\n")
+def write_ndjson_line(d: Dict[str, Any], out: Optional[TextIO] = None) -> None:
+    """Write dictionary as one NDJSON line to ``out`` (default stdout) using orjson."""
+    (out or sys.stdout).write(orjson.dumps(d).decode() + "\n")
@@ -0,0 +1,209 @@
+"""
+Crash-safe checkpoint journal for long runs (--journal PATH, --resume).
+
+Every URL of the input file is numbered by its position. Once a URL is settled,
+i.e. its record or failure has been written, one line is appended to the
+journal:
+
+    {"seq": 41, "status": "ok", "out": 183220, "err": 912}
+
+``status`` is "ok", "failed" (terminal: 401/403/404 lookups, unsupported URLs)
+or "retry" (transient: 429/5xx lookups, network and processing errors).
+``out``/``err`` are the sizes of the NDJSON and error files after the write.
+
+Journal lines are held in memory and written in batches: every
+ACME_JOURNAL_SYNC_EVERY entries, once the oldest held one is ACME_JOURNAL_SYNC_MS
+old (checked as entries arrive), and at exit. The output files are flushed and
+fsynced first, so a journal entry on disk never points at output that a crash
+could still lose.
+
+--resume reads the journal back and cuts the outputs to the sizes in its last
+entry (to empty when no entry reached disk), dropping records whose entry never
+reached disk, so nothing is written twice. It then skips every position settled
+"ok" or "failed"; "retry" ones are evaluated again. The input must be the same
+URL file (and --shard). Resume state is a watermark (every position below it is
+settled) plus the positions settled out of order above it and the retry
+positions, so it stays small however long the run.
+
+Env:
+- ACME_JOURNAL_SYNC_EVERY: journal entries per fsync batch (default 256)
+- ACME_JOURNAL_SYNC_MS: longest time an entry waits for its fsync (default 1000)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from .env import env_int
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("ok", "failed", "retry")
+
+
+class Checkpoint:
+    """What an earlier run's journal says is done."""
+
+    def __init__(self) -> None:
+        self.watermark = 0  # every position below this is settled
+        self.entries = 0
+        self.out = 0
+        self.err = 0
+        self._settled: Set[int] = set()  # settled positions at or above the watermark
+        self._retry: Set[int] = set()
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        """Read a journal; a torn last line (crash mid-write) is ignored."""
+        cp = cls()
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                    seq, status = int(entry["seq"]), str(entry["status"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if status not in STATUSES:
+                    continue
+                cp._note(seq, status)
+                cp.out = int(entry.get("out", cp.out) or 0)
+                cp.err = int(entry.get("err", cp.err) or 0)
+        return cp
+
+    def _note(self, seq: int, status: str) -> None:
+        self.entries += 1
+        if status == "retry":
+            self._retry.add(seq)
+        else:
+            self._retry.discard(seq)
+        if seq >= self.watermark:
+            self._settled.add(seq)
+            while self.watermark in self._settled:
+                self._settled.remove(self.watermark)
+                self.watermark += 1
+
+    def done(self, seq: int) -> bool:
+        """True if position ``seq`` was settled for good (not left for a retry)."""
+        if seq in self._retry:
+            return False
+        return seq < self.watermark or seq in self._settled
+
+    @property
+    def retries(self) -> int:
+        return len(self._retry)
+
+
+def truncate_to(path: Optional[str], size: int) -> None:
+    """Cut ``path`` back to ``size`` bytes (no-op if it is missing or not longer)."""
+    if not path or not os.path.isfile(path):
+        return
+    if os.path.getsize(path) > size:
+        with open(path, "r+b") as fh:
+            fh.truncate(size)
+        logger.info(f"resume: truncated {path} to {size} bytes")
+
+
+def _fsync_path(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """Append-only record of settled input positions, written in fsync batches.
+
+    ``admit`` numbers the input URLs (skipping those ``checkpoint`` has as done)
+    and ``settle`` journals one of them once its output is written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        out: Optional[TextIO] = None,
+        err_path: Optional[str] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> None:
+        self.path = path
+        self.out = out
+        self.err_path = err_path
+        self.checkpoint = checkpoint or Checkpoint()
+        self.skipped = 0
+        self.stats: Dict[str, int] = {s: 0 for s in STATUSES}
+        self.stats["syncs"] = 0
+        self._every = max(1, env_int("ACME_JOURNAL_SYNC_EVERY", 256))
+        self._max_wait = max(0, env_int("ACME_JOURNAL_SYNC_MS", 1000)) / 1000
+        self._fh = open(path, "a" if checkpoint is not None else "w", encoding="utf-8")
+        self._seqs: Dict[str, Deque[int]] = {}
+        self._unsynced: List[str] = []  # held back until the outputs are synced
+        self._oldest_unsynced = 0.0
+
+    def admit(
+        self, urls: Iterable[str], on_skip: Optional[Callable[[str], None]] = None
+    ) -> Iterator[str]:
+        """Number ``urls`` by input position, dropping (and passing to ``on_skip``) done ones."""
+        for seq, u in enumerate(urls):
+            if self.checkpoint.done(seq):
+                self.skipped += 1
+                if on_skip is not None:
+                    on_skip(u)
+                continue
+            self._seqs.setdefault(u, deque()).append(seq)
+            yield u
+
+    def settle(self, u: str, status: str) -> None:
+        """Journal one admitted occurrence of ``u`` whose output has been written."""
+        seqs = self._seqs.get(u)
+        if not seqs:
+            return  # not from the URL file (e.g. a listing entry)
+        seq = seqs.popleft()  # repeats of one URL share an outcome, so any order works
+        if not seqs:
+            del self._seqs[u]
+        entry: Dict[str, Any] = {"seq": seq, "status": status}
+        if self.out is not None and self.out.seekable():
+            entry["out"] = self.out.tell()
+        if self.err_path and os.path.isfile(self.err_path):
+            entry["err"] = os.path.getsize(self.err_path)
+        self.stats[status] += 1
+        if not self._unsynced:
+            self._oldest_unsynced = time.monotonic()
+        self._unsynced.append(json.dumps(entry) + "\n")
+        if (
+            len(self._unsynced) >= self._every
+            or time.monotonic() - self._oldest_unsynced >= self._max_wait
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Make the outputs, then the journal lines that describe them, durable."""
+        out = self.out if self.out is not None else sys.stdout
+        try:
+            out.flush()
+            os.fsync(out.fileno())
+        except (OSError, ValueError, AttributeError):
+            pass  # a pipe or terminal: nothing to sync
+        if self.err_path:
+            _fsync_path(self.err_path)
+        self._fh.write("".join(self._unsynced))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._unsynced.clear()
+        self.stats["syncs"] += 1
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self.sync()
+        self._fh.close()
@@ -7,18 +7,16 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from .llm_providers import get_llm_provider
+from .stages import arun_in
 
 logger = logging.getLogger(__name__)
 
 
-def analyze_readme_with_llm(readme_content: str, model_name: str) -> Dict[str, Any]:
-    """Analyze README via provider; fall back to local heuristics if unavailable."""
-    # Use configured provider (Purdue). If none configured or it fails,
-    # fall back to deterministic local analysis unless LLM_STRICT is enabled.
-    provider = get_llm_provider()
+def _llm_flags() -> Tuple[bool, bool]:
+    """Return (strict, deterministic) from LLM_STRICT / DETERMINISTIC."""
     strict_val = (os.getenv("LLM_STRICT", "0") or "0").strip().lower()
     strict = strict_val in {"1", "true", "yes", "on"}
     # In deterministic mode, avoid external LLM to keep scores stable
@@ -28,12 +26,40 @@ def analyze_readme_with_llm(readme_content: str, model_name: str) -> Dict[str, A
         "yes",
         "on",
     }
+    return strict, deterministic
+
+
+def analysis_tag() -> str:
+    """Name of the analyzer a README would be analyzed with now ("local" or provider:model)."""
+    provider = get_llm_provider()
+    _, deterministic = _llm_flags()
+    if provider is None or deterministic:
+        return "local"
+    return f"{type(provider).__name__}:{getattr(provider, 'model', '')}"
+
+
+def analysis_stage() -> str:
+    """Stage (stages.py) a README analysis runs on: "llm" for a provider, else "cpu"."""
+    return "cpu" if analysis_tag() == "local" else "llm"
+
+
+def analyze_readme_with_llm(readme_content: str, model_name: str) -> Dict[str, Any]:
+    """Analyze README via provider; fall back to local heuristics if unavailable."""
+    return analyze_readme_tagged(readme_content, model_name)[0]
+
+
+def analyze_readme_tagged(readme_content: str, model_name: str) -> Tuple[Dict[str, Any], str]:
+    """analyze_readme_with_llm plus the analysis_tag() of whichever analyzer answered."""
+    # Use configured provider (Purdue). If none configured or it fails,
+    # fall back to deterministic local analysis unless LLM_STRICT is enabled.
+    provider = get_llm_provider()
+    strict, deterministic = _llm_flags()
     if provider is not None and not deterministic:
         try:
             result = provider.analyze_readme(model_name, readme_content)
             # Merge provider result with local analysis for richer features
             result.update(_analyze_readme_locally(readme_content, model_name))
-            return result
+            return result, analysis_tag()
         except Exception as e:
             logger.warning(f"Configured LLM provider failed for {model_name}: {e}")
             if strict:
@@ -42,7 +68,36 @@ def analyze_readme_with_llm(readme_content: str, model_name: str) -> Dict[str, A
         logger.info("LLM provider not configured; using local analysis")
         if strict:
             raise RuntimeError("LLM provider not configured and LLM_STRICT is enabled")
-    return _analyze_readme_locally(readme_content, model_name)
+    return _analyze_readme_locally(readme_content, model_name), "local"
+
+
+async def aanalyze_readme_with_llm(
+    session: Any, readme_content: str, model_name: str
+) -> Dict[str, Any]:
+    """Asyncio counterpart of analyze_readme_with_llm (same fallback rules)."""
+    return (await aanalyze_readme_tagged(session, readme_content, model_name))[0]
+
+
+async def aanalyze_readme_tagged(
+    session: Any, readme_content: str, model_name: str
+) -> Tuple[Dict[str, Any], str]:
+    """Asyncio counterpart of analyze_readme_tagged; the local analysis runs on the cpu stage."""
+    provider = get_llm_provider()
+    strict, deterministic = _llm_flags()
+    if provider is not None and not deterministic:
+        try:
+            result = await provider.aanalyze_readme(session, model_name, readme_content)
+            result.update(await arun_in("cpu", _analyze_readme_locally, readme_content, model_name))
+            return result, analysis_tag()
+        except Exception as e:
+            logger.warning(f"Configured LLM provider failed for {model_name}: {e}")
+            if strict:
+                raise
+    else:
+        logger.info("LLM provider not configured; using local analysis")
+        if strict:
+            raise RuntimeError("LLM provider not configured and LLM_STRICT is enabled")
+    return await arun_in("cpu", _analyze_readme_locally, readme_content, model_name), "local"
 
 
 def _analyze_readme_locally(readme_content: str, model_name: str) -> Dict[str, Any]:
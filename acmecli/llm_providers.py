@@ -6,17 +6,20 @@ Env:
 - PURDUE_GENAI_BASE_URL, PURDUE_GENAI_API_KEY, PURDUE_GENAI_MODEL, PURDUE_GENAI_PATH
 
 Contract: analyze_readme(model, readme) -> {documentation_quality, ease_of_use, examples_present}
+(aanalyze_readme(session, model, readme) is the asyncio equivalent.)
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
-import requests
+from .http_client import http_post
+from .replay import areplayable
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,11 @@ class LLMProvider(ABC):
     def analyze_readme(self, model_name: str, readme: str) -> Dict[str, Any]:
         raise NotImplementedError
 
+    async def aanalyze_readme(self, session: Any, model_name: str, readme: str) -> Dict[str, Any]:
+        """Async variant; providers without a native one run the sync call off-loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze_readme, model_name, readme)
+
 
 class PurdueGenAIProvider(LLMProvider):
     def __init__(
@@ -36,8 +44,9 @@ class PurdueGenAIProvider(LLMProvider):
         self.model = model
         self.path = path if path.startswith("/") else f"/{path}"
 
-    def analyze_readme(self, model_name: str, readme: str) -> Dict[str, Any]:
-        """Call Purdue GenAI REST API (OpenAI-compatible chat endpoint)."""
+    def _build_request(
+        self, model_name: str, readme: str
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         prompt = (
             f"Analyze README for model '{model_name}'. Return JSON with keys: "
             "documentation_quality, ease_of_use, examples_present (bool).\n\n"
@@ -54,19 +63,46 @@ class PurdueGenAIProvider(LLMProvider):
             "temperature": 0.0,
             "max_tokens": 150,
         }
+        return url, headers, payload
+
+    @staticmethod
+    def _parse_response(data: Any) -> Dict[str, Any]:
+        # Expected OpenAI-compatible shape; adapt mapping if needed.
+        content = data["choices"][0]["message"]["content"]
+        parsed = json.loads(content)
+        return {
+            "documentation_quality": float(parsed.get("documentation_quality", 0.0)),
+            "ease_of_use": float(parsed.get("ease_of_use", 0.0)),
+            "examples_present": bool(parsed.get("examples_present", False)),
+        }
+
+    def analyze_readme(self, model_name: str, readme: str) -> Dict[str, Any]:
+        """Call Purdue GenAI REST API (OpenAI-compatible chat endpoint)."""
+        url, headers, payload = self._build_request(model_name, readme)
         try:
-            r = requests.post(url, headers=headers, json=payload, timeout=20)
+            r = http_post(url, headers=headers, json=payload, timeout=20)
             if r.status_code != 200:
                 raise RuntimeError(f"Purdue GenAI HTTP {r.status_code}: {r.text[:200]}")
-            data = r.json()
-            # Expected OpenAI-compatible shape; adapt mapping if needed.
-            content = data["choices"][0]["message"]["content"]
-            parsed = json.loads(content)
-            return {
-                "documentation_quality": float(parsed.get("documentation_quality", 0.0)),
-                "ease_of_use": float(parsed.get("ease_of_use", 0.0)),
-                "examples_present": bool(parsed.get("examples_present", False)),
-            }
+            return self._parse_response(r.json())
+        except Exception as e:
+            logger.warning(f"Purdue GenAI analyze_readme failed: {e}")
+            raise
+
+    async def aanalyze_readme(self, session: Any, model_name: str, readme: str) -> Dict[str, Any]:
+        """Same request as analyze_readme, issued on an aiohttp session."""
+        url, headers, payload = self._build_request(model_name, readme)
+
+        async def _post() -> Tuple[int, str, str, int, Dict[str, str]]:
+            async with session.post(url, headers=headers, json=payload) as r:
+                return int(r.status), str(r.reason or ""), str(await r.text()), 0, {}
+
+        try:
+            status, _, body, _, _ = await areplayable(
+                "POST", url, payload, lambda: asyncio.wait_for(_post(), 20)
+            )
+            if status != 200:
+                raise RuntimeError(f"Purdue GenAI HTTP {status}: {body[:200]}")
+            return self._parse_response(json.loads(body))
         except Exception as e:
             logger.warning(f"Purdue GenAI analyze_readme failed: {e}")
             raise
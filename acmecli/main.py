@@ -7,22 +7,49 @@ from __future__ import annotations
 import argparse
 import concurrent.futures as cf
 import json
+import logging
 import os
 import sys
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
 
 from .determinism import set_global_determinism
+from .endpoints import configure_hf_endpoint, get_pool, served_scope
+from .env import env_int
+from .hedge import hedge_summary, hedging_enabled
+from .http_cache import configure_cache
+from .incremental import configure_previous, get_previous
 from .io_utils import read_urls, write_ndjson_line
+from .journal import Checkpoint, Journal, truncate_to
 from .logging_cfg import setup_logging
-from .metrics.hf_api import ModelLookupError, build_context_from_api
+from .metrics.hf_api import (
+    NEGATIVE_STATUSES,
+    ModelLookupError,
+    build_context_from_api,
+    iter_model_listing,
+)
+from .pipeline import (
+    REORDER_WINDOW,
+    Deduper,
+    ModelUrls,
+    OutcomeHandler,
+    ProblemLog,
+    ReorderBuffer,
+)
+from .replay import configure_tape
 from .report import capture_and_summarize_results, extract_model_name
+from .retry import model_scope, run_summary
 from .scoring import compute_all_scores
-from .urls import Category, classify
+from .shard import Shard, parse_shard
+from .stages import configure_stages, model_workers, run_in, stage_summary
+
+logger = logging.getLogger(__name__)
 
 
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Evaluate Hugging Face models and generate scores")
-    ap.add_argument("url_file", nargs="?", help="File with newline-delimited URLs")
+    ap.add_argument(
+        "url_file", nargs="?", help="File with newline-delimited URLs ('-' reads stdin)"
+    )
     ap.add_argument(
         "--summary",
         action="store_true",
@@ -34,26 +61,200 @@ def parse_args() -> argparse.Namespace:
         default="evaluation",
         help="Base filename for output files (default: evaluation)",
     )
+    ap.add_argument(
+        "--ndjson",
+        metavar="FILE",
+        default=None,
+        help="Write NDJSON records to FILE instead of stdout (appended to with --resume)",
+    )
+    ap.add_argument(
+        "--journal",
+        metavar="PATH",
+        default=None,
+        help="Checkpoint journal of settled URLs (default: FILE.journal with --ndjson)",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs the journal has as done and append to the existing outputs",
+    )
+    ap.add_argument(
+        "--shard",
+        metavar="I/N",
+        default=os.getenv("ACME_SHARD"),
+        help="Evaluate only shard I of N (by a stable hash of the model id); "
+        "combine shard outputs with python -m acmecli.merge (default: $ACME_SHARD)",
+    )
     ap.add_argument(
         "--fail-fast", action="store_true", help="Stop immediately on the first model failure"
     )
     ap.add_argument(
         "--error-file", default=None, help="Write failures to this NDJSON file (one JSON per line)"
     )
+    ap.add_argument(
+        "--preserve-order",
+        action="store_true",
+        help="Write records (and failures) in input order instead of as they finish",
+    )
+    ap.add_argument(
+        "--reorder-window",
+        type=int,
+        metavar="N",
+        default=env_int("ACME_REORDER_WINDOW", REORDER_WINDOW),
+        help="With --preserve-order: models that may finish ahead of the slowest pending one "
+        f"(default: $ACME_REORDER_WINDOW or {REORDER_WINDOW})",
+    )
+    ap.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Evaluate on a single asyncio event loop (requires aiohttp)",
+    )
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=256,
+        help="Models in flight at once in --async mode (default: 256)",
+    )
+    ap.add_argument(
+        "--author",
+        default=None,
+        help="Score every model of this HF user/org (pages the model listing; no URL_FILE)",
+    )
+    ap.add_argument(
+        "--search",
+        default=None,
+        help="Score every model matching this HF search query (combinable with --author)",
+    )
+    ap.add_argument(
+        "--incremental",
+        metavar="PREV_NDJSON",
+        default=None,
+        help="Re-emit records from this earlier output for models whose commit is unchanged",
+    )
+    ap.add_argument(
+        "--record",
+        metavar="DIR",
+        default=os.getenv("ACME_RECORD_DIR"),
+        help="Save every HTTP response (HF, GitHub, LLM) to DIR for later --replay",
+    )
+    ap.add_argument(
+        "--replay",
+        metavar="DIR",
+        default=os.getenv("ACME_REPLAY_DIR"),
+        help="Answer every HTTP request from a --record DIR; never touches the network",
+    )
+    ap.add_argument(
+        "--hf-endpoint",
+        metavar="URL",
+        default=None,
+        help="Send HF API/file requests here, e.g. a mirror or python -m acmecli.mock_hf; "
+        "comma-separate several to fail over between them, fastest first "
+        "(default: $ACME_HF_ENDPOINT or https://huggingface.co)",
+    )
+    for stage, env, what in (
+        ("hf", "ACME_HF_WORKERS", "concurrent Hugging Face requests"),
+        ("llm", "ACME_LLM_WORKERS", "concurrent LLM README analyses"),
+        ("cpu", "ACME_CPU_WORKERS", "threads for analysis and scoring"),
+        ("model", "ACME_MODEL_WORKERS", "models evaluated at once (threaded mode)"),
+    ):
+        ap.add_argument(
+            f"--{stage}-workers",
+            type=int,
+            metavar="N",
+            default=None,
+            help=f"Size of the {stage} stage: {what} (default: ${env})",
+        )
+    ap.add_argument(
+        "--cache-dir",
+        default=os.getenv("ACME_CACHE_DIR"),
+        help="Persistent HTTP response cache directory (default: $ACME_CACHE_DIR; off if unset)",
+    )
     return ap.parse_args()
 
 
-def build_ctx_from_url(url: str) -> Dict[str, Any]:
+def build_ctx_from_url(url: str, model_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     # May raise ModelLookupError
-    return build_context_from_api(url)
+    return build_context_from_api(url, model_info=model_info)
 
 
-def process_model(url: str) -> Dict[str, Any]:
+def process_model(url: str, model_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     # May raise ModelLookupError
-    ctx = build_ctx_from_url(url)
-    fields = compute_all_scores(ctx)
+    previous = get_previous()
+    with model_scope() as retries, served_scope() as served:
+        reused = previous.unchanged(url, model_info) if previous is not None else None
+        if reused is not None:
+            return {**reused, "endpoint": ",".join(served), "retry_stats": retries.as_record()}
+        ctx = build_ctx_from_url(url, model_info)
+    fields = run_in("cpu", compute_all_scores, ctx)
     model_name = extract_model_name(url)
-    return {"name": model_name, "category": "MODEL", **fields}
+    return {
+        "name": model_name,
+        "category": "MODEL",
+        **fields,
+        "sha": ctx.get("sha", ""),
+        "endpoint": ",".join(served),
+        "retry_stats": retries.as_record(),
+    }
+
+
+class ExecutorUnavailable(RuntimeError):
+    """The model thread pool could not start; no URL has been taken yet."""
+
+
+def evaluate_bounded(
+    urls: Iterable[Optional[str]],
+    work: Callable[[str], Dict[str, Any]],
+    on_outcome: OutcomeHandler,
+    workers: Optional[int] = None,
+) -> None:
+    """Run ``work(url)`` on a thread pool for each URL, as the URLs are pulled.
+
+    At most 4 x workers URLs are pending, so ``urls`` is consumed only as fast
+    as models are scored. Outcomes are delivered on the calling thread in
+    completion order; ``on_outcome`` returning False cancels the rest. A None
+    from ``urls`` is a stall (pipeline.py): wait for an outcome, then pull again.
+    """
+    workers = workers or model_workers()
+    cap = 4 * workers
+    try:
+        ex = cf.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="acme-model")
+        ex.submit(int).result()  # start a worker before any URL is taken
+    except (RuntimeError, OSError) as e:
+        raise ExecutorUnavailable(str(e)) from e
+    with ex:
+        pending: Dict["cf.Future[Dict[str, Any]]", str] = {}
+
+        def drain(block: bool) -> bool:
+            done, _ = cf.wait(pending, timeout=None if block else 0, return_when=cf.FIRST_COMPLETED)
+            for fut in done:
+                u = pending.pop(fut)
+                rec, err = None, None
+                try:
+                    rec = fut.result()
+                except Exception as e:
+                    err = e
+                if not on_outcome(u, rec, err):
+                    return False
+            return True
+
+        keep_going = True
+        for url in urls:
+            if url is None:
+                if not pending:
+                    raise RuntimeError("pipeline stalled with no model in flight")
+                if not drain(block=True):
+                    keep_going = False
+                    break
+                continue
+            pending[ex.submit(work, url)] = url
+            if not drain(block=len(pending) >= cap):
+                keep_going = False
+                break
+        while keep_going and pending:
+            keep_going = drain(block=True)
+        for fut in pending:
+            fut.cancel()
 
 
 def _write_error_line(path: str, record: Dict[str, Any]) -> None:
@@ -65,6 +266,8 @@ def _validate_environment() -> None:
     """Validate basic env settings (token, log path)."""
     import requests
 
+    from .http_client import USER_AGENT, http_get
+
     # Validate GitHub token if provided
     token = os.getenv("GITHUB_TOKEN")
     if token:
@@ -75,8 +278,8 @@ def _validate_environment() -> None:
 
         # Test token with a simple API call
         try:
-            headers = {"Authorization": f"Bearer {token}", "User-Agent": "ACME-CLI/0.1.0"}
-            response = requests.get("https://api.github.com/user", headers=headers, timeout=10)
+            headers = {"Authorization": f"Bearer {token}", "User-Agent": USER_AGENT}
+            response = http_get("https://api.github.com/user", headers=headers, timeout=10)
             if response.status_code == 401:
                 print("Error: Invalid GitHub token - authentication failed", file=sys.stderr)
                 raise SystemExit(1)
@@ -107,108 +310,287 @@ def main() -> None:
     # Best-effort determinism to reduce grading variance
     set_global_determinism()
 
+    # Before any request (the GitHub token check below is one)
+    configure_hf_endpoint(args.hf_endpoint)
+    try:
+        tape = configure_tape(record=args.record, replay=args.replay)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
+
     # Validate environment configuration first (ensures LOG_FILE path is usable)
     _validate_environment()
 
     # Configure logging after validation
     setup_logging()
 
+    configure_stages(
+        hf=args.hf_workers, llm=args.llm_workers, cpu=args.cpu_workers, models=args.model_workers
+    )
+
+    # A replay must not depend on whatever a local cache holds
+    cache = configure_cache(None if args.replay else args.cache_dir)
+    try:
+        previous = configure_previous(args.incremental)
+    except OSError as e:
+        print(f"ERROR: failed to read {args.incremental}: {e}", file=sys.stderr)
+        raise SystemExit(1)
+
+    listing = bool(args.author or args.search)
+
     # Usage/config errors -> exit 1 (per autograder requirement)
-    if not args.url_file:
+    if not args.url_file and not listing:
         print(
             "ERROR: missing URL_FILE. Usage: ./run URL_FILE [--summary] "
-            "[--fail-fast] [--error-file PATH]",
+            "[--fail-fast] [--error-file PATH] [--async] (or --author ORG / --search QUERY)",
             file=sys.stderr,
         )
         raise SystemExit(1)
-
-    try:
-        urls = list(read_urls(args.url_file))
-    except OSError as e:
-        print(f"ERROR: failed to read {args.url_file}: {e}", file=sys.stderr)
+    if args.url_file and listing:
+        print("ERROR: URL_FILE cannot be combined with --author/--search", file=sys.stderr)
         raise SystemExit(1)
 
-    if not urls:
-        print(f"ERROR: {args.url_file} contained no URLs", file=sys.stderr)
+    journal_path = args.journal or (f"{args.ndjson}.journal" if args.ndjson else None)
+    if args.resume and not journal_path:
+        print("ERROR: --resume needs --journal PATH or --ndjson FILE", file=sys.stderr)
+        raise SystemExit(1)
+    if journal_path and listing:
+        print("ERROR: --journal/--resume need a URL file", file=sys.stderr)
         raise SystemExit(1)
 
-    # Classify URLs up-front
-    models: List[str] = []
-    invalid: List[Tuple[str, str]] = []
-    for u in urls:
+    shard: Optional[Shard] = None
+    if args.shard:
         try:
-            cat = classify(u)
-        except Exception as e:
-            invalid.append((u, f"classify error: {e}"))
-            continue
-        if cat is Category.MODEL:
-            models.append(u)
-        else:
-            invalid.append((u, f"unsupported category: {getattr(cat, 'name', str(cat))}"))
-
-    results: List[Dict[str, Any]] = []
-    failures: List[Tuple[str, str]] = []  # (url, reason)
+            shard = Shard(*parse_shard(args.shard))
+        except ValueError as e:
+            print(f"ERROR: --shard: {e}", file=sys.stderr)
+            raise SystemExit(1)
 
-    # Emit classification errors to error file immediately (optional)
-    if args.error_file and invalid:
-        for u, why in invalid:
-            _write_error_line(args.error_file, {"url": u, "error": why, "kind": "classify"})
+    source: Iterable[str] = ()
+    if args.url_file:
+        try:
+            source = read_urls(args.url_file)  # "-" reads stdin
+        except OSError as e:
+            print(f"ERROR: failed to read {args.url_file}: {e}", file=sys.stderr)
+            raise SystemExit(1)
+        if shard is not None:
+            source = shard.select(source)
 
-    # If there are no model URLs at all, still report invalids and exit 1
-    if not models and invalid:
-        print("[error] no model URLs found to evaluate", file=sys.stderr)
-        print("[error] invalid/unsupported URL(s) detected:", file=sys.stderr)
-        for u, why in invalid:
-            print(f"  - {u}: {why}", file=sys.stderr)
+    # Checkpointing: outputs are cut back to what the journal vouches for, then appended to
+    journal: Optional[Journal] = None
+    out: Optional[TextIO] = None
+    try:
+        checkpoint = None
+        if args.resume and journal_path and os.path.isfile(journal_path):
+            checkpoint = Checkpoint.load(journal_path)
+            # An empty journal (crash before the first sync) vouches for nothing: 0 bytes
+            truncate_to(args.ndjson, checkpoint.out)
+            truncate_to(args.error_file, checkpoint.err)
+            logger.info(
+                f"resume: {checkpoint.entries} journal entries, {checkpoint.retries} to retry"
+            )
+        if args.ndjson:
+            out = open(args.ndjson, "a" if checkpoint is not None else "w", encoding="utf-8")
+        if shard is not None and args.error_file:
+            # Every shard leaves an error file for merge.py, even with no failures
+            open(args.error_file, "a", encoding="utf-8").close()
+        if journal_path:
+            journal = Journal(journal_path, out, args.error_file, checkpoint)
+            source = journal.admit(source, on_skip=shard.skip if shard is not None else None)
+    except OSError as e:
+        print(f"ERROR: failed to open outputs: {e}", file=sys.stderr)
         raise SystemExit(1)
 
+    results: List[Dict[str, Any]] = []
+    reorder: Optional[ReorderBuffer] = None  # --preserve-order, set up below
+    unsupported = ProblemLog()  # every URL that is not a model
+    invalid = ProblemLog()  # the ones that are actual errors (not DATASET/CODE)
+    failures = ProblemLog()
+
+    # Classification errors go to the error file as the URLs are read
+    # (with --preserve-order, in their turn: see reorder below)
+    def record_invalid(u: str, why: str) -> None:
+        unsupported.add(u, why)
+        if not ("unsupported category:" in why and ("DATASET" in why or "CODE" in why)):
+            invalid.add(u, why)
+
+        def write() -> bool:
+            tag = shard.tag(u) if shard is not None else {}
+            if args.error_file:
+                _write_error_line(
+                    args.error_file, {"url": u, "error": why, "kind": "classify", **tag}
+                )
+            if journal is not None:
+                journal.settle(u, "failed")
+            return True
+
+        if reorder is not None:
+            reorder.release(u, write)
+        else:
+            write()
+
     # Helper to record a failure (stderr + optional error file)
-    def record_failure(u: str, why: str, kind: str = "lookup") -> None:
-        failures.append((u, why))
+    def record_failure(
+        u: str, why: str, kind: str = "lookup", extra: Optional[Dict[str, Any]] = None
+    ) -> None:
+        failures.add(u, why)
         if args.error_file:
-            _write_error_line(args.error_file, {"url": u, "error": why, "kind": kind})
-
-    # ----- Parallel processing with threads (robust on Windows) -----
-    try:
-        with cf.ThreadPoolExecutor() as ex:
-            future_by_url = {ex.submit(process_model, u): u for u in models}
-            for fut in cf.as_completed(future_by_url):
-                u = future_by_url[fut]
-                try:
-                    rec = fut.result()  # exceptions propagate without pickle issues
-                    write_ndjson_line(rec)  # write successful record immediately
-                    if args.summary:
-                        results.append(rec)
-                except ModelLookupError as e:
-                    record_failure(u, f"model lookup failed: {e}", kind="lookup")
-                    if args.fail_fast:
-                        # Best effort: cancel anything not yet started
-                        for f in future_by_url:
-                            f.cancel()
-                        break
-                except Exception as e:
-                    record_failure(u, f"processing error: {e}", kind="processing")
-                    if args.fail_fast:
-                        for f in future_by_url:
-                            f.cancel()
-                        break
-    except Exception as e:
-        # As a last resort, fall back to sequential
-        print(f"[warn] parallel execution unavailable: {e}", file=sys.stderr)
-        for u in models:
+            _write_error_line(
+                args.error_file, {"url": u, "error": why, "kind": kind, **(extra or {})}
+            )
+
+    def handle_outcome(u: str, rec: Optional[Dict[str, Any]], exc: Optional[BaseException]) -> bool:
+        """Emit one model's record or failure; return False when --fail-fast should stop."""
+        keep_going, status = True, "ok"
+        tag = shard.tag(u) if shard is not None else {}
+        if exc is None and rec is not None:
             try:
-                rec = process_model(u)
-                write_ndjson_line(rec)
+                rec = {**rec, **tag} if tag else rec
+                write_ndjson_line(rec, out)  # write successful record immediately
                 if args.summary:
                     results.append(rec)
-            except ModelLookupError as e:
-                record_failure(u, f"model lookup failed: {e}", kind="lookup")
-                if args.fail_fast:
-                    break
             except Exception as e:
-                record_failure(u, f"processing error: {e}", kind="processing")
-                if args.fail_fast:
-                    break
+                exc = e
+        if exc is not None or rec is None:
+            # 401/403/404 is an answer; anything else (429, 5xx out of retries,
+            # processing errors) is worth retrying on --resume
+            if isinstance(exc, ModelLookupError):
+                record_failure(
+                    u,
+                    f"model lookup failed: {exc}",
+                    kind="lookup",
+                    extra={"cached": exc.cached, **tag},
+                )
+                status = "failed" if exc.status in NEGATIVE_STATUSES else "retry"
+            else:
+                record_failure(u, f"processing error: {exc}", kind="processing", extra=tag)
+                status = "retry"
+            keep_going = not args.fail_fast
+        if journal is not None:
+            journal.settle(u, status)
+        return keep_going
+
+    # --preserve-order: outcomes pass through a bounded reorder window, which
+    # stalls the scheduler when the head of line is slow. It numbers every input
+    # URL (before classification), so invalid URLs' error lines keep their place.
+    emit: OutcomeHandler = handle_outcome
+    admit: Callable[[Iterable[Optional[str]]], Iterable[Optional[str]]] = lambda urls: urls
+    if args.preserve_order:
+        reorder = ReorderBuffer(handle_outcome, args.reorder_window)
+        emit, admit = reorder.deliver, reorder.admit
+
+    # Streamed read -> classify -> dedupe: each distinct model is evaluated once
+    # and duplicates share the result; nothing is read ahead of the in-flight window
+    models = ModelUrls(admit(source), record_invalid)
+    deduper = Deduper(emit)
+    stream = deduper.filter(models)
+
+    try:
+        if listing:
+            infos: Dict[str, Dict[str, Any]] = {}
+
+            def listed() -> Iterator[str]:
+                for entry in iter_model_listing(author=args.author, search=args.search):
+                    url = f"https://huggingface.co/{entry['id']}"
+                    if shard is None or shard.owns(url):
+                        infos[url] = entry  # consumed when the model starts
+                    yield url
+
+            entries = listed() if shard is None else shard.select(listed())
+
+            try:
+                if args.use_async:
+                    from .async_engine import run_models_async
+
+                    # Listing pages are fetched with blocking requests: off the event loop
+                    run_models_async(
+                        admit(entries),
+                        emit,
+                        concurrency=args.concurrency,
+                        model_infos=infos,
+                        blocking_source=True,
+                    )
+                else:
+                    evaluate_bounded(
+                        admit(entries), lambda u: process_model(u, infos.pop(u, None)), emit
+                    )
+            except RuntimeError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                raise SystemExit(1)
+        elif args.use_async:
+            from .async_engine import run_models_async
+
+            try:
+                run_models_async(stream, deduper.handle, concurrency=args.concurrency)
+            except RuntimeError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                raise SystemExit(1)
+        else:
+            # ----- Parallel processing with threads (robust on Windows) -----
+            try:
+                evaluate_bounded(stream, process_model, deduper.handle)
+            except ExecutorUnavailable as e:
+                # No threads at all: evaluate sequentially (no URL was consumed yet).
+                # Pipeline and output errors are not retried here; they end the run.
+                print(f"[warn] parallel execution unavailable: {e}", file=sys.stderr)
+                for u in stream:
+                    if u is None:
+                        continue  # nothing is in flight here, so there is no stall to wait out
+                    rec, err = None, None
+                    try:
+                        rec = process_model(u)
+                    except Exception as e:
+                        err = e
+                    if not deduper.handle(u, rec, err):
+                        break
+            except RuntimeError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                raise SystemExit(1)
+    finally:
+        # The journal's last batch syncs the outputs before itself
+        if journal is not None:
+            journal.close()
+            logger.info(
+                f"Journal ({journal.path}): {journal.stats}, {journal.skipped} URLs already done"
+            )
+        if out is not None:
+            out.close()
+
+    resumed = journal is not None and journal.skipped > 0
+    read = shard.read if shard is not None else models.read
+    if args.url_file and not read and not resumed:
+        print(f"ERROR: {args.url_file} contained no URLs", file=sys.stderr)
+        raise SystemExit(1)
+
+    # If there are no model URLs at all, still report invalids and exit 1
+    # (a shard's share of a small input may hold none)
+    if args.url_file and not models.models and not resumed and shard is None:
+        print("[error] no model URLs found to evaluate", file=sys.stderr)
+        unsupported.report("[error] invalid/unsupported URL(s) detected:")
+        raise SystemExit(1)
+
+    if previous is not None:
+        logger.info(previous.summary())
+    if cache is not None:
+        logger.info(f"HTTP cache stats: {cache.stats}")
+    if tape is not None:
+        logger.info(f"HTTP tape stats ({tape.root}): {tape.stats}")
+    pool = get_pool()
+    if len(pool.endpoints) > 1:
+        logger.info(f"HF endpoint stats: {pool.summary()}")
+    logger.info(f"Stage pools: {stage_summary()}")
+    if shard is not None:
+        logger.info(f"Shard {shard}: {shard.selected} of {shard.read} input URLs")
+    if hedging_enabled("info"):
+        logger.info(f"HTTP hedge stats: {hedge_summary()}")
+    retry_totals = run_summary()
+    logger.info(f"HTTP retry summary: {retry_totals}")
+    if retry_totals["gave_up"] or retry_totals["budget_denied"]:
+        print(
+            f"[warn] retries: {retry_totals['retries']} of {retry_totals['requests']} requests, "
+            f"{retry_totals['gave_up']} gave up ({retry_totals['budget_denied']} over budget)",
+            file=sys.stderr,
+        )
 
     # Generate summary artifacts for the successes only
     if args.summary and results:
@@ -218,24 +600,12 @@ def main() -> None:
         print(f"🔍 View summary: cat {summary_file}", flush=True)
 
     # Final reporting - only report actual errors, not category filtering
+    # (expected non-model categories, DATASET and CODE, are left out)
     if invalid:
-        # Filter out expected non-model categories (DATASET, CODE) from error reporting
-        actual_errors = [
-            (u, why)
-            for u, why in invalid
-            if not ("unsupported category:" in why and ("DATASET" in why or "CODE" in why))
-        ]
-        if actual_errors:
-            print("[error] invalid/unsupported URL(s) detected:", file=sys.stderr)
-            for u, why in actual_errors:
-                print(f"  - {u}: {why}", file=sys.stderr)
-        # Update invalid list to only include actual errors for exit code logic
-        invalid = actual_errors
+        invalid.report("[error] invalid/unsupported URL(s) detected:")
 
     if failures:
-        print("[error] model failures:", file=sys.stderr)
-        for u, why in failures:
-            print(f"  - {u}: {why}", file=sys.stderr)
+        failures.report("[error] model failures:")
 
     # Exit policy:
     #   0 -> all OK (including successful processing of models even with DATASET/CODE URLs present)
@@ -0,0 +1,304 @@
+"""
+Combine the outputs of sharded runs (--shard i/N) into one.
+
+    python -m acmecli.merge s0.jsonl s1.jsonl s2.jsonl --errors e0.jsonl e1.jsonl e2.jsonl \\
+        -o scores.jsonl --error-file errors.jsonl --order --summary summary.json
+
+Lines are matched up by ``seq``, their position in the full input. Each
+position is written once: as its record if any input has one (a resumed or
+re-run shard may also have an older failure for it), else as its first error
+line. Lines without a ``seq`` (unsharded runs) are copied through unchanged.
+
+Memory use does not grow with the inputs:
+- by default the files are streamed one after another, records first, and the
+  positions written so far are kept as a bitmap (one bit per input line);
+- --order writes in input order: the inputs are cut into sorted runs of
+  ACME_MERGE_RUN lines in temporary files, which are then merged.
+
+The summary (--summary FILE, and one line on stderr) counts what was written
+and dropped, lists the shards seen and missing, and with --order the input
+positions below the highest one that no shard answered. Exit status is 1 when
+a shard of the N is missing or an input can't be read. A missing --errors file
+counts as empty (a shard without failures may never have created it). Inputs
+are checked before the outputs are opened, so a failed merge leaves -o as it was.
+
+Env:
+- ACME_MERGE_RUN: lines per sorted run with --order (default 100000)
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import orjson
+
+from .env import env_int
+from .io_utils import read_ndjson
+
+RECORD, ERROR = 0, 1
+
+# Sort key of lines without a seq: after every position, in reading order
+_UNTAGGED = sys.maxsize
+
+# A line with its sort key: (seq, kind, reading order, JSON)
+Entry = Tuple[int, int, int, bytes]
+
+
+def _seq(obj: Dict[str, Any]) -> Optional[int]:
+    seq = obj.get("seq")
+    return seq if isinstance(seq, int) and not isinstance(seq, bool) and seq >= 0 else None
+
+
+class Positions:
+    """A set of input positions, one bit each."""
+
+    def __init__(self) -> None:
+        self._bits = bytearray()
+
+    def __contains__(self, seq: int) -> bool:
+        byte, bit = divmod(seq, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+    def add(self, seq: int) -> bool:
+        """Add ``seq``; False if it was already there."""
+        byte, bit = divmod(seq, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        if self._bits[byte] & (1 << bit):
+            return False
+        self._bits[byte] |= 1 << bit
+        return True
+
+
+class MergeSummary:
+    """Counts for the merged output, built as lines go by."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, int] = {
+            "records": 0,
+            "errors": 0,
+            "duplicates": 0,  # same position, same kind, seen again
+            "superseded": 0,  # error lines for positions that have a record
+            "untagged": 0,  # lines without a seq, copied through
+            "missing_positions": 0,  # --order: gaps below the highest position
+        }
+        self.shards: Set[str] = set()
+        self.shard_counts: Set[int] = set()
+        self.categories = {"excellent": 0, "good": 0, "acceptable": 0, "poor": 0}
+        self._score_sum = 0.0
+        self._score_min: Optional[float] = None
+        self._score_max: Optional[float] = None
+
+    def saw(self, obj: Dict[str, Any]) -> None:
+        shard = obj.get("shard")
+        if isinstance(shard, str) and "/" in shard:
+            self.shards.add(shard)
+            try:
+                self.shard_counts.add(int(shard.split("/", 1)[1]))
+            except ValueError:
+                pass
+
+    def wrote(self, kind: int, obj: Dict[str, Any]) -> None:
+        if kind == ERROR:
+            self.stats["errors"] += 1
+            return
+        self.stats["records"] += 1
+        score = obj.get("net_score", 0)
+        score = float(score) if isinstance(score, (int, float)) else 0.0
+        self._score_sum += score
+        self._score_min = score if self._score_min is None else min(self._score_min, score)
+        self._score_max = score if self._score_max is None else max(self._score_max, score)
+        # Same bands as report.parse_model_results
+        if score >= 0.8:
+            self.categories["excellent"] += 1
+        elif score >= 0.6:
+            self.categories["good"] += 1
+        elif score >= 0.4:
+            self.categories["acceptable"] += 1
+        else:
+            self.categories["poor"] += 1
+
+    @property
+    def missing_shards(self) -> List[str]:
+        if len(self.shard_counts) != 1:
+            return []  # unsharded inputs, or a mix of splits (reported as such)
+        (n,) = self.shard_counts
+        return [f"{i}/{n}" for i in range(n) if f"{i}/{n}" not in self.shards]
+
+    def as_dict(self) -> Dict[str, Any]:
+        records = self.stats["records"]
+        return {
+            **self.stats,
+            "shards": sorted(self.shards, key=lambda s: [int(p) for p in s.split("/")]),
+            "missing_shards": self.missing_shards,
+            "mixed_shard_counts": len(self.shard_counts) > 1,
+            "net_score": {
+                "average": round(self._score_sum / records, 4) if records else 0.0,
+                "highest": self._score_max or 0.0,
+                "lowest": self._score_min or 0.0,
+            },
+            "categories": dict(self.categories),
+        }
+
+
+Writer = Callable[[int, bytes], None]
+
+
+def merge_unordered(
+    records: Iterable[str], errors: Iterable[str], write: Writer, summary: MergeSummary
+) -> None:
+    """Stream the inputs in turn, records first, writing each position once."""
+    written = {RECORD: Positions(), ERROR: Positions()}
+    for kind, paths in ((RECORD, records), (ERROR, errors)):
+        for path in paths:
+            for obj in read_ndjson(path):
+                summary.saw(obj)
+                seq = _seq(obj)
+                if seq is None:
+                    summary.stats["untagged"] += 1
+                elif kind == ERROR and seq in written[RECORD]:
+                    summary.stats["superseded"] += 1
+                    continue
+                elif not written[kind].add(seq):
+                    summary.stats["duplicates"] += 1
+                    continue
+                write(kind, orjson.dumps(obj))
+                summary.wrote(kind, obj)
+
+
+def _spill(run: List[Entry], tmpdir: str) -> str:
+    run.sort()
+    fd, path = tempfile.mkstemp(dir=tmpdir, suffix=".run")
+    with os.fdopen(fd, "wb") as fh:
+        for seq, kind, n, line in run:
+            fh.write(b"%d\t%d\t%d\t%s\n" % (seq, kind, n, line))
+    return path
+
+
+def _read_run(fh: IO[bytes]) -> Iterator[Entry]:
+    for raw in fh:
+        seq, kind, n, line = raw.rstrip(b"\n").split(b"\t", 3)
+        yield int(seq), int(kind), int(n), line
+
+
+def merge_ordered(
+    records: Iterable[str],
+    errors: Iterable[str],
+    write: Writer,
+    summary: MergeSummary,
+    run_size: Optional[int] = None,
+) -> None:
+    """External merge sort by input position, writing each position once."""
+    run_size = max(1, run_size or env_int("ACME_MERGE_RUN", 100_000))
+    with tempfile.TemporaryDirectory(prefix="acme-merge-") as tmpdir:
+        runs: List[str] = []
+        run: List[Entry] = []
+        n = 0
+        for kind, paths in ((RECORD, records), (ERROR, errors)):
+            for path in paths:
+                for obj in read_ndjson(path):
+                    summary.saw(obj)
+                    seq = _seq(obj)
+                    run.append((_UNTAGGED if seq is None else seq, kind, n, orjson.dumps(obj)))
+                    n += 1
+                    if len(run) >= run_size:
+                        runs.append(_spill(run, tmpdir))
+                        run = []
+        run.sort()  # the last run stays in memory
+        handles = [open(path, "rb") for path in runs]
+        try:
+            last_seq, last_kind = -1, RECORD
+            for seq, kind, _, line in heapq.merge(iter(run), *(_read_run(h) for h in handles)):
+                if seq == _UNTAGGED:
+                    summary.stats["untagged"] += 1
+                elif seq == last_seq:
+                    dropped = (
+                        "superseded" if last_kind == RECORD and kind == ERROR else "duplicates"
+                    )
+                    summary.stats[dropped] += 1
+                    continue
+                else:
+                    summary.stats["missing_positions"] += seq - last_seq - 1
+                    last_seq, last_kind = seq, kind
+                write(kind, line)
+                summary.wrote(kind, orjson.loads(line))
+        finally:
+            for h in handles:
+                h.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(
+        description="Merge the NDJSON and error files of sharded runs (--shard i/N)"
+    )
+    ap.add_argument("records", nargs="*", metavar="NDJSON", help="shard record files")
+    ap.add_argument("--errors", nargs="+", default=[], metavar="FILE", help="shard error files")
+    ap.add_argument("-o", "--output", default=None, help="merged records (default: stdout)")
+    ap.add_argument("--error-file", default=None, help="merged error lines (default: counted only)")
+    ap.add_argument("--order", action="store_true", help="write in input order (sorts on disk)")
+    ap.add_argument("--summary", metavar="FILE", default=None, help="write the summary as JSON")
+    args = ap.parse_args(argv)
+
+    if not args.records and not args.errors:
+        ap.error("nothing to merge: give shard NDJSON files and/or --errors")
+
+    errors = []
+    for path in args.errors:
+        if os.path.exists(path):
+            errors.append(path)
+        else:
+            print(f"[warn] {path} not found; no errors from that shard", file=sys.stderr)
+    # Every input must open before -o and --error-file are truncated
+    for path in args.records + errors:
+        try:
+            open(path, "rb").close()
+        except OSError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            raise SystemExit(1)
+
+    summary = MergeSummary()
+    out: Optional[IO[bytes]] = None
+    err: Optional[IO[bytes]] = None
+    try:
+        out = open(args.output, "wb") if args.output else None
+        err = open(args.error_file, "wb") if args.error_file else None
+        targets = {RECORD: out or sys.stdout.buffer, ERROR: err}
+
+        def write(kind: int, line: bytes) -> None:
+            fh = targets[kind]
+            if fh is not None:
+                fh.write(line + b"\n")
+
+        merge = merge_ordered if args.order else merge_unordered
+        merge(args.records, errors, write, summary)
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise SystemExit(1)
+    finally:
+        for fh in (out, err):
+            if fh is not None:
+                fh.close()
+        sys.stdout.flush()
+
+    result = summary.as_dict()
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(f"merge summary: {json.dumps(result)}", file=sys.stderr)
+    if result["missing_shards"] or result["mixed_shard_counts"]:
+        print(
+            f"[warn] incomplete shard set: missing {result['missing_shards']}"
+            + (" (inputs come from different N)" if result["mixed_shard_counts"] else ""),
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
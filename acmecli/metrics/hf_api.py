@@ -6,24 +6,69 @@ HuggingFace API Integration for Real-Time Model Analysis
 
 from __future__ import annotations
 
+import concurrent.futures as cf
+import json
 import logging
 import math
+import threading
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, cast
+from urllib.parse import quote, unquote, urlencode
 
 import requests
 
+from ..endpoints import hf_endpoint
+from ..env import env_int
+from ..http_cache import HttpCache, get_cache
+from ..http_client import USER_AGENT, http_get
+from ..singleflight import Group
+from ..stages import run_in, submit_to
 from .base import timed
 
 logger = logging.getLogger(__name__)
 
-HF_API_BASE = "https://huggingface.co/api"
 
-# Module-level capture of last network-only elapsed times (ms) for API calls
-_last_net_ms_info: int = 0
-_last_net_ms_files: int = 0
-_last_net_ms_readme: int = 0
+def hf_api_base() -> str:
+    """HF REST API root on the configured endpoint (see endpoints.hf_endpoint)."""
+    return f"{hf_endpoint()}/api"
+
+
+T = TypeVar("T")
+
+# Per-thread capture of last network-only elapsed times (ms) for API calls
+# (attributes: info, files, readme). Thread-local so concurrent fetches don't clobber.
+_net_ms = threading.local()
+
+# Coalesces identical in-flight fetches across worker threads
+_inflight: Group[Any] = Group()
+
+
+def _last_net_ms(kind: str) -> int:
+    return int(getattr(_net_ms, kind, 0) or 0)
+
+
+def _submit(fn: Callable[..., T], *args: Any, **kwargs: Any) -> "cf.Future[T]":
+    """Queue one HF request on the hf stage (stages.py), in the caller's context."""
+    return submit_to("hf", fn, *args, **kwargs)
+
+
+def _timed_fetch(
+    fn: Callable[..., T], kind: str, model_id: str, token: Optional[str], **kwargs: Any
+) -> Tuple[T, int]:
+    """Run a fetcher and return (result, network ms) captured on the same thread.
+
+    Identical concurrent fetches (same fetcher, model, token and arguments) share
+    one call through the singleflight group.
+    """
+
+    def run() -> Tuple[T, int]:
+        setattr(_net_ms, kind, 0)
+        result = fn(model_id, token=token, **kwargs)
+        return result, _last_net_ms(kind) or 1
+
+    key = (fn, model_id, token, tuple(sorted(kwargs.items())))
+    return cast(Tuple[T, int], _inflight.do(key, run))
 
 
 def _elapsed_ms(resp: Any) -> int:
@@ -42,109 +87,421 @@ def _elapsed_ms(resp: Any) -> int:
 
 
 class ModelLookupError(RuntimeError):
-    """Raised when a model cannot be fetched (not found, private, or other HTTP error)."""
+    """Raised when a model cannot be fetched (not found, private, or other HTTP error).
 
-    def __init__(self, model_id: str, status: int, msg: str):
+    ``cached`` is True when the error was served from the negative cache.
+    """
+
+    def __init__(self, model_id: str, status: int, msg: str, cached: bool = False):
         super().__init__(f"{model_id}: HTTP {status} - {msg}")
         self.model_id = model_id
         self.status = status
         self.msg = msg
+        self.cached = cached
+
+
+# Lookup failures that are remembered in the negative cache (missing/private models)
+NEGATIVE_STATUSES = frozenset({401, 403, 404})
+
+
+def _negative_key(model_id: str, token: Optional[str], revision: str = "main") -> str:
+    ref = model_id if revision == "main" else f"{model_id}@{revision}"
+    return HttpCache.key(f"negative:{ref}", _headers(token))
+
+
+def cached_lookup_error(
+    model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Optional[ModelLookupError]:
+    """Return the remembered 401/403/404 for ``model_id`` if still fresh, else None."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    entry = cache.load(_negative_key(model_id, token, revision))
+    if entry is None or not cache.is_fresh(entry, "negative"):
+        return None
+    try:
+        data = json.loads(str(entry.get("body", "")))
+        status, msg = int(data["status"]), str(data["msg"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    cache.count("negative_hits")
+    return ModelLookupError(model_id, status, msg, cached=True)
+
+
+def remember_lookup_error(
+    err: ModelLookupError, token: Optional[str] = None, revision: str = "main"
+) -> None:
+    """Store a 401/403/404 lookup failure in the negative cache."""
+    cache = get_cache()
+    if cache is None or err.status not in NEGATIVE_STATUSES or cache.ttls["negative"] <= 0:
+        return
+    body = json.dumps({"status": err.status, "msg": err.msg})
+    key = _negative_key(err.model_id, token, revision)
+    cache.save(key, f"negative:{err.model_id}@{revision}", {}, body)
+
+
+def _artifact_key(model_id: str, sha: str, name: str) -> str:
+    return HttpCache.key(f"artifact:{model_id}@{sha}:{name}")
+
+
+def load_artifact(model_id: str, sha: str, name: str) -> Any:
+    """Value derived from commit ``sha`` of ``model_id`` by an earlier run (else None)."""
+    cache = get_cache()
+    if cache is None or not is_commit_sha(sha):
+        return None
+    key = _artifact_key(model_id, sha, name)
+    entry = cache.load(key)
+    if entry is None:
+        return None
+    try:
+        value = json.loads(str(entry.get("body", "")))
+    except ValueError:
+        return None
+    cache.count("artifact_hits")
+    cache.note_access(key)
+    return value
+
+
+def save_artifact(model_id: str, sha: str, name: str, value: Any) -> None:
+    """Store a JSON-serialisable value derived from commit ``sha`` (never expires)."""
+    cache = get_cache()
+    if cache is not None and is_commit_sha(sha):
+        key = _artifact_key(model_id, sha, name)
+        cache.save(key, f"artifact:{model_id}@{sha}:{name}", {}, json.dumps(value))
 
 
 def _headers(token: Optional[str] = None) -> Dict[str, str]:
-    h = {"User-Agent": "ACME-CLI/0.1.0", "Accept": "application/json"}
+    h = {"User-Agent": USER_AGENT, "Accept": "application/json"}
     if token:
         h["Authorization"] = f"Bearer {token}"
     return h
 
 
+# Hub routes that follow the repo id in a URL (…/org/model/<route>/…)
+_REPO_ROUTES = {"tree", "blob", "resolve", "raw", "commit", "commits", "discussions", "edit"}
+# Routes whose next segment is a revision (branch, tag or commit sha)
+_REVISION_ROUTES = {"tree", "blob", "resolve", "raw", "commit"}
+
+
+def extract_model_ref(url: str) -> Tuple[str, str]:
+    """
+    (canonical model id, revision) for a model URL; the revision defaults to "main".
+      - https://huggingface.co/org/model -> ("org/model", "main")
+      - https://huggingface.co/org/model/tree/v1.0 -> ("org/model", "v1.0")
+      - https://huggingface.co/org/model/blob/<sha>/config.json -> ("org/model", "<sha>")
+      - https://huggingface.co/org/model/tree/refs%2Fpr%2F1 -> ("org/model", "refs/pr/1")
+    """
+    if "huggingface.co/" in url:
+        clean_url = url.split("#", 1)[0].split("?", 1)[0]
+        segments = [p for p in clean_url.split("huggingface.co/", 1)[1].split("/") if p]
+        revision = "main"
+        # Remove /tree/main or similar suffixes, keeping the revision they name
+        for i, seg in enumerate(segments):
+            if seg in _REPO_ROUTES:
+                if seg in _REVISION_ROUTES and i + 1 < len(segments):
+                    revision = unquote(segments[i + 1])
+                segments = segments[:i]
+                break
+        if segments:
+            return "/".join(segments[:2]), revision
+    raise ValueError(f"Invalid Hugging Face URL: {url}")
+
+
 def extract_model_id(url: str) -> str:
     """
-    Accepts:
+    Canonical model id for a model URL. Accepts:
       - https://huggingface.co/gpt2 -> "gpt2"
       - https://huggingface.co/org/model -> "org/model"
       - https://huggingface.co/org/model/tree/main -> "org/model"
+      - https://huggingface.co/org/model/blob/main/config.json?x=1 -> "org/model"
     """
-    if "huggingface.co/" in url:
-        clean_url = url.rstrip("/")
-        # Remove /tree/main or similar suffixes
-        if "/tree/" in clean_url:
-            clean_url = clean_url.split("/tree/")[0]
-        parts = clean_url.split("/")
-        if len(parts) >= 4:
-            return "/".join(parts[3:])
-    raise ValueError(f"Invalid Hugging Face URL: {url}")
+    return extract_model_ref(url)[0]
+
+
+def is_commit_sha(revision: str) -> bool:
+    """True for a full commit id: content under it can never change."""
+    return len(revision) == 40 and all(c in "0123456789abcdef" for c in revision)
+
+
+def pinned_revision(model_info: Dict[str, Any], revision: str) -> str:
+    """The commit sha the info payload resolved ``revision`` to (else ``revision``)."""
+    sha = model_info.get("sha")
+    return sha if isinstance(sha, str) and is_commit_sha(sha) else revision
+
+
+def _cache_kind(kind: str, revision: str) -> str:
+    # Anything addressed by commit sha is immutable and cached without expiry. This
+    # is a cache TTL class only: requests are still hedged by their own kind.
+    return "pinned" if is_commit_sha(revision) else kind
 
 
-def fetch_readme_content(model_id: str, token: Optional[str] = None) -> str:
-    """Retrieve README content (best-effort; never raises)."""
+def readme_byte_limit() -> Optional[int]:
+    """README download ceiling: $ACME_README_MAX_BYTES (default 256 KiB; 0 = unbounded).
+
+    Analysis only needs a prefix (the LLM prompt takes 2000 chars), so huge model
+    cards full of tables and inline images are cut off at the source.
+    """
+    limit = env_int("ACME_README_MAX_BYTES", 256 * 1024)
+    return limit if limit > 0 else None
+
+
+def readme_analysis_artifact(analyzer: str) -> str:
+    """Artifact name of a README analysis: the analyzer and the byte ceiling it read."""
+    return f"readme_analysis:{analyzer}:{readme_byte_limit() or 'full'}"
+
+
+def fetch_readme_content(
+    model_id: str, token: Optional[str] = None, filename: str = "README.md", revision: str = "main"
+) -> str:
+    """Retrieve ``filename`` (see readme_filename) at ``revision``, at most
+    readme_byte_limit() bytes.
+
+    One request; best-effort, never raises.
+    """
     try:
-        r = requests.get(
-            f"https://huggingface.co/{model_id}/raw/main/README.md",
+        r = http_get(
+            f"{hf_endpoint()}/{model_id}/raw/{quote(revision, safe='')}/{quote(filename)}",
             timeout=10,
             headers=_headers(token),
+            cache_kind=_cache_kind("readme", revision),
+            max_bytes=readme_byte_limit(),
+            hedge_kind="readme",
         )
         # network-only latency
-        global _last_net_ms_readme
-        _last_net_ms_readme = _elapsed_ms(r) if r is not None else 1
+        _net_ms.readme = _elapsed_ms(r) if r is not None else 1
         if r.status_code == 200:
             return r.text
-        r = requests.get(
-            f"https://huggingface.co/{model_id}/raw/main/README",
-            timeout=10,
-            headers=_headers(token),
-        )
-        _last_net_ms_readme = _elapsed_ms(r) if r is not None else 1
-        if r.status_code == 200:
-            return r.text
-        logger.info(f"No README found for {model_id} (last status {r.status_code})")
+        logger.info(f"No README found for {model_id} ({filename}: HTTP {r.status_code})")
         return ""
     except requests.RequestException as e:
-        _last_net_ms_readme = 0
+        _net_ms.readme = 0
         logger.warning(f"Failed to fetch README for {model_id}: {e}")
         return ""
 
 
-def fetch_model_info(model_id: str, token: Optional[str] = None) -> Dict[str, Any]:
+# Top-level README names in order of preference (matched case-insensitively)
+_README_NAMES = ("readme.md", "readme")
+
+
+def readme_filename(model_info: Dict[str, Any]) -> Optional[str]:
+    """README to fetch according to the siblings listing in ``model_info``.
+
+    Returns None when the listing shows no README (no request needed), and
+    "README.md" when there is no listing to consult.
+    """
+    siblings = model_info.get("siblings")
+    if not isinstance(siblings, list):
+        return "README.md"
+    names: List[str] = [
+        f["rfilename"]
+        for f in siblings
+        if isinstance(f, dict) and isinstance(f.get("rfilename"), str) and "/" not in f["rfilename"]
+    ]
+    by_lower = {n.lower(): n for n in names}
+    for want in _README_NAMES:
+        if want in by_lower:
+            return by_lower[want]
+    return next((n for n in names if n.lower().startswith("readme.")), None)
+
+
+def model_info_url(model_id: str, revision: str = "main") -> str:
+    """Model endpoint URL asking for sibling blob sizes (one-request snapshot)."""
+    if revision == "main":
+        return f"{hf_api_base()}/models/{model_id}?blobs=true"
+    return f"{hf_api_base()}/models/{model_id}/revision/{quote(revision, safe='')}?blobs=true"
+
+
+def files_from_siblings(model_info: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Return ``siblings`` when every entry carries a size, else None (use the tree)."""
+    siblings = model_info.get("siblings")
+    if not isinstance(siblings, list) or not siblings:
+        return None
+    for f in siblings:
+        if not isinstance(f, dict) or not isinstance(f.get("size"), int):
+            return None
+    return siblings
+
+
+def fetch_model_info(
+    model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Dict[str, Any]:
     """
-    Authoritative existence check. Raises ModelLookupError on non-200.
+    Authoritative existence check. Raises ModelLookupError on non-200; 401/403/404
+    answers are remembered in the negative cache and replayed without a request.
+    The payload includes siblings with blob sizes, which usually makes
+    the tree walk (fetch_tree_size) unnecessary, and the commit ``sha`` that
+    ``revision`` currently resolves to (see pinned_revision).
     """
-    url = f"{HF_API_BASE}/models/{model_id}"
+    known_bad = cached_lookup_error(model_id, token, revision)
+    if known_bad is not None:
+        _net_ms.info = 1
+        raise known_bad
+    url = model_info_url(model_id, revision)
     try:
-        r = requests.get(url, timeout=10, headers=_headers(token))
+        r = http_get(url, timeout=10, headers=_headers(token), cache_kind="info")
         # capture network-only
-        global _last_net_ms_info
-        _last_net_ms_info = _elapsed_ms(r) if r is not None else 1
+        _net_ms.info = _elapsed_ms(r) if r is not None else 1
         if r.status_code != 200:
-            raise ModelLookupError(model_id, r.status_code, r.reason or "error")
+            err = ModelLookupError(model_id, r.status_code, r.reason or "error")
+            remember_lookup_error(err, token, revision)
+            raise err
         data = r.json()
         if not isinstance(data, dict):
             raise ModelLookupError(model_id, 500, "unexpected JSON payload")
         return data
     except requests.RequestException as e:
-        _last_net_ms_info = 0
+        _net_ms.info = 0
         raise RuntimeError(f"network error contacting HF for {model_id}: {e}") from e
 
 
+def model_sha_url(model_id: str, revision: str = "main") -> str:
+    """Smallest model endpoint: only the commit sha ``revision`` resolves to."""
+    return model_info_url(model_id, revision).split("?", 1)[0] + "?expand%5B%5D=sha"
+
+
+def fetch_model_sha(
+    model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Optional[str]:
+    """Current commit sha of ``revision``, always asked live (None if it can't be told)."""
+    if is_commit_sha(revision):
+        return revision
+    try:
+        r = http_get(model_sha_url(model_id, revision), timeout=10, headers=_headers(token))
+        data = r.json() if r.status_code == 200 else None
+    except (requests.RequestException, ValueError) as e:
+        logger.info(f"sha check failed for {model_id}: {e}")
+        return None
+    return (pinned_revision(data, "") or None) if isinstance(data, dict) else None
+
+
+# Fields the listing must expand to stand in for a per-model info payload
+LISTING_EXPAND = ("downloads", "likes", "cardData", "lastModified", "tags", "siblings", "sha")
+
+
+def model_listing_url(author: Optional[str] = None, search: Optional[str] = None) -> str:
+    """First page of the model listing for ``author`` and/or ``search``."""
+    params: List[Tuple[str, str]] = [("limit", str(max(1, env_int("ACME_LISTING_PAGE_SIZE", 100))))]
+    if author:
+        params.append(("author", author))
+    if search:
+        params.append(("search", search))
+    params.extend(("expand[]", field) for field in LISTING_EXPAND)
+    return f"{hf_api_base()}/models?{urlencode(params)}"
+
+
+def iter_model_listing(
+    author: Optional[str] = None, search: Optional[str] = None, token: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield model entries from the HF listing, one page at a time.
+
+    Pages are requested lazily as the consumer iterates (Link rel="next" cursor), and
+    each entry carries the LISTING_EXPAND fields so it can be used as ``model_info``.
+    Raises RuntimeError when a page cannot be fetched.
+    """
+    url: Optional[str] = model_listing_url(author, search)
+    while url:
+        try:
+            r = http_get(url, timeout=30, headers=_headers(token))
+            if r.status_code != 200:
+                raise RuntimeError(f"model listing failed: HTTP {r.status_code} for {url}")
+            page = r.json()
+        except (requests.RequestException, ValueError) as e:
+            raise RuntimeError(f"model listing failed: {e}") from e
+        for entry in page if isinstance(page, list) else []:
+            if isinstance(entry, dict) and isinstance(entry.get("id"), str):
+                yield entry
+        links = getattr(r, "links", None) or {}
+        url = links.get("next", {}).get("url") if isinstance(links, dict) else None
+
+
 def fetch_model_files(model_id: str, token: Optional[str] = None) -> List[Dict[str, Any]]:
     """Best-effort file listing. Returns [] on failure."""
     try:
-        r = requests.get(
-            f"{HF_API_BASE}/models/{model_id}/tree/main", timeout=10, headers=_headers(token)
+        r = http_get(
+            f"{hf_api_base()}/models/{model_id}/tree/main",
+            timeout=10,
+            headers=_headers(token),
+            cache_kind="tree",
         )
-        global _last_net_ms_files
-        _last_net_ms_files = _elapsed_ms(r) if r is not None else 1
+        _net_ms.files = _elapsed_ms(r) if r is not None else 1
         if r.status_code == 200:
             data = r.json()
             return data if isinstance(data, list) else []
         logger.info(f"model files listing not available for {model_id}: HTTP {r.status_code}")
         return []
     except requests.RequestException as e:
-        _last_net_ms_files = 0
+        _net_ms.files = 0
         logger.warning(f"Failed to fetch model files for {model_id}: {e}")
         return []
 
 
+def _tree_page(
+    url: str, token: Optional[str], cache_kind: str = "tree"
+) -> Tuple[int, List[str], Optional[str]]:
+    """Fetch one tree page; return (bytes of its files, its directory paths, next page URL)."""
+    try:
+        r = http_get(
+            url, timeout=10, headers=_headers(token), cache_kind=cache_kind, hedge_kind="tree"
+        )
+        if r.status_code != 200:
+            logger.info(f"tree page not available ({url}): HTTP {r.status_code}")
+            return 0, [], None
+        entries = r.json()
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Failed to fetch tree page {url}: {e}")
+        return 0, [], None
+    size, dirs = tally_tree_entries(entries)
+    links = getattr(r, "links", None) or {}
+    next_url = links.get("next", {}).get("url") if isinstance(links, dict) else None
+    return size, dirs, next_url
+
+
+def tally_tree_entries(entries: Any) -> Tuple[int, List[str]]:
+    """Sum file sizes on one tree page and collect its subdirectory paths."""
+    size, dirs = 0, []
+    for e in entries if isinstance(entries, list) else []:
+        if not isinstance(e, dict):
+            continue
+        if e.get("type") == "directory" and isinstance(e.get("path"), str):
+            dirs.append(e["path"])
+        elif isinstance(e.get("size"), int):
+            size += e["size"]
+    return size, dirs
+
+
+def fetch_tree_size(model_id: str, token: Optional[str] = None, revision: str = "main") -> int:
+    """Total bytes under ``revision``, walking subdirectories and pages concurrently.
+
+    Follows ``Link: rel="next"`` cursors and descends at most $ACME_TREE_MAX_DEPTH
+    levels (default 6) with up to $ACME_TREE_CONCURRENCY pages in flight (default 8).
+    Sizes are summed per page as they arrive; only the unvisited frontier is kept.
+    Best-effort: unreadable pages are skipped, 0 means nothing could be listed.
+    """
+    max_depth = max(0, env_int("ACME_TREE_MAX_DEPTH", 6))
+    width = max(1, env_int("ACME_TREE_CONCURRENCY", 8))
+    base = f"{hf_api_base()}/models/{model_id}/tree/{quote(revision, safe='')}"
+    kind = _cache_kind("tree", revision)
+    frontier: List[Tuple[str, int]] = [(base, 0)]
+    inflight: Dict["cf.Future[Tuple[int, List[str], Optional[str]]]", int] = {}
+    total = 0
+    t0 = time.perf_counter()
+    while frontier or inflight:
+        while frontier and len(inflight) < width:
+            url, depth = frontier.pop()
+            inflight[_submit(_tree_page, url, token, kind)] = depth
+        done, _ = cf.wait(inflight, return_when=cf.FIRST_COMPLETED)
+        for fut in done:
+            depth = inflight.pop(fut)
+            size, dirs, next_url = fut.result()
+            total += size
+            if next_url:
+                frontier.append((next_url, depth))
+            if depth < max_depth:
+                frontier.extend((f"{base}/{quote(d)}", depth + 1) for d in dirs)
+    _net_ms.files = int((time.perf_counter() - t0) * 1000) or 1
+    return total
+
+
 def calculate_model_size(files_data: List[Dict[str, Any]]) -> int:
     total_size = 0
     for file_info in files_data:
@@ -194,24 +551,109 @@ def get_days_since_update(model_info: Dict[str, Any]) -> int:
         return 365
 
 
-def build_context_from_api(url: str, token: Optional[str] = None) -> Dict[str, Any]:
+def build_context_from_api(
+    url: str, token: Optional[str] = None, model_info: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Build context strictly from HF API data.
     Raises ModelLookupError on 401/403/404/etc. (no silent fallback).
+    ``model_info`` (e.g. an iter_model_listing entry) replaces the info call.
+
+    The revision named by the URL (default main) is resolved to a commit sha
+    once, by the info call; the tree and README are then fetched at that sha, so
+    they describe the same snapshot and are cached without expiry.
     """
-    model_id = extract_model_id(url)
+    model_id, revision = extract_model_ref(url)
     logger.info(f"Fetching data for model: {model_id}")
 
-    lat: Dict[str, int] = {}
+    # Fetch core model metadata (network-only latency from response.elapsed).
+    # It gates existence and its listing names the README, so it goes first.
+    listed = model_info is not None
+    if model_info is None:
+        info, lat_api_info = run_in(
+            "hf", _timed_fetch, fetch_model_info, "info", model_id, token, revision=revision
+        )
+        model_info = info
+    else:
+        lat_api_info = 1  # already paid for by the listing page
+    revision = pinned_revision(model_info, revision)
+
+    # At most one README request (none when the listing shows there isn't one),
+    # overlapping with the tree fallback below
+    readme_name = readme_filename(model_info)
+    readme_fut = None
+    if readme_name is not None:
+        readme_fut = _submit(
+            _timed_fetch,
+            fetch_readme_content,
+            "readme",
+            model_id,
+            token,
+            filename=readme_name,
+            revision=revision,
+        )
 
-    # Fetch core model metadata (network-only latency from response.elapsed)
-    model_info = fetch_model_info(model_id, token=token)  # may raise ModelLookupError
-    lat_api_info = _last_net_ms_info or 1
+    # File sizes normally arrive with the info snapshot; the tree is only a fallback.
+    # Listing entries carry no sizes: one ?blobs=true info call beats walking the tree.
+    sibling_files = files_from_siblings(model_info)
+    lat_api_files = lat_api_info
+    if sibling_files is None and listed:
+        sized, lat_api_files = run_in(
+            "hf", _timed_fetch, fetch_model_info, "info", model_id, token, revision=revision
+        )
+        sibling_files = files_from_siblings(sized)
+    if sibling_files is not None:
+        files_data = sibling_files
+    else:
+        tree_bytes, lat_api_files = _timed_fetch(
+            fetch_tree_size, "files", model_id, token, revision=revision
+        )
+        # One synthetic entry carrying the walked total (empty -> size fallback)
+        files_data = [{"size": tree_bytes}] if tree_bytes else []
 
-    # Fetch file listing (network-only)
-    files_data = fetch_model_files(model_id, token=token)
-    lat_api_files = _last_net_ms_files or 1
+    # Readme fetch (network-only)
+    readme_content, lat_readme = readme_fut.result() if readme_fut is not None else ("", 1)
 
+    # The README analysis may wait on the llm stage, so it runs here rather than
+    # holding a cpu worker; the rest of the context is CPU work
+    t0 = time.perf_counter()
+    docs = estimate_docs_quality(
+        model_info, readme_content, model_id, pinned_revision(model_info, "")
+    )
+    lat_docs = int((time.perf_counter() - t0) * 1000) or 1
+    return run_in(
+        "cpu",
+        context_from_fetches,
+        model_id,
+        model_info,
+        files_data,
+        readme_content,
+        lat_api_info,
+        lat_api_files,
+        lat_readme,
+        docs=docs,
+        lat_docs=lat_docs,
+    )
+
+
+def context_from_fetches(
+    model_id: str,
+    model_info: Dict[str, Any],
+    files_data: List[Dict[str, Any]],
+    readme_content: str,
+    lat_api_info: int,
+    lat_api_files: int,
+    lat_readme: int,
+    docs: Optional[Dict[str, float]] = None,
+    lat_docs: int = 0,
+) -> Dict[str, Any]:
+    """Derive the scoring context from already-fetched API data.
+
+    Shared by the threaded and asyncio paths. Pass ``docs``/``lat_docs`` when the
+    README analysis was done by the caller (e.g. with an async LLM call).
+    ``context["sha"]`` is the commit the data describes ("" when unknown).
+    """
+    sha = pinned_revision(model_info, "")
     # Compute total size
     t0 = time.perf_counter()
     total_bytes = calculate_model_size(files_data) if files_data else 50_000_000
@@ -227,14 +669,11 @@ def build_context_from_api(url: str, token: Optional[str] = None) -> Dict[str, A
 
     days_since_update = get_days_since_update(model_info)
 
-    # Readme fetch (network-only)
-    readme_content = fetch_readme_content(model_id, token=token)
-    lat_readme = _last_net_ms_readme or 1
-
     # Heuristics and analysis
-    t0 = time.perf_counter()
-    docs = estimate_docs_quality(model_info, readme_content, model_id)
-    lat_docs = int((time.perf_counter() - t0) * 1000) or 1
+    if docs is None:
+        t0 = time.perf_counter()
+        docs = estimate_docs_quality(model_info, readme_content, model_id, sha)
+        lat_docs = int((time.perf_counter() - t0) * 1000) or 1
 
     t0 = time.perf_counter()
     contributors = estimate_contributors(model_info)
@@ -261,7 +700,7 @@ def build_context_from_api(url: str, token: Optional[str] = None) -> Dict[str, A
     lat_perf = int((time.perf_counter() - t0) * 1000) or 1
 
     # Attach per-metric outward latencies (including API/IO where relevant)
-    lat = {
+    lat: Dict[str, int] = {
         "size_score_latency": lat_api_files + lat_size_calc,
         "license_latency": lat_api_info + lat_license_parse,
         "ramp_up_time_latency": lat_readme + lat_docs,
@@ -273,6 +712,7 @@ def build_context_from_api(url: str, token: Optional[str] = None) -> Dict[str, A
     }
 
     context = {
+        "sha": sha,
         "total_bytes": total_bytes,
         "license_text": license_text,
         "downloads": downloads,
@@ -298,10 +738,28 @@ def build_context_from_api(url: str, token: Optional[str] = None) -> Dict[str, A
 
 
 def estimate_docs_quality(
-    model_info: Dict[str, Any], readme_content: str = "", model_id: str = ""
+    model_info: Dict[str, Any], readme_content: str = "", model_id: str = "", sha: str = ""
 ) -> Dict[str, float]:
-    from ..llm_analysis import analyze_readme_with_llm
+    """Documentation signals; the README analysis is reused across runs per commit ``sha``."""
+    from ..llm_analysis import analysis_stage, analysis_tag, analyze_readme_tagged
 
+    base = docs_popularity_base(model_info)
+    if readme_content and model_id:
+        try:
+            llm = load_artifact(model_id, sha, readme_analysis_artifact(analysis_tag()))
+            if llm is None:
+                llm, analyzer = run_in(
+                    analysis_stage(), analyze_readme_tagged, readme_content, model_id
+                )
+                save_artifact(model_id, sha, readme_analysis_artifact(analyzer), llm)
+            apply_llm_docs_signals(base, llm)
+        except Exception as e:
+            logger.warning(f"LLM enhancement failed for {model_id}: {e}")
+    return base
+
+
+def docs_popularity_base(model_info: Dict[str, Any]) -> Dict[str, float]:
+    """Popularity-only documentation signals (before any README analysis)."""
     downloads = int(model_info.get("downloads", 0) or 0)
     likes = int(model_info.get("likes", 0) or 0)
     # Calibrated popularity metric with higher headroom
@@ -310,26 +768,24 @@ def estimate_docs_quality(
     d_term = (_math.log1p(max(0, downloads)) / _math.log1p(5_000_000)) if downloads else 0.0
     l_term = (_math.log1p(max(0, likes)) / _math.log1p(100_000)) if likes else 0.0
     popularity_score = max(0.0, min(1.0, 0.65 * d_term + 0.35 * l_term))
-    base = {
+    return {
         "readme": min(1.0, 0.50 + popularity_score * 0.50),
         "quickstart": min(1.0, 0.10 + popularity_score * 0.60),
         "tutorials": min(1.0, 0.05 + popularity_score * 0.55),
         "api_docs": min(1.0, 0.05 + popularity_score * 0.60),
         "reproducibility": min(1.0, popularity_score * 0.50),
     }
-    if readme_content and model_id:
-        try:
-            llm = analyze_readme_with_llm(readme_content, model_id)
-            base["readme"] = base["readme"] * 0.6 + llm.get("documentation_quality", 0.0) * 0.4
-            if llm.get("installation_instructions", False):
-                base["quickstart"] = min(1.0, base["quickstart"] + 0.1)
-            if llm.get("usage_examples", False):
-                base["tutorials"] = min(1.0, base["tutorials"] + 0.15)
-            if llm.get("code_blocks_count", 0) >= 2:
-                base["api_docs"] = min(1.0, base["api_docs"] + 0.1)
-        except Exception as e:
-            logger.warning(f"LLM enhancement failed for {model_id}: {e}")
-    return base
+
+
+def apply_llm_docs_signals(base: Dict[str, float], llm: Dict[str, Any]) -> None:
+    """Blend README analysis results into the documentation signals in place."""
+    base["readme"] = base["readme"] * 0.6 + llm.get("documentation_quality", 0.0) * 0.4
+    if llm.get("installation_instructions", False):
+        base["quickstart"] = min(1.0, base["quickstart"] + 0.1)
+    if llm.get("usage_examples", False):
+        base["tutorials"] = min(1.0, base["tutorials"] + 0.15)
+    if llm.get("code_blocks_count", 0) >= 2:
+        base["api_docs"] = min(1.0, base["api_docs"] + 0.1)
 
 
 def estimate_contributors(model_info: Dict[str, Any]) -> int:
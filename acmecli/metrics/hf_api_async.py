@@ -0,0 +1,428 @@
+"""
+Asyncio counterparts of the HuggingFace fetchers and context builder.
+
+Same endpoints, error semantics and context shape as hf_api; each fetcher takes an
+aiohttp-style session and returns (result, network ms) instead of writing timings
+to thread-local state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, cast
+from urllib.parse import quote
+
+from requests.utils import parse_header_links
+
+from ..endpoints import awith_failover, can_fail_over, hf_endpoint, note_origin
+from ..env import env_int
+from ..hedge import ahedged, hedging_enabled
+from ..http_cache import get_cache
+from ..http_client import async_connect_errors, async_network_errors
+from ..ratelimit import THROTTLE_STATUSES, get_limiter, parse_retry_after, throttle_retries
+from ..replay import areplayable
+from ..retry import acall_with_retries, clamp_timeout
+from ..singleflight import AsyncGroup
+from ..stages import arun_in, aslot
+from .hf_api import (
+    ModelLookupError,
+    _cache_kind,
+    _headers,
+    apply_llm_docs_signals,
+    cached_lookup_error,
+    context_from_fetches,
+    docs_popularity_base,
+    extract_model_ref,
+    files_from_siblings,
+    hf_api_base,
+    is_commit_sha,
+    load_artifact,
+    model_info_url,
+    model_sha_url,
+    pinned_revision,
+    readme_analysis_artifact,
+    readme_byte_limit,
+    readme_filename,
+    remember_lookup_error,
+    save_artifact,
+    tally_tree_entries,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Coalesces identical in-flight fetches on the event loop (see singleflight)
+_inflight: AsyncGroup[Any] = AsyncGroup()
+
+
+async def _coalesced(key: Tuple[Any, ...], fn: Callable[[], Awaitable[T]]) -> T:
+    return cast(T, await _inflight.do(key, fn))
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    return next((v for k, v in headers.items() if k.lower() == name.lower()), None)
+
+
+async def _aget(
+    session: Any,
+    url: str,
+    headers: Dict[str, str],
+    timeout: float = 10,
+    cache_kind: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    hedge_kind: Optional[str] = None,
+) -> Tuple[int, str, str, int]:
+    """GET ``url``; return (status, reason, body text, elapsed ms)."""
+    status, reason, body, ms, _ = await _aget_full(
+        session, url, headers, timeout, cache_kind, max_bytes, hedge_kind
+    )
+    return status, reason, body, ms
+
+
+async def _aread_bounded(r: Any, max_bytes: int) -> Tuple[str, bool]:
+    """Read at most ``max_bytes`` of ``r``'s body; return (text, more was left unread)."""
+    buf = bytearray()
+    while len(buf) <= max_bytes:
+        chunk = await r.content.read(max_bytes + 1 - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf[:max_bytes]).decode("utf-8", errors="replace"), len(buf) > max_bytes
+
+
+async def _aget_full(
+    session: Any,
+    url: str,
+    headers: Dict[str, str],
+    timeout: float = 10,
+    cache_kind: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    hedge_kind: Optional[str] = None,
+) -> Tuple[int, str, str, int, Dict[str, str]]:
+    """Like _aget but also returns the response headers.
+
+    ``max_bytes`` bounds the body like http_client.read_bounded (Range request,
+    206 reported as 200, 416 as an empty 200, unread rest dropped).
+
+    Honours the on-disk response cache, rate limiter, retry policy, hedging and
+    record/replay like http_client.http_get.
+    """
+    return await areplayable(
+        "GET",
+        url,
+        None,
+        lambda: _aget_live(session, url, headers, timeout, cache_kind, max_bytes, hedge_kind),
+    )
+
+
+async def _aget_live(
+    session: Any,
+    url: str,
+    headers: Dict[str, str],
+    timeout: float,
+    cache_kind: Optional[str],
+    max_bytes: Optional[int],
+    hedge_kind: Optional[str] = None,
+) -> Tuple[int, str, str, int, Dict[str, str]]:
+    cache = get_cache() if cache_kind else None
+    hedge_key = hedge_kind or cache_kind
+    key, entry = "", None
+    if max_bytes is not None:
+        headers = {**headers, "Range": f"bytes=0-{max(1, max_bytes) - 1}"}
+    req_headers = dict(headers)
+    # Cache files are read and written on the hf stage, off the event loop
+    if cache is not None and cache_kind is not None:
+        key = cache.key(url, headers)
+        entry = await arun_in("hf", cache.load, key)
+        if entry is not None and cache.is_fresh(entry, cache_kind):
+            cache.count("hits")
+            await arun_in("hf", cache.note_access, key)
+            note_origin("cache")
+            return 200, "OK", str(entry.get("body", "")), 1, dict(entry.get("headers", {}))
+        if entry is not None:
+            req_headers.update(cache.validators(entry))
+
+    async def _do(u: str) -> Tuple[int, str, str, Dict[str, str]]:
+        async with session.get(u, headers=req_headers) as r:
+            status, reason = int(r.status), str(r.reason or "")
+            resp_headers = dict(getattr(r, "headers", {}))
+            if max_bytes is None:
+                body = str(await r.text()) if status != 304 else ""
+                return status, reason, body, resp_headers
+            if status == 416:
+                return 200, "OK", "", resp_headers
+            body, truncated = await _aread_bounded(r, max_bytes)
+            if truncated:
+                r.close()
+            return (200 if status == 206 else status), reason, body, resp_headers
+
+    async def _attempt(u: str) -> Tuple[int, str, str, Dict[str, str], int]:
+        # Same shared limiter and 429/Retry-After handling as http_client.rate_limited
+        limiter = get_limiter(u)
+        attempts = throttle_retries() + 1 if limiter is not None else 1
+        for attempt in range(attempts):
+            if limiter is not None:
+                await limiter.aacquire()
+            t0 = time.perf_counter()
+            try:
+                status, reason, body, resp_headers = await asyncio.wait_for(
+                    _do(u), clamp_timeout(timeout)
+                )
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(None)
+                raise
+            ms = max(1, int((time.perf_counter() - t0) * 1000))
+            throttled = status in THROTTLE_STATUSES
+            if limiter is not None:
+                retry_after = _header(resp_headers, "Retry-After") if throttled else None
+                limiter.release(status, parse_retry_after(retry_after))
+            if not throttled or attempt == attempts - 1:
+                break
+        return status, reason, body, resp_headers, ms
+
+    async def _hedged_attempt(u: str) -> Tuple[int, str, str, Dict[str, str], int]:
+        if hedge_key is not None and hedging_enabled(hedge_key):
+            return await ahedged(hedge_key, lambda: _attempt(u))
+        return await _attempt(u)
+
+    async def _retried(u: str) -> Tuple[int, str, str, Dict[str, str], int]:
+        # An unreachable mirror is left to failover rather than retried
+        fail_fast = async_connect_errors() if can_fail_over(u) else ()
+        return await acall_with_retries(
+            u, lambda: _hedged_attempt(u), lambda res: res[0], async_network_errors(), fail_fast
+        )
+
+    status, reason, body, resp_headers, ms = await awith_failover(
+        url, _retried, lambda res: res[0], lambda res: res[4], async_network_errors()
+    )
+    if cache is not None:
+        if status == 304 and entry is not None:
+            cache.count("revalidated")
+            await arun_in("hf", cache.mark_revalidated, key, entry)
+            return 200, "OK", str(entry.get("body", "")), ms, dict(entry.get("headers", {}))
+        cache.count("misses")
+        if status == 200:
+            await arun_in("hf", cache.save, key, url, resp_headers, body)
+    return status, reason, body, ms, resp_headers
+
+
+async def afetch_model_info(
+    session: Any, model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Authoritative existence check. Raises ModelLookupError on non-200
+    (negative cache as in fetch_model_info).
+    """
+    known_bad = await arun_in("hf", cached_lookup_error, model_id, token, revision)
+    if known_bad is not None:
+        raise known_bad
+    url = model_info_url(model_id, revision)
+    try:
+        status, reason, body, ms = await _aget(session, url, _headers(token), cache_kind="info")
+        if status != 200:
+            err = ModelLookupError(model_id, status, reason or "error")
+            await arun_in("hf", remember_lookup_error, err, token, revision)
+            raise err
+        data = json.loads(body)
+    except async_network_errors() as e:
+        raise RuntimeError(f"network error contacting HF for {model_id}: {e}") from e
+    except ValueError as e:
+        raise RuntimeError(f"network error contacting HF for {model_id}: {e}") from e
+    if not isinstance(data, dict):
+        raise ModelLookupError(model_id, 500, "unexpected JSON payload")
+    return data, ms
+
+
+async def afetch_model_sha(
+    session: Any, model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Optional[str]:
+    """Async fetch_model_sha (uncached; None if the sha can't be told)."""
+    if is_commit_sha(revision):
+        return revision
+    try:
+        status, _, body, _ = await _aget(
+            session, model_sha_url(model_id, revision), _headers(token)
+        )
+        data = json.loads(body) if status == 200 else None
+    except (ValueError,) + async_network_errors() as e:
+        logger.info(f"sha check failed for {model_id}: {e}")
+        return None
+    return (pinned_revision(data, "") or None) if isinstance(data, dict) else None
+
+
+async def _atree_page(
+    session: Any, url: str, token: Optional[str], cache_kind: str = "tree"
+) -> Tuple[int, List[str], Optional[str]]:
+    """Async _tree_page: (bytes of the page's files, its directories, next page URL)."""
+    try:
+        status, _, body, _, headers = await _aget_full(
+            session, url, _headers(token), cache_kind=cache_kind, hedge_kind="tree"
+        )
+        if status != 200:
+            logger.info(f"tree page not available ({url}): HTTP {status}")
+            return 0, [], None
+        entries = json.loads(body)
+    except (ValueError,) + async_network_errors() as e:
+        logger.warning(f"Failed to fetch tree page {url}: {e}")
+        return 0, [], None
+    size, dirs = tally_tree_entries(entries)
+    link = _header(headers, "Link") or ""
+    next_url = next(
+        (ln.get("url") for ln in parse_header_links(link) if ln.get("rel") == "next"), None
+    )
+    return size, dirs, next_url
+
+
+async def afetch_tree_size(
+    session: Any, model_id: str, token: Optional[str] = None, revision: str = "main"
+) -> Tuple[int, int]:
+    """Async fetch_tree_size; returns (total bytes, elapsed ms)."""
+    max_depth = max(0, env_int("ACME_TREE_MAX_DEPTH", 6))
+    width = max(1, env_int("ACME_TREE_CONCURRENCY", 8))
+    base = f"{hf_api_base()}/models/{model_id}/tree/{quote(revision, safe='')}"
+    kind = _cache_kind("tree", revision)
+    frontier: List[Tuple[str, int]] = [(base, 0)]
+    inflight: Dict["asyncio.Future[Tuple[int, List[str], Optional[str]]]", int] = {}
+    total = 0
+    t0 = time.perf_counter()
+    while frontier or inflight:
+        while frontier and len(inflight) < width:
+            url, depth = frontier.pop()
+            inflight[asyncio.ensure_future(_atree_page(session, url, token, kind))] = depth
+        done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+        for fut in done:
+            depth = inflight.pop(fut)
+            size, dirs, next_url = fut.result()
+            total += size
+            if next_url:
+                frontier.append((next_url, depth))
+            if depth < max_depth:
+                frontier.extend((f"{base}/{quote(d)}", depth + 1) for d in dirs)
+    return total, int((time.perf_counter() - t0) * 1000) or 1
+
+
+async def afetch_readme_content(
+    session: Any,
+    model_id: str,
+    token: Optional[str] = None,
+    filename: str = "README.md",
+    revision: str = "main",
+) -> Tuple[str, int]:
+    """Async fetch_readme_content: one bounded request (best-effort; never raises)."""
+    url = f"{hf_endpoint()}/{model_id}/raw/{quote(revision, safe='')}/{quote(filename)}"
+    try:
+        status, _, body, ms = await _aget(
+            session,
+            url,
+            _headers(token),
+            cache_kind=_cache_kind("readme", revision),
+            max_bytes=readme_byte_limit(),
+            hedge_kind="readme",
+        )
+    except async_network_errors() as e:
+        logger.warning(f"Failed to fetch README for {model_id}: {e}")
+        return "", 0
+    if status == 200:
+        return body, ms
+    logger.info(f"No README found for {model_id} ({filename}: HTTP {status})")
+    return "", ms
+
+
+async def abuild_context_from_api(
+    session: Any,
+    url: str,
+    token: Optional[str] = None,
+    model_info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Asyncio build_context_from_api: same fetch plan and context, one event loop.
+    Raises ModelLookupError on 401/403/404/etc. (no silent fallback).
+    ``model_info`` (e.g. a listing entry) replaces the info call.
+    Tree and README are fetched at the commit sha the info call resolved.
+    """
+    from ..llm_analysis import aanalyze_readme_tagged, analysis_stage, analysis_tag
+
+    model_id, revision = extract_model_ref(url)
+    logger.info(f"Fetching data for model: {model_id}")
+
+    # The info call gates existence and names the README, so it goes first
+    listed = model_info is not None
+    if model_info is None:
+        info, lat_api_info = await _coalesced(
+            ("info", model_id, token, revision),
+            lambda: afetch_model_info(session, model_id, token, revision),
+        )
+        model_info = info
+    else:
+        lat_api_info = 1  # already paid for by the listing page
+    revision = pinned_revision(model_info, revision)
+    readme_name = readme_filename(model_info)
+    readme_task = None
+    if readme_name is not None:
+        readme_task = asyncio.ensure_future(
+            _coalesced(
+                ("readme", model_id, token, readme_name, revision),
+                lambda: afetch_readme_content(
+                    session, model_id, token, filename=readme_name, revision=revision
+                ),
+            )
+        )
+    # File sizes normally arrive with the info snapshot; the tree is only a fallback.
+    # Listing entries carry no sizes: one ?blobs=true info call beats walking the tree.
+    sibling_files = files_from_siblings(model_info)
+    lat_api_files = lat_api_info
+    if sibling_files is None and listed:
+        sized, lat_api_files = await _coalesced(
+            ("info", model_id, token, revision),
+            lambda: afetch_model_info(session, model_id, token, revision),
+        )
+        sibling_files = files_from_siblings(sized)
+    if sibling_files is not None:
+        files_data = sibling_files
+    else:
+        tree_bytes, lat_api_files = await _coalesced(
+            ("tree", model_id, token, revision),
+            lambda: afetch_tree_size(session, model_id, token, revision),
+        )
+        # One synthetic entry carrying the walked total (empty -> size fallback)
+        files_data = [{"size": tree_bytes}] if tree_bytes else []
+    readme_content, lat_readme = await readme_task if readme_task is not None else ("", 1)
+
+    t0 = time.perf_counter()
+    sha = pinned_revision(model_info, "")
+    docs = docs_popularity_base(model_info)
+    if readme_content and model_id:
+        try:
+            llm = await arun_in(
+                "hf", load_artifact, model_id, sha, readme_analysis_artifact(analysis_tag())
+            )
+            if llm is None:
+                # At most the llm stage's size of provider calls at once
+                async with aslot(analysis_stage()):
+                    llm, analyzer = await aanalyze_readme_tagged(session, readme_content, model_id)
+                await arun_in(
+                    "hf", save_artifact, model_id, sha, readme_analysis_artifact(analyzer), llm
+                )
+            apply_llm_docs_signals(docs, llm)
+        except Exception as e:
+            logger.warning(f"LLM enhancement failed for {model_id}: {e}")
+    lat_docs = int((time.perf_counter() - t0) * 1000) or 1
+
+    return await arun_in(
+        "cpu",
+        context_from_fetches,
+        model_id,
+        model_info,
+        files_data,
+        readme_content,
+        lat_api_info or 1,
+        lat_api_files or 1,
+        lat_readme or 1,
+        docs=docs,
+        lat_docs=lat_docs,
+    )
@@ -0,0 +1,431 @@
+"""
+Stand-in Hugging Face server for load and fault testing.
+
+Serves the endpoints acmecli calls (model info, revision info, file tree,
+raw README and the model listing) for a synthetic population of models, with
+injectable latency, throttling (429 + Retry-After), 5xx errors and slow bodies:
+
+    python -m acmecli.mock_hf --models 5000 --latency-ms 80 --rate-429 0.02 \\
+        --write-urls urls.txt
+    ./run urls.txt --hf-endpoint http://127.0.0.1:8765
+
+Models are named ``synthetic/model-00000`` ...; each one's metadata, files and
+README are derived from the seed, so runs are repeatable. Unknown models and
+revisions answer 404. Standard library only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, cast
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+_LICENSES = ("mit", "apache-2.0", "lgpl-2.1", "cc-by-nc-4.0", "")
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class SyntheticHub:
+    """Deterministic synthetic model population."""
+
+    def __init__(
+        self,
+        models: int = 1000,
+        seed: int = 0,
+        org: str = "synthetic",
+        files: int = 8,
+        readme_bytes: int = 4096,
+        blob_sizes: bool = True,
+    ) -> None:
+        self.models = max(0, models)
+        self.seed = seed
+        self.org = org
+        self.files = max(2, files)
+        self.readme_bytes = max(0, readme_bytes)
+        self.blob_sizes = blob_sizes
+
+    def model_ids(self) -> List[str]:
+        return [self._id(i) for i in range(self.models)]
+
+    def _id(self, i: int) -> str:
+        return f"{self.org}/model-{i:05d}"
+
+    def exists(self, model_id: str) -> bool:
+        org, _, name = model_id.partition("/")
+        if org != self.org or not name.startswith("model-"):
+            return False
+        index = name[len("model-") :]
+        return index.isdigit() and int(index) < self.models and self._id(int(index)) == model_id
+
+    def _rng(self, model_id: str) -> random.Random:
+        return random.Random(f"{self.seed}:{model_id}")
+
+    def sha(self, model_id: str) -> str:
+        return hashlib.sha1(f"{self.seed}:{model_id}".encode("utf-8")).hexdigest()
+
+    def file_list(self, model_id: str) -> List[Tuple[str, int]]:
+        """(path, size) of every file in the model's repository."""
+        rng = self._rng(model_id)
+        out = [("README.md", len(self.readme(model_id).encode("utf-8"))), ("config.json", 700)]
+        for k in range(self.files - 2):
+            out.append(
+                (f"weights/model-{k:05d}.safetensors", rng.randint(1_000_000, 2_000_000_000))
+            )
+        if rng.random() < 0.3:
+            out.append(("onnx/fp16/model.onnx", rng.randint(1_000_000, 500_000_000)))
+        return out
+
+    def info(self, model_id: str, blobs: bool) -> Dict[str, Any]:
+        rng = self._rng(model_id)
+        license_id = rng.choice(_LICENSES)
+        tags = ["transformers", "pytorch"] + ([f"license:{license_id}"] if license_id else [])
+        if rng.random() < 0.5:
+            tags.append("dataset:synthetic-corpus")
+        siblings: List[Dict[str, Any]] = []
+        for path, size in self.file_list(model_id):
+            entry: Dict[str, Any] = {"rfilename": path}
+            if blobs and self.blob_sizes:
+                entry["size"] = size
+            siblings.append(entry)
+        modified = _EPOCH - timedelta(days=rng.randint(0, 900))
+        return {
+            "id": model_id,
+            "modelId": model_id,
+            "sha": self.sha(model_id),
+            "downloads": int(10 ** rng.uniform(0, 7)),
+            "likes": int(10 ** rng.uniform(0, 4)),
+            "lastModified": modified.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "tags": tags,
+            "cardData": {"license": license_id} if license_id else {},
+            "siblings": siblings,
+        }
+
+    def tree(self, model_id: str, path: str) -> List[Dict[str, Any]]:
+        """Entries directly under ``path`` ("" = repository root)."""
+        prefix = f"{path}/" if path else ""
+        entries: Dict[str, Dict[str, Any]] = {}
+        for file_path, size in self.file_list(model_id):
+            if not file_path.startswith(prefix):
+                continue
+            head, sep, _ = file_path[len(prefix) :].partition("/")
+            if sep:
+                entries.setdefault(head, {"type": "directory", "path": prefix + head})
+            else:
+                entries[head] = {"type": "file", "path": file_path, "size": size}
+        return [entries[k] for k in sorted(entries)]
+
+    def readme(self, model_id: str) -> str:
+        rng = self._rng(model_id)
+        parts = [f"# {model_id.split('/')[-1]}\n", "A synthetic model for load testing.\n"]
+        if rng.random() < 0.7:
+            parts.append("## Installation\n\n```bash\npip install transformers\n```\n")
+        if rng.random() < 0.6:
+            parts.append(
+                "## Usage\n\n```python\nfrom transformers import pipeline\n"
+                f'pipe = pipeline("text-classification", model="{model_id}")\n```\n'
+            )
+        if rng.random() < 0.4:
+            parts.append("## Evaluation\n\n| benchmark | accuracy |\n|---|---|\n| glue | 0.87 |\n")
+        text = "\n".join(parts)
+        filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n"
+        while len(text) < self.readme_bytes:
+            text += filler
+        return text
+
+
+class Faults:
+    """Injected latency (log-normal around a median), throttling, errors and slow bodies."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.0,
+        rate_429: float = 0.0,
+        rate_5xx: float = 0.0,
+        retry_after: float = 1.0,
+        slow_body_rate: float = 0.0,
+        slow_body_ms: float = 50.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency_ms = max(0.0, latency_ms)
+        self.latency_sigma = max(0.0, latency_sigma)
+        self.rate_429 = min(1.0, max(0.0, rate_429))
+        self.rate_5xx = min(1.0, max(0.0, rate_5xx))
+        self.retry_after = max(0.0, retry_after)
+        self.slow_body_rate = min(1.0, max(0.0, slow_body_rate))
+        self.slow_body_ms = max(0.0, slow_body_ms)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Seconds to wait before answering."""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            z = self._rng.gauss(0.0, 1.0)
+        return self.latency_ms * math.exp(self.latency_sigma * z) / 1000
+
+    def error_status(self) -> Optional[int]:
+        """429, a 5xx, or None for a normal answer."""
+        with self._lock:
+            roll = self._rng.random()
+            if roll < self.rate_429:
+                return 429
+            if roll < self.rate_429 + self.rate_5xx:
+                return self._rng.choice((500, 502, 504))
+        return None
+
+    def slow_body(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.slow_body_rate
+
+
+class MockHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], hub: SyntheticHub, faults: Faults) -> None:
+        super().__init__(address, _Handler)
+        self.hub = hub
+        self.faults = faults
+        self.verbose = False
+        self.stats: Dict[int, int] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def count(self, status: int) -> None:
+        with self._stats_lock:
+            self.stats[status] = self.stats.get(status, 0) + 1
+
+
+def _page(items: List[Any], query: Dict[str, List[str]], default_limit: int) -> Tuple[Any, int]:
+    """(slice of ``items`` for the request's cursor/limit, next cursor or -1)."""
+    try:
+        start = max(0, int(query.get("cursor", ["0"])[0]))
+        limit = max(1, int(query.get("limit", [str(default_limit)])[0]))
+    except ValueError:
+        start, limit = 0, default_limit
+    end = start + limit
+    return items[start:end], end if end < len(items) else -1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    tree_page_size = 50
+
+    @property
+    def mock(self) -> MockHubServer:
+        return cast(MockHubServer, self.server)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.mock.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        faults = self.mock.faults
+        time.sleep(faults.delay())
+        status = faults.error_status()
+        if status == 429:
+            self._send(
+                429, b'{"error": "rate limited"}', {"Retry-After": f"{faults.retry_after:g}"}
+            )
+            return
+        if status is not None:
+            self._send(status, b'{"error": "injected failure"}')
+            return
+        self._route()
+
+    def _route(self) -> None:
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        segs = [unquote(s) for s in parts.path.split("/") if s]
+        hub = self.mock.hub
+        if segs[:2] == ["api", "models"] and len(segs) == 2:
+            self._listing(query)
+            return
+        if segs[:2] == ["api", "models"] and len(segs) >= 4:
+            model_id, rest = "/".join(segs[2:4]), segs[4:]
+            if not hub.exists(model_id):
+                self._not_found()
+            elif not rest:
+                self._json(hub.info(model_id, "blobs" in query))
+            elif rest[0] == "revision" and len(rest) == 2 and self._known_rev(model_id, rest[1]):
+                self._json(hub.info(model_id, "blobs" in query))
+            elif rest[0] == "tree" and len(rest) >= 2 and self._known_rev(model_id, rest[1]):
+                self._tree(model_id, "/".join(rest[2:]), query)
+            else:
+                self._not_found()
+            return
+        if len(segs) >= 5 and segs[2] == "raw":
+            model_id, rev, path = "/".join(segs[:2]), segs[3], "/".join(segs[4:])
+            if hub.exists(model_id) and self._known_rev(model_id, rev) and path == "README.md":
+                self._raw(hub.readme(model_id).encode("utf-8"))
+                return
+        self._not_found()
+
+    def _known_rev(self, model_id: str, rev: str) -> bool:
+        return rev in ("main", self.mock.hub.sha(model_id))
+
+    def _listing(self, query: Dict[str, List[str]]) -> None:
+        hub = self.mock.hub
+        author = query.get("author", [""])[0]
+        search = query.get("search", [""])[0]
+        ids = [
+            m
+            for m in hub.model_ids()
+            if (not author or m.split("/")[0] == author) and (not search or search in m)
+        ]
+        page, nxt = _page(ids, query, 100)
+        headers = {}
+        if nxt >= 0:
+            params = [(k, v) for k, vs in query.items() if k != "cursor" for v in vs]
+            params.append(("cursor", str(nxt)))
+            headers["Link"] = f'<{self._base()}/api/models?{urlencode(params)}>; rel="next"'
+        # Like the Hub, listing entries never carry blob sizes
+        self._json([hub.info(m, False) for m in page], headers)
+
+    def _tree(self, model_id: str, path: str, query: Dict[str, List[str]]) -> None:
+        entries = self.mock.hub.tree(model_id, path)
+        if path and not entries:
+            self._not_found()
+            return
+        page, nxt = _page(entries, query, self.tree_page_size)
+        headers = {}
+        if nxt >= 0:
+            base = urlsplit(self.path).path
+            headers["Link"] = f'<{self._base()}{base}?cursor={nxt}>; rel="next"'
+        self._json(page, headers)
+
+    def _raw(self, body: bytes) -> None:
+        rng = self.headers.get("Range", "")
+        if not rng.startswith("bytes="):
+            self._send(200, body, {"Content-Type": "text/plain; charset=utf-8"})
+            return
+        try:
+            first, _, last = rng[len("bytes=") :].partition("-")
+            start = int(first)
+            end = min(len(body) - 1, int(last)) if last else len(body) - 1
+        except ValueError:
+            start, end = 0, len(body) - 1
+        if start >= len(body):
+            self._send(416, b"", {"Content-Range": f"bytes */{len(body)}"})
+            return
+        headers = {
+            "Content-Type": "text/plain; charset=utf-8",
+            "Content-Range": f"bytes {start}-{end}/{len(body)}",
+        }
+        self._send(206, body[start : end + 1], headers)
+
+    def _base(self) -> str:
+        return f"http://{self.headers.get('Host') or self.mock.url.split('//', 1)[1]}"
+
+    def _json(self, data: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self._send(200, body, {"Content-Type": "application/json", **(headers or {})})
+
+    def _not_found(self) -> None:
+        self._send(404, b'{"error": "Repository not found"}', {"Content-Type": "application/json"})
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.mock.count(status)
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        faults = self.mock.faults
+        try:
+            if body and faults.slow_body():
+                # Trickle the body out in small chunks
+                for i in range(0, len(body), 1024):
+                    self.wfile.write(body[i : i + 1024])
+                    self.wfile.flush()
+                    time.sleep(faults.slow_body_ms / 1000)
+            else:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # client stopped reading (bounded README reads)
+
+
+def serve(
+    hub: SyntheticHub, faults: Faults, host: str = "127.0.0.1", port: int = 0
+) -> MockHubServer:
+    """Start a server on a background thread; stop it with ``shutdown()``."""
+    server = MockHubServer((host, port), hub, faults)
+    threading.Thread(target=server.serve_forever, name="mock-hf", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Mock Hugging Face API server for load testing")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--models", type=int, default=1000, help="synthetic population size")
+    ap.add_argument("--org", default="synthetic", help="owner of the synthetic models")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--files", type=int, default=8, help="files per model (incl. README, config)")
+    ap.add_argument("--readme-bytes", type=int, default=4096)
+    ap.add_argument(
+        "--no-blob-sizes",
+        action="store_true",
+        help="omit sibling sizes from model info so clients must walk the tree",
+    )
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="median response latency")
+    ap.add_argument(
+        "--latency-sigma", type=float, default=0.0, help="log-normal spread (0 = constant)"
+    )
+    ap.add_argument("--rate-429", type=float, default=0.0, help="fraction answered 429")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    ap.add_argument("--rate-5xx", type=float, default=0.0, help="fraction answered 500/502/504")
+    ap.add_argument("--slow-body-rate", type=float, default=0.0, help="fraction of slow bodies")
+    ap.add_argument("--slow-body-ms", type=float, default=50.0, help="pause per 1 KiB chunk")
+    ap.add_argument("--write-urls", metavar="FILE", help="write the population's model URLs")
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args(argv)
+
+    hub = SyntheticHub(
+        args.models, args.seed, args.org, args.files, args.readme_bytes, not args.no_blob_sizes
+    )
+    faults = Faults(
+        args.latency_ms,
+        args.latency_sigma,
+        args.rate_429,
+        args.rate_5xx,
+        args.retry_after,
+        args.slow_body_rate,
+        args.slow_body_ms,
+        args.seed,
+    )
+    if args.write_urls:
+        with open(args.write_urls, "w", encoding="utf-8") as fh:
+            fh.writelines(f"https://huggingface.co/{m}\n" for m in hub.model_ids())
+    server = MockHubServer((args.host, args.port), hub, faults)
+    server.verbose = args.verbose
+    print(
+        f"mock HF server for {hub.models} models on {server.url} "
+        f"(use --hf-endpoint {server.url} or ACME_HF_ENDPOINT={server.url})",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"responses by status: {dict(sorted(server.stats.items()))}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
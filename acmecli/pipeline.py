@@ -0,0 +1,225 @@
+"""
+Streaming evaluation pipeline: read -> classify -> de-duplicate -> evaluate -> write.
+
+Every stage is a generator pulled by the scheduler only when a slot frees up,
+so a URL file (or ``-`` for stdin) is read as fast as models are scored and
+memory use does not grow with the input: a 2M-line URL dump holds at most a
+window of models in flight, DEDUPE_MEMORY finished outcomes and the first
+REPORT_LIMIT problems of each kind. Records are written as they complete
+(--summary still keeps every record, for the report).
+
+- ModelUrls: the MODEL URLs of a URL stream; other URLs go to a callback.
+- Deduper: evaluates each model once while it is in flight or recently
+  finished; repeat URLs share its outcome.
+- ReorderBuffer (--preserve-order): releases outcomes in input order through
+  a bounded window; it numbers every input URL, so the lines written for
+  invalid URLs are released in order too.
+- ProblemLog: count and first few of the invalid URLs / failures, for the report.
+
+A stage may yield None ("stall") instead of a URL: the scheduler then waits
+for an outcome before pulling again. That is how the reorder window pushes
+back on the scheduler without blocking the thread that delivers outcomes.
+
+The schedulers that pull them, with a bounded number of models pending, are
+main.evaluate_bounded (threads) and async_engine.evaluate_models.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .metrics.hf_api import extract_model_ref
+from .report import extract_model_name
+from .urls import Category, classify
+
+# on_outcome(url, record, exception) -> keep going?
+OutcomeHandler = Callable[[str, Optional[Dict[str, Any]], Optional[BaseException]], bool]
+
+Outcome = Tuple[Optional[Dict[str, Any]], Optional[BaseException]]
+
+# Finished models whose outcome is kept for repeat URLs further down the stream
+DEDUPE_MEMORY = 4096
+
+# Outcomes --preserve-order may hold back behind a slow head of line
+REORDER_WINDOW = 1024
+
+# Problem URLs listed in the end-of-run report (the error file gets all of them)
+REPORT_LIMIT = 50
+
+
+class ModelUrls:
+    """Iterates over the MODEL URLs of ``urls``; the rest go to ``on_invalid(url, why)``.
+
+    ``read`` and ``models`` count what has been seen so far. Stalls (None) from
+    ``urls`` are passed through.
+    """
+
+    def __init__(
+        self, urls: Iterable[Optional[str]], on_invalid: Callable[[str, str], None]
+    ) -> None:
+        self._urls = urls
+        self._on_invalid = on_invalid
+        self.read = 0
+        self.models = 0
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for u in self._urls:
+            if u is None:
+                yield None
+                continue
+            self.read += 1
+            try:
+                cat = classify(u)
+            except Exception as e:
+                self._on_invalid(u, f"classify error: {e}")
+                continue
+            if cat is Category.MODEL:
+                self.models += 1
+                yield u
+            else:
+                self._on_invalid(u, f"unsupported category: {getattr(cat, 'name', str(cat))}")
+
+
+def model_key(url: str) -> Any:
+    """What makes two URLs the same model: canonical id and revision."""
+    try:
+        return extract_model_ref(url)
+    except ValueError:
+        return url
+
+
+class Deduper:
+    """Evaluates each distinct model once; repeat URLs share its outcome.
+
+    A repeat of a model still in flight waits for it; a repeat of one of the
+    last ``memory`` finished models is answered at once with a renamed copy of
+    its record. Older repeats are evaluated again (the HTTP cache makes that
+    cheap). ``filter`` feeds the scheduler and ``handle`` is its outcome handler.
+    """
+
+    def __init__(self, on_outcome: OutcomeHandler, memory: int = DEDUPE_MEMORY) -> None:
+        self.on_outcome = on_outcome
+        self.memory = memory
+        self.keep_going = True
+        self._rep_of: Dict[Any, str] = {}  # key in flight -> its representative URL
+        self._waiting: Dict[str, Tuple[Any, List[str]]] = {}  # rep -> (key, every URL)
+        self._finished: OrderedDict[Any, Outcome] = OrderedDict()
+
+    def filter(self, urls: Iterable[Optional[str]]) -> Iterator[Optional[str]]:
+        """Yield the representative URL of each model not in flight or recently finished."""
+        for u in urls:
+            if not self.keep_going:
+                return
+            if u is None:
+                yield None  # upstream stall
+                continue
+            key = model_key(u)
+            rep = self._rep_of.get(key)
+            if rep is not None:
+                self._waiting[rep][1].append(u)
+            elif key in self._finished:
+                self._finished.move_to_end(key)
+                self._emit(u, *self._finished[key], repeat=True)
+            else:
+                self._rep_of[key] = u
+                self._waiting[u] = (key, [u])
+                yield u
+
+    def handle(self, rep: str, rec: Optional[Dict[str, Any]], exc: Optional[BaseException]) -> bool:
+        """Fan one evaluation out to every URL that maps to the same model."""
+        key, urls = self._waiting.pop(rep, (model_key(rep), [rep]))
+        self._rep_of.pop(key, None)
+        for u in urls:
+            self._emit(u, rec, exc, repeat=u != rep)
+        if exc is not None:
+            exc.__traceback__ = None  # don't keep the failed model's frames alive
+        self._finished[key] = (rec, exc)
+        while len(self._finished) > self.memory:
+            self._finished.popitem(last=False)
+        return self.keep_going
+
+    def _emit(
+        self, u: str, rec: Optional[Dict[str, Any]], exc: Optional[BaseException], repeat: bool
+    ) -> None:
+        out = {**rec, "name": extract_model_name(u)} if rec is not None and repeat else rec
+        self.keep_going = self.on_outcome(u, out, exc) and self.keep_going
+
+
+class ReorderBuffer:
+    """Releases outcomes to ``on_outcome`` in the order their URLs were admitted.
+
+    ``admit`` numbers the URLs as the scheduler pulls them and stalls (yields
+    None) while ``window`` of them are admitted but not yet released, so a slow
+    head of line holds back the scheduler instead of growing the buffer.
+    ``deliver`` is the outcome handler to give the scheduler (or Deduper);
+    ``release`` queues any other output for an admitted URL (e.g. the error line
+    of one that is not a model) to run in its turn.
+    """
+
+    def __init__(self, on_outcome: OutcomeHandler, window: int = REORDER_WINDOW) -> None:
+        self.on_outcome = on_outcome
+        self.window = max(1, window)
+        self.keep_going = True
+        self._admitted = 0  # sequence number of the next URL admitted
+        self._released = 0  # sequence number of the next outcome to release
+        self._seqs: Dict[str, Deque[int]] = {}  # URL -> its admitted, unanswered seqs
+        self._ready: Dict[int, Callable[[], bool]] = {}
+
+    def __len__(self) -> int:
+        return self._admitted - self._released
+
+    def admit(self, urls: Iterable[Optional[str]]) -> Iterator[Optional[str]]:
+        for u in urls:
+            while self.keep_going and len(self) >= self.window:
+                yield None  # head of line is slow: wait for outcomes
+            if not self.keep_going:
+                return
+            if u is None:
+                yield None
+                continue
+            self._seqs.setdefault(u, deque()).append(self._admitted)
+            self._admitted += 1
+            yield u
+
+    def deliver(self, u: str, rec: Optional[Dict[str, Any]], exc: Optional[BaseException]) -> bool:
+        return self.release(u, lambda: self.on_outcome(u, rec, exc))
+
+    def release(self, u: str, emit: Callable[[], bool]) -> bool:
+        """Run ``emit`` once every URL admitted before ``u`` has been released."""
+        seqs = self._seqs[u]
+        seq = seqs.popleft()  # repeats of one URL share an outcome, so any order works
+        if not seqs:
+            del self._seqs[u]
+        self._ready[seq] = emit
+        while self.keep_going and self._released in self._ready:
+            emit = self._ready.pop(self._released)
+            self._released += 1
+            self.keep_going = emit()
+        return self.keep_going
+
+
+class ProblemLog:
+    """How many URLs had a problem, plus the first ``limit`` of them for the report."""
+
+    def __init__(self, limit: int = REPORT_LIMIT) -> None:
+        self.limit = limit
+        self.count = 0
+        self.sample: List[Tuple[str, str]] = []
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def add(self, url: str, why: str) -> None:
+        self.count += 1
+        if len(self.sample) < self.limit:
+            self.sample.append((url, why))
+
+    def report(self, header: str, file: Optional[TextIO] = None) -> None:
+        file = file or sys.stderr
+        print(header, file=file)
+        for u, why in self.sample:
+            print(f"  - {u}: {why}", file=file)
+        if self.count > len(self.sample):
+            print(f"  ... and {self.count - len(self.sample)} more", file=file)
@@ -0,0 +1,229 @@
+"""
+Adaptive per-host rate limiting: token bucket + AIMD concurrency window.
+
+A healthy host is not limited at all: requests go out as fast as the workers
+send them. The first 429/503 (or Retry-After) pauses the host for Retry-After
+seconds and starts limiting it at half the request rate (over the last second)
+and in-flight count seen at that moment, so all workers back off together.
+Healthy responses then grow both back additively; once they are back where the
+throttling started, the host is unlimited again. Further throttling before then
+halves them again, but the level to recover to stays the one seen when the
+host was last unlimited.
+
+ACME_RATE_LIMIT / ACME_MAX_INFLIGHT are optional hard ceilings. A limit that
+has one starts there and grows back up to it instead of to unlimited.
+
+Env:
+- ACME_RATE_LIMIT: max requests/second per host (default: no ceiling;
+  0 disables limiting and throttle handling)
+- ACME_RATE_BURST: token bucket capacity (default: the current rate)
+- ACME_MAX_INFLIGHT: max concurrent requests per host (default: no ceiling)
+- ACME_RATE_RETRIES: times a throttled request is re-sent after waiting (default 4)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+from .endpoints import hf_hosts
+from .env import env_float
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = frozenset({429, 503})
+LIMITED_HOSTS = frozenset({"huggingface.co"})
+
+# Minimum spacing between two multiplicative decreases (one congestion event)
+_DECREASE_COOLDOWN_S = 1.0
+# Sliding window the observed request rate is measured over
+_RATE_WINDOW_S = 1.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveLimiter:
+    """Token bucket with an AIMD-controlled in-flight window, shared by all workers.
+
+    ``rate``/``max_inflight`` are ceilings (None = none). ``self.rate`` and
+    ``self.window`` are the limits in force; None means unlimited.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_inflight: Optional[int] = None,
+    ) -> None:
+        self.max_rate = max(0.1, rate) if rate else None
+        self.max_window = max(1, max_inflight) if max_inflight else None
+        self.rate: Optional[float] = self.max_rate
+        self.window: Optional[float] = float(self.max_window) if self.max_window else None
+        self._burst = burst
+        self.tokens = self.burst
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        # Where growth stops: the ceiling, or the level seen when limiting began
+        self._rate_goal = self.max_rate
+        self._window_goal = float(self.max_window) if self.max_window else None
+        self._created = self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._sent: Deque[float] = deque()  # send times within the last _RATE_WINDOW_S
+        self._cond = threading.Condition()
+
+    @property
+    def burst(self) -> float:
+        return max(1.0, self._burst or self.rate or 1.0)
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _count_request(self, now: float) -> None:
+        self._sent.append(now)
+        self._observed_rate(now)  # drops expired send times
+
+    def _observed_rate(self, now: float) -> float:
+        """Requests per second sent over the last _RATE_WINDOW_S (or since creation)."""
+        while self._sent and self._sent[0] <= now - _RATE_WINDOW_S:
+            self._sent.popleft()
+        span = min(_RATE_WINDOW_S, max(now - self._created, 0.1))
+        return len(self._sent) / span
+
+    def try_acquire(self) -> float:
+        """Take a token and slot if possible; return 0.0, else seconds to wait first."""
+        with self._cond:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            if self.window is not None and self.inflight >= int(self.window):
+                return 0.05  # woken earlier by release() on the sync path
+            if self.rate is not None:
+                if self.tokens < 1.0:
+                    return (1.0 - self.tokens) / self.rate
+                self.tokens -= 1.0
+            self.inflight += 1
+            self._count_request(now)
+            return 0.0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            with self._cond:
+                self._cond.wait(timeout=wait)
+
+    async def aacquire(self) -> None:
+        """Event-loop friendly acquire()."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, status: Optional[int], retry_after: Optional[float] = None) -> None:
+        """Return the slot and adapt to the outcome (``status`` None = transport error)."""
+        code = status if isinstance(status, int) else None
+        with self._cond:
+            now = time.monotonic()
+            if code in THROTTLE_STATUSES or retry_after is not None:
+                self._decrease(now, code, retry_after)
+            elif code is not None and code < 500:
+                self._increase()
+            self.inflight = max(0, self.inflight - 1)
+            self._cond.notify_all()
+
+    def _decrease(self, now: float, code: Optional[int], retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, now + (retry_after or 1.0))
+        if now - self._last_decrease < _DECREASE_COOLDOWN_S:
+            return  # same congestion event
+        self._last_decrease = now
+        # An unlimited host is cut from what it was actually doing, and recovers to it;
+        # later cuts keep that goal, so back-to-back throttling can't ratchet it down
+        rate, window = self.rate, self.window
+        if rate is None:
+            rate = self._rate_goal = max(1.0, self._observed_rate(now))
+        if window is None:
+            window = self._window_goal = float(max(1, self.inflight))
+        self.rate = max(0.1, rate / 2)
+        self.window = max(1.0, window / 2)
+        self.tokens = min(self.tokens, self.burst)
+        self._last_refill = now
+        logger.info(
+            f"throttled (HTTP {code}); backing off to "
+            f"{self.rate:.1f} req/s, {int(self.window)} in flight"
+        )
+
+    def _increase(self) -> None:
+        if self.window is not None:
+            self.window += 1.0 / self.window
+            if self._window_goal is not None and self.window >= self._window_goal:
+                self.window = self._window_goal if self.max_window is not None else None
+        if self.rate is not None and self._rate_goal is not None:
+            self.rate += self._rate_goal / 50
+            if self.rate >= self._rate_goal:
+                self.rate = self._rate_goal if self.max_rate is not None else None
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url: str) -> Optional[AdaptiveLimiter]:
+    """Shared limiter for ``url``'s host, or None when the host isn't limited.
+
+    The Hub and the configured HF endpoints (mirrors, mock server) are limited.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    if host not in LIMITED_HOSTS and host not in hf_hosts():
+        return None
+    rate = env_float("ACME_RATE_LIMIT", -1)
+    if rate == 0:
+        return None
+    with _limiters_lock:
+        lim = _limiters.get(host)
+        if lim is None:
+            burst = env_float("ACME_RATE_BURST", 0)
+            inflight = int(env_float("ACME_MAX_INFLIGHT", 0))
+            lim = _limiters[host] = AdaptiveLimiter(
+                rate if rate > 0 else None, burst or None, inflight or None
+            )
+        return lim
+
+
+def throttle_retries() -> int:
+    return max(0, int(env_float("ACME_RATE_RETRIES", 4)))
+
+
+def reset_limiters() -> None:
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,182 @@
+"""
+Record/replay of outbound HTTP traffic (--record DIR / --replay DIR).
+
+Every request made through http_client (HF API and raw files, the GitHub token
+check, LLM provider POSTs) and through the asyncio fetchers goes through
+replayable()/areplayable(). In record mode the response the caller finally saw
+(after cache, rate limiting and retries) is written to DIR, one JSON file per
+request. In replay mode the response is read back and nothing touches the
+network; a request missing from DIR raises ReplayMiss, a
+requests.ConnectionError, so callers treat it like an unreachable host.
+
+Requests are keyed by method, URL and JSON body. Credentials are left out of
+the key, so a tape recorded with a token replays without one, and mirror URLs
+are keyed as the Hub's (endpoints.canonical_url). Thread and asyncio runs share
+the tape format.
+
+Env:
+- ACME_RECORD_DIR / ACME_REPLAY_DIR: defaults for --record / --replay
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .endpoints import canonical_url, note_origin
+from .stages import arun_in
+
+logger = logging.getLogger(__name__)
+
+# (status, reason, body text, elapsed ms, headers): the asyncio fetchers' result shape
+AsyncResult = Tuple[int, str, str, int, Dict[str, str]]
+
+
+class ReplayMiss(requests.ConnectionError):
+    """A request that is not on the tape in replay mode."""
+
+
+class Tape:
+    """Directory of recorded responses, written in record mode and read in replay mode."""
+
+    def __init__(self, root: str, replay: bool) -> None:
+        self.root = root
+        self.replay = replay
+        self.stats: Dict[str, int] = {"recorded": 0, "replayed": 0, "missed": 0}
+        self._lock = threading.Lock()
+        if not replay:
+            os.makedirs(root, exist_ok=True)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def key(method: str, url: str, body: Any = None) -> str:
+        payload = "" if body is None else json.dumps(body, sort_keys=True, ensure_ascii=False)
+        target = f"{method.upper()} {canonical_url(url)}"
+        return hashlib.sha256(f"{target}\n{payload}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def load(self, method: str, url: str, body: Any = None) -> Dict[str, Any]:
+        """Recorded response for the request; raises ReplayMiss when there is none."""
+        try:
+            with open(self._path(self.key(method, url, body)), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            entry = None
+        if not isinstance(entry, dict):
+            self._count("missed")
+            raise ReplayMiss(f"not recorded: {method.upper()} {url}")
+        self._count("replayed")
+        return entry
+
+    def save(self, method: str, url: str, body: Any, result: AsyncResult) -> None:
+        status, reason, text, ms, headers = result
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "reason": reason,
+            "headers": headers,
+            "body": text,
+            "elapsed_ms": ms,
+        }
+        path = self._path(self.key(method, url, body))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"failed to record {method.upper()} {url}: {e}")
+            return
+        self._count("recorded")
+
+
+def response_from_tape(entry: Dict[str, Any]) -> requests.Response:
+    """Rebuild a requests.Response (status, headers, body, elapsed) from a tape entry."""
+    r = requests.Response()
+    r.status_code = int(entry.get("status", 0))
+    r.reason = str(entry.get("reason", ""))
+    r.url = str(entry.get("url", ""))
+    r.encoding = "utf-8"
+    r._content = str(entry.get("body", "")).encode("utf-8")
+    r.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    r.elapsed = timedelta(milliseconds=int(entry.get("elapsed_ms", 0)))
+    return r
+
+
+def result_from_tape(entry: Dict[str, Any]) -> AsyncResult:
+    return (
+        int(entry.get("status", 0)),
+        str(entry.get("reason", "")),
+        str(entry.get("body", "")),
+        int(entry.get("elapsed_ms", 0)),
+        dict(entry.get("headers", {})),
+    )
+
+
+_tape: Optional[Tape] = None
+
+
+def configure_tape(record: Optional[str] = None, replay: Optional[str] = None) -> Optional[Tape]:
+    """Record into ``record`` or replay from ``replay`` (both None turns it off)."""
+    global _tape
+    if record and replay:
+        raise ValueError("record and replay directories are mutually exclusive")
+    if replay and not os.path.isdir(replay):
+        raise ValueError(f"replay directory not found: {replay}")
+    root = record or replay
+    _tape = Tape(root, replay=bool(replay)) if root else None
+    return _tape
+
+
+def get_tape() -> Optional[Tape]:
+    return _tape
+
+
+def replayable(
+    method: str, url: str, body: Any, send: Callable[[], requests.Response]
+) -> requests.Response:
+    """Run ``send`` (one request) through the active tape, if any."""
+    tape = _tape
+    if tape is None:
+        return send()
+    if tape.replay:
+        r = response_from_tape(tape.load(method, url, body))
+        note_origin("replay")
+        return r
+    r = send()
+    ms = int(r.elapsed.total_seconds() * 1000) if r.elapsed is not None else 0
+    tape.save(method, url, body, (r.status_code, r.reason or "", r.text, ms, dict(r.headers)))
+    return r
+
+
+async def areplayable(
+    method: str, url: str, body: Any, send: Callable[[], Awaitable[AsyncResult]]
+) -> AsyncResult:
+    """Asyncio counterpart of replayable() for (status, reason, body, ms, headers) results."""
+    tape = _tape
+    if tape is None:
+        return await send()
+    # Tape files are read and written on the hf stage, off the event loop
+    if tape.replay:
+        result = result_from_tape(await arun_in("hf", tape.load, method, url, body))
+        note_origin("replay")
+        return result
+    result = await send()
+    await arun_in("hf", tape.save, method, url, body, result)
+    return result
@@ -0,0 +1,252 @@
+"""
+Retry policy for idempotent GETs: jittered exponential backoff, a per-model
+deadline and a run-wide retry budget.
+
+Transient failures (connection resets, timeouts, 5xx) are re-sent after a
+"full jitter" delay drawn from [0, min(max, base * 2**n)]. Two limits keep an
+outage from turning into a retry storm:
+- the per-model deadline: no retry is scheduled past it, and request timeouts
+  are clamped to the time that is left;
+- the run-wide budget: retries may not exceed ACME_RETRY_BUDGET_MIN plus
+  ACME_RETRY_BUDGET x (requests sent so far).
+
+Counters are kept per model (model_scope) and for the whole run (run_summary).
+
+Env:
+- ACME_RETRY_ATTEMPTS: max retries per request (default 3; 0 disables retrying)
+- ACME_RETRY_BASE_MS / ACME_RETRY_MAX_MS: backoff base and ceiling (default 200 / 5000)
+- ACME_MODEL_DEADLINE_S: per-model deadline in seconds (default 60; 0 = none)
+- ACME_RETRY_BUDGET: retries allowed per request sent, run-wide (default 0.2)
+- ACME_RETRY_BUDGET_MIN: retries always allowed before the ratio applies (default 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from .env import env_float
+from .ratelimit import THROTTLE_STATUSES, get_limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryStats:
+    """Counters for one model evaluation (or one run when used as the total)."""
+
+    FIELDS = ("requests", "retries", "gave_up")
+
+    def __init__(self, deadline: Optional[float] = None) -> None:
+        self.deadline = deadline  # time.monotonic() value, None = unbounded
+        self.counts: Dict[str, int] = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[field] = self.counts.get(field, 0) + n
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def as_record(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class RetryBudget:
+    """Run-wide cap on retries, proportional to the requests actually sent."""
+
+    def __init__(self, ratio: float, minimum: float) -> None:
+        self.ratio = max(0.0, ratio)
+        self.minimum = max(0.0, minimum)
+        self.totals = RetryStats()
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def note_request(self) -> None:
+        self.totals.add("requests")
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False once it is exhausted."""
+        with self._lock:
+            counts = self.totals.counts
+            if counts["retries"] >= self.minimum + self.ratio * counts["requests"]:
+                self.denied += 1
+                return False
+            counts["retries"] += 1
+            return True
+
+
+_current: contextvars.ContextVar[Optional[RetryStats]] = contextvars.ContextVar(
+    "acme_retry_stats", default=None
+)
+_budget: Optional[RetryBudget] = None
+_budget_lock = threading.Lock()
+_rng = random.Random()
+
+
+def get_budget() -> RetryBudget:
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = RetryBudget(
+                env_float("ACME_RETRY_BUDGET", 0.2), env_float("ACME_RETRY_BUDGET_MIN", 20)
+            )
+        return _budget
+
+
+def reset_budget() -> None:
+    global _budget
+    with _budget_lock:
+        _budget = None
+
+
+def run_summary() -> Dict[str, int]:
+    """Run-wide counters: requests, retries, gave_up, budget_denied."""
+    budget = get_budget()
+    return {**budget.totals.as_record(), "budget_denied": budget.denied}
+
+
+@contextmanager
+def model_scope() -> Iterator[RetryStats]:
+    """Track one model's requests and bound its retries by ACME_MODEL_DEADLINE_S.
+
+    The scope lives in a context variable: asyncio tasks inherit it, and thread
+    pool work inherits it when submitted through ``contextvars.copy_context().run``.
+    """
+    seconds = env_float("ACME_MODEL_DEADLINE_S", 60)
+    stats = RetryStats(time.monotonic() + seconds if seconds > 0 else None)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def clamp_timeout(timeout: float) -> float:
+    """Shorten ``timeout`` so a request cannot outlive the current model's deadline."""
+    stats = _current.get()
+    left = stats.remaining() if stats is not None else None
+    return timeout if left is None else max(0.5, min(timeout, left))
+
+
+def backoff_delay(retry: int) -> float:
+    """Full-jitter delay in seconds before retry number ``retry`` (0-based)."""
+    base = max(0.0, env_float("ACME_RETRY_BASE_MS", 200)) / 1000
+    cap = max(base, env_float("ACME_RETRY_MAX_MS", 5000) / 1000)
+    return _rng.uniform(0, min(cap, base * (2**retry)))
+
+
+def is_retryable_status(url: str, status: int) -> bool:
+    """5xx/429 are retried, unless the host's rate limiter already re-sent a 429/503."""
+    if status not in RETRY_STATUSES:
+        return False
+    return not (status in THROTTLE_STATUSES and get_limiter(url) is not None)
+
+
+def _note_request() -> None:
+    get_budget().note_request()
+    stats = _current.get()
+    if stats is not None:
+        stats.add("requests")
+
+
+def _plan_retry(url: str, retry: int, why: str) -> Optional[float]:
+    """Delay before the next attempt, or None when a limit says stop."""
+    stats = _current.get()
+    max_retries = int(env_float("ACME_RETRY_ATTEMPTS", 3))
+    delay = backoff_delay(retry)
+    left = stats.remaining() if stats is not None else None
+    if retry >= max_retries:
+        reason = "retrying disabled" if max_retries <= 0 else f"{max_retries} retries used"
+    elif left is not None and left <= delay:
+        reason = "model deadline reached"
+    elif not get_budget().try_spend():
+        reason = "run-wide retry budget exhausted"
+    else:
+        if stats is not None:
+            stats.add("retries")
+        logger.info(f"retrying {url} in {delay * 1000:.0f} ms ({why})")
+        return delay
+    # Counted even with retrying disabled: the request still failed for good
+    get_budget().totals.add("gave_up")
+    if stats is not None:
+        stats.add("gave_up")
+    logger.warning(f"giving up on {url} ({why}): {reason}")
+    return None
+
+
+def call_with_retries(
+    url: str,
+    send: Callable[[], T],
+    status_of: Callable[[T], int],
+    retry_on: Any,
+    fail_fast: Any = (),
+) -> T:
+    """Run ``send`` (one idempotent GET) until it succeeds or a limit is hit.
+
+    Exceptions of type ``retry_on`` and retryable statuses are retried; the last
+    response is returned, or the last exception re-raised, when giving up.
+    ``fail_fast`` exceptions are re-raised at once (the caller has a better
+    option than this URL, e.g. another mirror).
+    """
+    retry = 0
+    while True:
+        _note_request()
+        try:
+            result = send()
+        except fail_fast:
+            raise
+        except retry_on as e:
+            delay = _plan_retry(url, retry, type(e).__name__)
+            if delay is None:
+                raise
+        else:
+            status = status_of(result)
+            if not is_retryable_status(url, status):
+                return result
+            delay = _plan_retry(url, retry, f"HTTP {status}")
+            if delay is None:
+                return result
+        time.sleep(delay)
+        retry += 1
+
+
+async def acall_with_retries(
+    url: str,
+    send: Callable[[], Awaitable[T]],
+    status_of: Callable[[T], int],
+    retry_on: Any,
+    fail_fast: Any = (),
+) -> T:
+    """Event-loop version of call_with_retries."""
+    retry = 0
+    while True:
+        _note_request()
+        try:
+            result = await send()
+        except fail_fast:
+            raise
+        except retry_on as e:
+            delay = _plan_retry(url, retry, type(e).__name__)
+            if delay is None:
+                raise
+        else:
+            status = status_of(result)
+            if not is_retryable_status(url, status):
+                return result
+            delay = _plan_retry(url, retry, f"HTTP {status}")
+            if delay is None:
+                return result
+        await asyncio.sleep(delay)
+        retry += 1
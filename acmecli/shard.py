@@ -0,0 +1,94 @@
+"""
+Deterministic sharding for multi-node runs (--shard i/N).
+
+Shard ``i`` of ``N`` evaluates the input URLs whose canonical model id
+(extract_model_ref) hashes to ``i`` modulo ``N``. The hash is blake2b, so every
+process on every machine agrees on the split, and N runs over the same input
+cover it exactly once. Revisions of one model land on the same shard; URLs
+that don't name a model are hashed as-is, so each is reported by one shard.
+
+Every record and error line of a sharded run carries ``"shard": "i/N"`` and
+``"seq"``, its position in the full input. ``python -m acmecli.merge`` (see
+merge.py) uses them to combine the shards' outputs.
+
+Env:
+- ACME_SHARD: default for --shard, e.g. "3/8"
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, Tuple
+
+from .metrics.hf_api import extract_model_ref
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """``"i/N"`` -> (i, N); raises ValueError unless 0 <= i < N."""
+    index, sep, count = spec.strip().partition("/")
+    if not sep:
+        raise ValueError(f"shard must look like i/N, got {spec!r}")
+    i, n = int(index), int(count)
+    if n < 1 or not 0 <= i < n:
+        raise ValueError(f"shard index must be in 0..N-1, got {spec!r}")
+    return i, n
+
+
+def shard_key(url: str) -> str:
+    """What a URL is sharded by: its canonical model id, else the URL itself."""
+    try:
+        return extract_model_ref(url)[0]
+    except ValueError:
+        return url.strip()
+
+
+def shard_of(url: str, count: int) -> int:
+    """Shard (0..count-1) that owns ``url``; the same on every machine and run."""
+    digest = hashlib.blake2b(shard_key(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class Shard:
+    """One shard's share of a URL stream, with each URL's input position.
+
+    ``select`` keeps the URLs this shard owns; ``tag`` gives the fields that
+    go on an outcome's output line, ``skip`` drops one that is never evaluated
+    (already done on --resume).
+    """
+
+    def __init__(self, index: int, count: int) -> None:
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+        self.read = 0
+        self.selected = 0
+        self._seqs: Dict[str, Deque[int]] = {}  # URL -> input positions awaiting an outcome
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, url: str) -> bool:
+        return shard_of(url, self.count) == self.index
+
+    def select(self, urls: Iterable[str]) -> Iterator[str]:
+        for seq, u in enumerate(urls):
+            self.read += 1
+            if self.owns(u):
+                self.selected += 1
+                self._seqs.setdefault(u, deque()).append(seq)
+                yield u
+
+    def tag(self, u: str) -> Dict[str, Any]:
+        """``shard`` and ``seq`` of one selected occurrence of ``u`` (oldest first)."""
+        seqs = self._seqs.get(u)
+        if not seqs:
+            return {"shard": str(self)}
+        seq = seqs.popleft()  # repeats of one URL share an outcome, so any order works
+        if not seqs:
+            del self._seqs[u]
+        return {"shard": str(self), "seq": seq}
+
+    def skip(self, u: str) -> None:
+        self.tag(u)
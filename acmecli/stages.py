@@ -0,0 +1,194 @@
+"""
+Staged execution: separately sized thread pools for HF I/O, LLM calls and CPU work.
+
+A model is evaluated on a model worker (main.evaluate_bounded) that hands each
+step to the pool for its bottleneck and waits for it:
+- hf: individual Hugging Face requests (info, README, tree pages, sha checks)
+- llm: README analysis by the configured LLM provider
+- cpu: local README analysis, context derivation and scoring
+
+Each pool has its own queue, so a slow LLM endpoint backs up only the llm
+queue; HF fetches for other models keep flowing until every model worker is
+waiting on it. The asyncio engine runs the cpu steps on the same cpu pool and
+caps concurrent LLM calls at the llm size (its HF concurrency is --concurrency).
+
+The cpu pool is a thread pool too: it bounds and isolates CPU work so it can't
+crowd out I/O threads, rather than running it past the GIL.
+
+Env (the matching --*-workers flags override):
+- ACME_HF_WORKERS: HF request pool (default 32; ACME_FETCH_WORKERS is the older name)
+- ACME_LLM_WORKERS: LLM call pool (default 4)
+- ACME_CPU_WORKERS: CPU pool (default: the number of CPUs)
+- ACME_MODEL_WORKERS: models evaluated at once (default: the three pool sizes added up)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures as cf
+import contextvars
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, TypeVar
+
+from .env import env_int
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STAGES = ("hf", "llm", "cpu")
+
+
+def _default_size(name: str) -> int:
+    if name == "hf":
+        return env_int("ACME_HF_WORKERS", env_int("ACME_FETCH_WORKERS", 32))
+    if name == "llm":
+        return env_int("ACME_LLM_WORKERS", 4)
+    return env_int("ACME_CPU_WORKERS", os.cpu_count() or 1)
+
+
+class Stage:
+    """One named thread pool, with queue counters for the end-of-run summary."""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = max(1, workers)
+        self.stats: Dict[str, float] = {"tasks": 0, "queued_peak": 0, "wait_ms": 0.0}
+        self._queued = 0
+        self._pool: Optional[cf.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def thread_prefix(self) -> str:
+        return f"acme-{self.name}"
+
+    def _executor(self) -> cf.ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = cf.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.thread_prefix
+                )
+            return self._pool
+
+    def on_own_thread(self) -> bool:
+        return threading.current_thread().name.startswith(self.thread_prefix + "_")
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "cf.Future[T]":
+        """Queue ``fn`` on this pool, carrying the caller's context (model retry scope)."""
+        ctx = contextvars.copy_context()
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self.stats["tasks"] += 1
+            self.stats["queued_peak"] = max(self.stats["queued_peak"], self._queued)
+
+        def _run() -> T:
+            with self._lock:
+                self._queued -= 1
+                self.stats["wait_ms"] += (time.perf_counter() - queued_at) * 1000
+            return ctx.run(fn, *args, **kwargs)
+
+        return self._executor().submit(_run)
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on this pool and wait (inline when already on one of its threads)."""
+        if self.on_own_thread():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = int(self.stats["tasks"])
+            return {
+                "workers": self.workers,
+                "tasks": tasks,
+                "queued_peak": int(self.stats["queued_peak"]),
+                "avg_wait_ms": round(self.stats["wait_ms"] / tasks, 1) if tasks else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+_sizes: Dict[str, Optional[int]] = {}
+_model_workers: Optional[int] = None
+_stages: Dict[str, Stage] = {}
+_stages_lock = threading.Lock()
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]"
+_slots = weakref.WeakKeyDictionary()
+
+
+def configure_stages(
+    hf: Optional[int] = None,
+    llm: Optional[int] = None,
+    cpu: Optional[int] = None,
+    models: Optional[int] = None,
+) -> None:
+    """Size the pools (None = env/default); existing pools are replaced."""
+    global _model_workers
+    with _stages_lock:
+        old = list(_stages.values())
+        _stages.clear()
+        _sizes.update(hf=hf, llm=llm, cpu=cpu)
+        _model_workers = models
+    for stage in old:
+        stage.shutdown()
+
+
+def get_stage(name: str) -> Stage:
+    with _stages_lock:
+        stage = _stages.get(name)
+        if stage is None:
+            size = _sizes.get(name)
+            stage = _stages[name] = Stage(name, size if size else _default_size(name))
+        return stage
+
+
+def run_in(name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn`` on stage ``name`` and wait for its result."""
+    return get_stage(name).run(fn, *args, **kwargs)
+
+
+def submit_to(name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "cf.Future[T]":
+    """Queue ``fn`` on stage ``name`` without waiting."""
+    return get_stage(name).submit(fn, *args, **kwargs)
+
+
+async def arun_in(name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Event-loop version of run_in: awaits the stage's future."""
+    return await asyncio.wrap_future(get_stage(name).submit(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def aslot(name: str) -> AsyncIterator[None]:
+    """Hold one of stage ``name``'s slots on the running event loop."""
+    loop = asyncio.get_running_loop()
+    sems = _slots.setdefault(loop, {})
+    sem = sems.get(name)
+    if sem is None:
+        sem = sems[name] = asyncio.Semaphore(get_stage(name).workers)
+    async with sem:
+        yield
+
+
+def model_workers() -> int:
+    """How many models are evaluated at once on the thread path."""
+    if _model_workers:
+        return max(1, _model_workers)
+    default = sum(get_stage(name).workers for name in STAGES)
+    return max(1, env_int("ACME_MODEL_WORKERS", default))
+
+
+def stage_summary() -> Dict[str, Dict[str, Any]]:
+    """Per-pool size, task count, peak queue depth and mean queue wait (pools used so far)."""
+    with _stages_lock:
+        stages = [_stages[n] for n in STAGES if n in _stages]
+    return {s.name: s.summary() for s in stages}
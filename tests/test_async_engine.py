@@ -0,0 +1,206 @@
+"""
+Tests for the asyncio evaluation engine using an in-memory aiohttp-style session.
+"""
+
+import asyncio
+import json
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from acmecli import async_engine
+from acmecli.main import process_model
+from acmecli.metrics.hf_api import ModelLookupError
+
+ROUTES = {
+    "https://huggingface.co/api/models/org/good?blobs=true": (
+        200,
+        json.dumps({"downloads": 250_000, "likes": 300, "cardData": {"license": "mit"}}),
+    ),
+    "https://huggingface.co/api/models/org/good/tree/main": (
+        200,
+        json.dumps([{"size": 40_000_000}, {"size": 1_000}]),
+    ),
+    "https://huggingface.co/org/good/raw/main/README.md": (
+        200,
+        "# Good\nInstall with pip.\n```python\nx\n```\n```python\ny\n```\nUsage example",
+    ),
+}
+
+
+class FakeStream:
+    def __init__(self, data):
+        self._data = data
+
+    async def read(self, n=-1):
+        n = len(self._data) if n < 0 else n
+        chunk, self._data = self._data[:n], self._data[n:]
+        return chunk
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.reason = "OK" if status == 200 else "Not Found"
+        self._body = body
+        self.content = FakeStream(body.encode("utf-8"))
+
+    def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, limit=1):
+        self.urls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, headers=None):
+        self.urls.append(url)
+        return FakeResponse(*ROUTES.get(url, (404, "")))
+
+
+def _sync_get(url, headers=None, timeout=10, **kwargs):
+    status, body = ROUTES.get(url, (404, ""))
+    r = Mock(status_code=status, text=body, reason="OK" if status == 200 else "Not Found")
+    r.json.side_effect = lambda: json.loads(body)
+    return r
+
+
+def _strip_latencies(rec):
+    # retry_stats and endpoint describe transport requests, which the sync side mocks out
+    transport = ("retry_stats", "endpoint")
+    return {k: v for k, v in rec.items() if not k.endswith("_latency") and k not in transport}
+
+
+def test_async_record_matches_threaded_record():
+    url = "https://huggingface.co/org/good"
+    with patch.dict(os.environ, {"LLM_PROVIDER": "none"}):
+        rec = asyncio.run(async_engine.aprocess_model(FakeSession(), url))
+        with patch("acmecli.metrics.hf_api.http_get", side_effect=_sync_get):
+            expected = process_model(url)
+    assert _strip_latencies(rec) == _strip_latencies(expected)
+    assert all(rec[k] >= 1 for k in rec if k.endswith("_latency"))
+    assert rec["retry_stats"] == {"requests": 3, "retries": 0, "gave_up": 0}
+    assert rec["endpoint"] == "https://huggingface.co"
+
+
+def test_evaluate_models_reports_every_outcome():
+    outcomes = {}
+
+    def on_outcome(u, rec, exc):
+        outcomes[u] = (rec, exc)
+        return True
+
+    urls = ["https://huggingface.co/org/good", "https://huggingface.co/org/missing"]
+    with patch.dict(os.environ, {"LLM_PROVIDER": "none"}):
+        asyncio.run(
+            async_engine.evaluate_models(
+                urls, on_outcome, concurrency=8, session_factory=FakeSession
+            )
+        )
+    assert outcomes[urls[0]][0]["name"] == "good"
+    assert isinstance(outcomes[urls[1]][1], ModelLookupError)
+
+
+def test_evaluate_models_stops_when_handler_returns_false():
+    seen = []
+
+    def on_outcome(u, rec, exc):
+        seen.append(u)
+        return False
+
+    urls = [f"https://huggingface.co/org/missing{i}" for i in range(20)]
+    asyncio.run(
+        async_engine.evaluate_models(urls, on_outcome, concurrency=1, session_factory=FakeSession)
+    )
+    assert len(seen) == 1
+
+
+def test_blocking_source_is_pulled_off_the_event_loop():
+    import threading
+
+    pulled_on = []
+
+    def listing():
+        for i in range(3):
+            pulled_on.append(threading.current_thread())
+            yield f"https://huggingface.co/org/missing{i}"
+
+    seen = []
+    asyncio.run(
+        async_engine.evaluate_models(
+            listing(),
+            lambda u, rec, exc: seen.append(u) or True,
+            concurrency=2,
+            session_factory=FakeSession,
+            blocking_source=True,
+        )
+    )
+    assert len(seen) == 3
+    assert pulled_on and threading.main_thread() not in pulled_on
+
+
+def test_open_async_session_requires_aiohttp(monkeypatch):
+    import importlib
+
+    from acmecli import http_client
+
+    real_import = importlib.import_module
+
+    def fake_import(name, *args):
+        if name == "aiohttp":
+            raise ImportError("no aiohttp")
+        return real_import(name, *args)
+
+    monkeypatch.setattr(http_client.importlib, "import_module", fake_import)
+    with pytest.raises(RuntimeError, match="requires aiohttp"):
+        http_client.open_async_session(4)
+
+
+def test_afetch_tree_size_follows_link_cursor():
+    from acmecli.metrics.hf_api_async import afetch_tree_size
+
+    base = "https://huggingface.co/api/models/org/t/tree/main"
+    pages = {
+        base: (200, json.dumps([{"type": "directory", "path": "onnx"}]), {}),
+        f"{base}/onnx": (
+            200,
+            json.dumps([{"type": "file", "path": "onnx/a", "size": 7}]),
+            {"Link": f'<{base}/onnx?cursor=2>; rel="next"'},
+        ),
+        f"{base}/onnx?cursor=2": (200, json.dumps([{"type": "file", "size": 3}]), {}),
+    }
+
+    class PagedSession(FakeSession):
+        def get(self, url, headers=None):
+            status, body, hdrs = pages[url]
+            resp = FakeResponse(status, body)
+            resp.headers = hdrs
+            return resp
+
+    total, ms = asyncio.run(afetch_tree_size(PagedSession(), "org/t"))
+    assert total == 10 and ms >= 1
+
+
+def test_async_readme_is_bounded(monkeypatch):
+    from acmecli.metrics.hf_api_async import afetch_readme_content
+
+    monkeypatch.setenv("ACME_README_MAX_BYTES", "10")
+    session = FakeSession()
+    text, _ = asyncio.run(afetch_readme_content(session, "org/good"))
+    assert text == ROUTES["https://huggingface.co/org/good/raw/main/README.md"][1][:10]
@@ -0,0 +1,143 @@
+"""
+Tests for hedged requests (p95 trigger, first-response-wins, hedge-rate cap).
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+from acmecli import hedge
+from acmecli.hedge import Hedger, ahedged, hedged, hedging_enabled
+from acmecli.stages import configure_stages
+
+
+def _warm(hedger, kind="info", seconds=0.001, n=20):
+    for _ in range(n):
+        hedger.observe(kind, seconds)
+
+
+def _install(monkeypatch, max_rate=1.0):
+    hedger = Hedger(quantile=0.95, max_rate=max_rate, min_samples=20)
+    monkeypatch.setattr(hedge, "_hedger", hedger)
+    return hedger
+
+
+def test_delay_needs_samples_then_tracks_quantile():
+    hedger = Hedger(quantile=0.95, max_rate=0.05, min_samples=20)
+    assert hedger.delay("info") is None
+    for ms in range(1, 101):
+        hedger.observe("info", ms / 100)
+    assert hedger.delay("info") == 0.95
+    assert hedger.delay("tree") is None
+
+
+def test_hedge_rate_is_capped():
+    hedger = Hedger(quantile=0.95, max_rate=0.1, min_samples=1)
+    for _ in range(10):
+        hedger.note_request()
+    assert hedger.try_hedge() is True
+    assert hedger.try_hedge() is False
+
+
+def test_hedging_is_opt_in(monkeypatch):
+    monkeypatch.delenv("ACME_HEDGE", raising=False)
+    assert not hedging_enabled("info")
+    monkeypatch.setenv("ACME_HEDGE", "1")
+    assert hedging_enabled("readme")
+    assert not hedging_enabled(None)
+
+
+def test_slow_primary_is_beaten_by_hedge(monkeypatch):
+    hedger = _install(monkeypatch)
+    _warm(hedger)
+    calls = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            release.wait(2)  # stalled request
+            return "slow"
+        return "fast"
+
+    t0 = time.perf_counter()
+    assert hedged("info", send) == "fast"
+    assert time.perf_counter() - t0 < 1
+    assert hedger.stats["hedged"] == 1 and hedger.stats["hedge_won"] == 1
+    release.set()
+
+
+def test_losing_response_is_closed(monkeypatch):
+    hedger = _install(monkeypatch)
+    _warm(hedger)
+    release = threading.Event()
+    responses = [Mock(name="slow"), Mock(name="fast")]
+    sent = iter(responses)
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            r = next(sent)
+        if r is responses[0]:
+            release.wait(2)
+        return r
+
+    assert hedged("info", send) is responses[1]
+    release.set()
+    deadline = time.monotonic() + 2
+    while not responses[0].close.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    responses[0].close.assert_called_once()
+    responses[1].close.assert_not_called()
+
+
+def test_hedge_pool_follows_the_hf_stage(monkeypatch):
+    monkeypatch.setattr(hedge, "_hedge_pool", None)
+    configure_stages(hf=100)
+    try:
+        assert hedge._get_hedge_pool()._max_workers == 200
+    finally:
+        configure_stages()
+
+
+def test_no_hedge_when_rate_cap_spent(monkeypatch):
+    hedger = _install(monkeypatch, max_rate=0.0)
+    _warm(hedger)
+    calls = []
+
+    def send():
+        calls.append(1)
+        time.sleep(0.1)
+        return "only"
+
+    assert hedged("info", send) == "only"
+    assert len(calls) == 1
+
+
+def test_async_hedge_cancels_loser(monkeypatch):
+    hedger = _install(monkeypatch)
+    _warm(hedger, kind="readme")
+    state = {"calls": 0, "cancelled": False}
+
+    async def send():
+        state["calls"] += 1
+        if state["calls"] == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+            return "slow"
+        return "fast"
+
+    async def run():
+        result = await ahedged("readme", send)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert state["cancelled"]
@@ -129,7 +129,7 @@ def test_get_model_license():
     assert get_model_license(model_info) == ""
 
 
-@patch("acmecli.metrics.hf_api.requests.get")
+@patch("acmecli.metrics.hf_api.http_get")
 def test_fetch_model_info_success(mock_get):
     """Test successful model info fetching."""
     mock_response = Mock()
@@ -142,7 +142,7 @@ def test_fetch_model_info_success(mock_get):
     assert result == {"name": "gpt2", "downloads": 1000}
 
 
-@patch("acmecli.metrics.hf_api.requests.get")
+@patch("acmecli.metrics.hf_api.http_get")
 def test_fetch_model_info_failure(mock_get):
     """Test model info fetching with API failure."""
     mock_get.side_effect = requests.RequestException("API Error")
@@ -152,7 +152,7 @@ def test_fetch_model_info_failure(mock_get):
 
 
 @patch("acmecli.metrics.hf_api.fetch_model_info")
-@patch("acmecli.metrics.hf_api.fetch_model_files")
+@patch("acmecli.metrics.hf_api.fetch_tree_size")
 def test_build_context_from_api_success(mock_fetch_files, mock_fetch_info):
     """Test building context from API with successful responses."""
     mock_fetch_info.return_value = {
@@ -160,7 +160,7 @@ def test_build_context_from_api_success(mock_fetch_files, mock_fetch_info):
         "likes": 50,
         "lastModified": "2025-09-01T00:00:00Z",
     }
-    mock_fetch_files.return_value = [{"size": 1000}, {"size": 2000}]
+    mock_fetch_files.return_value = 3000  # walked tree total
 
     context = build_context_from_api("https://huggingface.co/gpt2")
 
@@ -180,3 +180,291 @@ def test_build_context_from_api_failure(mock_fetch_info):
     # Should return fallback context
     assert "total_bytes" in context
     assert "downloads" in context
+
+
+@patch("acmecli.metrics.hf_api.fetch_readme_content")
+@patch("acmecli.metrics.hf_api.fetch_tree_size")
+@patch("acmecli.metrics.hf_api.fetch_model_info")
+def test_build_context_fetches_readme_concurrently_with_tree(
+    mock_fetch_info, mock_fetch_files, mock_fetch_readme
+):
+    """The README fetch overlaps with the tree walk instead of following it."""
+    import threading
+
+    started = threading.Barrier(2, timeout=5)
+
+    def tree(model_id, token=None, revision="main"):
+        started.wait()
+        return 42
+
+    def readme(model_id, token=None, filename="README.md", revision="main"):
+        started.wait()
+        return ""
+
+    mock_fetch_info.return_value = {"downloads": 10}
+    mock_fetch_files.side_effect = tree
+    mock_fetch_readme.side_effect = readme
+
+    # Would raise BrokenBarrierError if the fetches ran one after another
+    context = build_context_from_api("https://huggingface.co/org/model")
+    assert context["total_bytes"] == 42
+
+
+@patch("acmecli.metrics.hf_api.fetch_readme_content", return_value="# Card")
+@patch("acmecli.metrics.hf_api.fetch_model_info")
+def test_build_context_reads_readme_named_by_listing(mock_fetch_info, mock_fetch_readme):
+    siblings = [{"rfilename": "Readme", "size": 1}, {"rfilename": "w.bin", "size": 9}]
+    mock_fetch_info.return_value = {"siblings": siblings}
+    context = build_context_from_api("https://huggingface.co/org/model")
+    assert context["readme_content"] == "# Card"
+    assert mock_fetch_readme.call_args.kwargs["filename"] == "Readme"
+
+    mock_fetch_readme.reset_mock()
+    mock_fetch_info.return_value = {"siblings": [{"rfilename": "w.bin", "size": 9}]}
+    context = build_context_from_api("https://huggingface.co/org/model")
+    assert context["readme_content"] == ""
+    mock_fetch_readme.assert_not_called()
+
+
+def test_readme_filename_prefers_markdown_at_top_level():
+    from acmecli.metrics.hf_api import readme_filename
+
+    def listing(*names):
+        return {"siblings": [{"rfilename": n} for n in names]}
+
+    assert readme_filename(listing("docs/README.md", "README", "README.md")) == "README.md"
+    assert readme_filename(listing("readme.txt")) == "readme.txt"
+    assert readme_filename(listing("docs/README.md")) is None
+    assert readme_filename({}) == "README.md"  # no listing: one best guess
+
+
+@patch("acmecli.metrics.hf_api.fetch_readme_content", return_value="")
+@patch("acmecli.metrics.hf_api.fetch_tree_size")
+@patch("acmecli.metrics.hf_api.fetch_model_info")
+def test_build_context_uses_sibling_sizes_without_tree_call(
+    mock_fetch_info, mock_fetch_files, mock_fetch_readme
+):
+    mock_fetch_info.return_value = {
+        "downloads": 10,
+        "siblings": [{"rfilename": "a.bin", "size": 100}, {"rfilename": "b.json", "size": 5}],
+    }
+    context = build_context_from_api("https://huggingface.co/org/model")
+    assert context["total_bytes"] == 105
+    mock_fetch_files.assert_not_called()
+
+
+def test_files_from_siblings_requires_every_size():
+    from acmecli.metrics.hf_api import files_from_siblings
+
+    assert files_from_siblings({"siblings": [{"size": 1}]}) == [{"size": 1}]
+    assert files_from_siblings({"siblings": [{"size": 1}, {"rfilename": "x"}]}) is None
+    assert files_from_siblings({"siblings": []}) is None
+    assert files_from_siblings({}) is None
+
+
+@patch("acmecli.metrics.hf_api.fetch_readme_content", return_value="")
+@patch("acmecli.metrics.hf_api.fetch_tree_size", return_value=0)
+@patch("acmecli.metrics.hf_api.fetch_model_info")
+def test_build_context_lookup_error_discards_speculative_fetches(
+    mock_fetch_info, mock_fetch_files, mock_fetch_readme
+):
+    from acmecli.metrics.hf_api import ModelLookupError
+
+    mock_fetch_info.side_effect = ModelLookupError("org/missing", 404, "Not Found")
+    with pytest.raises(ModelLookupError):
+        build_context_from_api("https://huggingface.co/org/missing")
+
+
+def test_extract_model_id_canonicalizes_url_variants():
+    variants = [
+        "https://huggingface.co/org/m",
+        "https://huggingface.co/org/m/",
+        "https://huggingface.co/org/m/tree/main",
+        "https://huggingface.co/org/m/blob/main/config.json",
+        "https://huggingface.co/org/m?library=transformers#usage",
+        "huggingface.co/org/m",
+    ]
+    assert {extract_model_id(u) for u in variants} == {"org/m"}
+    assert extract_model_id("https://huggingface.co/gpt2/tree/main") == "gpt2"
+    with pytest.raises(ValueError):
+        extract_model_id("https://huggingface.co/")
+
+
+def _tree_response(entries, next_url=None):
+    r = Mock(status_code=200)
+    r.json.return_value = entries
+    r.links = {"next": {"url": next_url}} if next_url else {}
+    return r
+
+
+def test_fetch_tree_size_walks_directories_and_pages():
+    from acmecli.metrics.hf_api import fetch_tree_size
+
+    base = "https://huggingface.co/api/models/org/sd/tree/main"
+    pages = {
+        base: _tree_response(
+            [{"type": "file", "path": "a.json", "size": 10}, {"type": "directory", "path": "unet"}]
+        ),
+        f"{base}/unet": _tree_response(
+            [{"type": "file", "path": "unet/1.bin", "size": 100}], next_url=f"{base}/unet?c=2"
+        ),
+        f"{base}/unet?c=2": _tree_response(
+            [
+                {"type": "file", "path": "unet/2.bin", "size": 200},
+                {"type": "directory", "path": "unet/deep"},
+            ]
+        ),
+        f"{base}/unet/deep": _tree_response([{"type": "file", "path": "unet/deep/x", "size": 5}]),
+    }
+
+    def fake_get(url, **kwargs):
+        return pages[url]
+
+    with patch("acmecli.metrics.hf_api.http_get", side_effect=fake_get):
+        assert fetch_tree_size("org/sd") == 315
+        with patch.dict("os.environ", {"ACME_TREE_MAX_DEPTH": "1"}):
+            assert fetch_tree_size("org/sd") == 310  # unet/deep is beyond the limit
+
+
+def test_fetch_tree_size_is_best_effort():
+    from acmecli.metrics.hf_api import fetch_tree_size
+
+    with patch("acmecli.metrics.hf_api.http_get", side_effect=requests.RequestException("x")):
+        assert fetch_tree_size("org/m") == 0
+
+
+def test_negative_cache_replays_missing_model_without_network(tmp_path):
+    from acmecli import http_cache
+    from acmecli.metrics.hf_api import ModelLookupError
+
+    http_cache.configure_cache(str(tmp_path))
+    try:
+        missing = Mock(status_code=404, reason="Not Found", headers={})
+        with patch("acmecli.metrics.hf_api.http_get", return_value=missing) as mock_get:
+            with pytest.raises(ModelLookupError) as first:
+                fetch_model_info("org/gone")
+            with pytest.raises(ModelLookupError) as second:
+                fetch_model_info("org/gone")
+            with pytest.raises(ModelLookupError):
+                fetch_model_info("org/gone", token="hf_other")  # other credentials: re-checked
+        assert mock_get.call_count == 2
+        assert str(second.value) == str(first.value)
+        assert (first.value.cached, second.value.cached) == (False, True)
+    finally:
+        http_cache.configure_cache(None)
+
+
+def test_negative_cache_ignores_server_errors(tmp_path):
+    from acmecli import http_cache
+    from acmecli.metrics.hf_api import ModelLookupError
+
+    http_cache.configure_cache(str(tmp_path))
+    try:
+        broken = Mock(status_code=500, reason="Server Error", headers={})
+        with patch("acmecli.metrics.hf_api.http_get", return_value=broken) as mock_get:
+            for _ in range(2):
+                with pytest.raises(ModelLookupError):
+                    fetch_model_info("org/flaky")
+        assert mock_get.call_count == 2
+    finally:
+        http_cache.configure_cache(None)
+
+
+def test_iter_model_listing_pages_lazily_with_expanded_fields():
+    from acmecli.metrics.hf_api import iter_model_listing
+
+    first = _tree_response(
+        [{"id": "org/a", "downloads": 1}, {"no": "id"}], next_url="https://next/2"
+    )
+    second = _tree_response([{"id": "org/b", "downloads": 2}])
+    with patch("acmecli.metrics.hf_api.http_get", side_effect=[first, second]) as mock_get:
+        it = iter_model_listing(author="org", search="bert")
+        assert next(it)["id"] == "org/a"
+        assert mock_get.call_count == 1  # second page not requested yet
+        assert [e["id"] for e in it] == ["org/b"]
+    url = mock_get.call_args_list[0].args[0]
+    assert "author=org" in url and "search=bert" in url
+    assert "expand%5B%5D=siblings" in url and "expand%5B%5D=cardData" in url
+
+
+@patch("acmecli.metrics.hf_api.fetch_readme_content", return_value="")
+@patch("acmecli.metrics.hf_api.fetch_tree_size", return_value=7)
+@patch("acmecli.metrics.hf_api.fetch_model_info")
+def test_build_context_reuses_listing_metadata(mock_fetch_info, mock_tree, mock_readme):
+    # Listing entries have no blob sizes: one sized info call replaces the tree walk
+    mock_fetch_info.return_value = {"siblings": [{"rfilename": "README.md", "size": 5}]}
+    listed = {"id": "org/a", "downloads": 321, "siblings": [{"rfilename": "README.md"}]}
+    context = build_context_from_api("https://huggingface.co/org/a", model_info=listed)
+    assert context["downloads"] == 321
+    mock_fetch_info.assert_called_once()
+    mock_tree.assert_not_called()
+
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+def test_extract_model_ref_keeps_the_requested_revision():
+    from acmecli.metrics.hf_api import extract_model_ref
+
+    assert extract_model_ref("https://huggingface.co/org/m") == ("org/m", "main")
+    assert extract_model_ref("https://huggingface.co/org/m/tree/v1.0") == ("org/m", "v1.0")
+    assert extract_model_ref(f"https://huggingface.co/org/m/blob/{SHA}/a.json") == ("org/m", SHA)
+    assert extract_model_ref("https://huggingface.co/org/m/tree/refs%2Fpr%2F3") == (
+        "org/m",
+        "refs/pr/3",
+    )
+
+
+@patch("acmecli.metrics.hf_api.http_get")
+def test_build_context_pins_tree_and_readme_to_resolved_sha(mock_get):
+    info = Mock(status_code=200, headers={})
+    info.json.return_value = {"sha": SHA, "siblings": [{"rfilename": "README.md"}]}
+    readme = Mock(status_code=200, text="# Card")
+
+    def respond(url, **kwargs):
+        if kwargs["cache_kind"] == "info":
+            return info
+        return readme if url.endswith("README.md") else _tree_response([])
+
+    mock_get.side_effect = respond
+
+    context = build_context_from_api("https://huggingface.co/org/m/tree/v1.0")
+    assert context["sha"] == SHA
+    urls = {c.args[0]: c.kwargs["cache_kind"] for c in mock_get.call_args_list}
+    assert urls["https://huggingface.co/api/models/org/m/revision/v1.0?blobs=true"] == "info"
+    assert urls[f"https://huggingface.co/org/m/raw/{SHA}/README.md"] == "pinned"
+    assert urls[f"https://huggingface.co/api/models/org/m/tree/{SHA}"] == "pinned"
+    # "pinned" is a cache class only: tree pages and READMEs keep separate hedge windows
+    hedge = {c.args[0]: c.kwargs.get("hedge_kind") for c in mock_get.call_args_list}
+    assert hedge[f"https://huggingface.co/org/m/raw/{SHA}/README.md"] == "readme"
+    assert hedge[f"https://huggingface.co/api/models/org/m/tree/{SHA}"] == "tree"
+
+
+@patch("acmecli.llm_analysis.get_llm_provider", return_value=None)
+def test_readme_analysis_is_reused_for_the_same_sha(_provider, tmp_path):
+    from acmecli import http_cache
+    from acmecli.metrics.hf_api import estimate_docs_quality
+
+    http_cache.configure_cache(str(tmp_path))
+    try:
+        with patch(
+            "acmecli.llm_analysis._analyze_readme_locally",
+            return_value={"documentation_quality": 1.0},
+        ) as analyze:
+            first = estimate_docs_quality({}, "# Card", "org/m", SHA)
+            second = estimate_docs_quality({}, "# Card", "org/m", SHA)
+            estimate_docs_quality({}, "# Card", "org/m", "")  # unpinned: not stored
+        assert first == second
+        assert analyze.call_count == 2
+    finally:
+        http_cache.configure_cache(None)
+
+
+def test_readme_analysis_is_keyed_by_the_byte_ceiling(monkeypatch):
+    from acmecli.metrics.hf_api import readme_analysis_artifact
+
+    small = readme_analysis_artifact("local")
+    monkeypatch.setenv("ACME_README_MAX_BYTES", "1048576")
+    assert readme_analysis_artifact("local") != small
+    monkeypatch.setenv("ACME_README_MAX_BYTES", "0")
+    assert readme_analysis_artifact("local") == "readme_analysis:local:full"
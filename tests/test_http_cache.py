@@ -0,0 +1,88 @@
+"""
+Tests for the persistent HTTP response cache (TTL, revalidation, LRU eviction).
+"""
+
+import os
+import time
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from acmecli import http_cache
+from acmecli.http_cache import HttpCache, cached_get
+
+
+def _resp(status, body="", headers=None):
+    r = Mock(status_code=status, text=body, headers=headers or {})
+    r.elapsed = timedelta(milliseconds=5)
+    return r
+
+
+def test_fresh_entry_is_served_without_network(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1_000_000)
+    send = Mock(return_value=_resp(200, '{"a": 1}', {"ETag": '"v1"'}))
+
+    first = cached_get(cache, "https://hf/api/models/x", "info", {}, send)
+    second = cached_get(cache, "https://hf/api/models/x", "info", {}, send)
+
+    assert first.text == second.text == '{"a": 1}'
+    assert second.json() == {"a": 1}
+    assert send.call_count == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_stale_entry_revalidates_with_etag(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1_000_000, ttls={"readme": 0})
+    headers = {"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    cached_get(cache, "https://hf/r", "readme", {}, Mock(return_value=_resp(200, "body", headers)))
+
+    send = Mock(return_value=_resp(304))
+    r = cached_get(cache, "https://hf/r", "readme", {}, send)
+
+    sent = send.call_args[0][0]
+    assert sent["If-None-Match"] == '"abc"'
+    assert sent["If-Modified-Since"] == headers["Last-Modified"]
+    assert r.status_code == 200 and r.text == "body"
+    assert cache.stats["revalidated"] == 1
+
+
+def test_cache_key_separates_credentials(tmp_path):
+    assert HttpCache.key("u", {"Authorization": "Bearer a"}) != HttpCache.key("u", {})
+
+
+def test_cache_key_separates_byte_ranges(tmp_path):
+    short = HttpCache.key("u", {"Range": "bytes=0-1023"})
+    assert short != HttpCache.key("u", {"Range": "bytes=0-4095"})
+    assert short != HttpCache.key("u", {})
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=800)  # ~240 bytes per entry
+    for i in range(3):
+        cache.save(cache.key(f"u{i}"), f"u{i}", {}, "x" * 150)
+        time.sleep(0.01)
+    cache.note_access(cache.key("u0"))  # u0 becomes most recently used
+    cache.save(cache.key("u3"), "u3", {}, "x" * 150)
+
+    assert cache.load(cache.key("u1")) is None
+    assert cache.load(cache.key("u0")) is not None
+    assert cache.load(cache.key("u3")) is not None
+    assert cache.stats["evicted"] >= 1
+
+
+def test_cache_survives_reopen(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1_000_000)
+    cache.save(cache.key("u"), "u", {}, "persisted")
+    reopened = HttpCache(str(tmp_path), max_bytes=1_000_000)
+    assert reopened.load(reopened.key("u"))["body"] == "persisted"
+
+
+def test_configure_cache_reads_env(tmp_path):
+    env = {"ACME_CACHE_TTL_INFO": "5", "ACME_CACHE_MAX_MB": "1"}
+    with patch.dict(os.environ, env):
+        cache = http_cache.configure_cache(str(tmp_path))
+    try:
+        assert cache.ttls["info"] == 5.0
+        assert cache.max_bytes == 1024 * 1024
+        assert http_cache.get_cache() is cache
+    finally:
+        http_cache.configure_cache(None)
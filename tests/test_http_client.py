@@ -0,0 +1,67 @@
+"""
+Tests for the shared pooled HTTP transport.
+"""
+
+import io
+import os
+from unittest.mock import Mock, patch
+
+import requests
+
+from acmecli import http_client
+
+
+def test_get_session_is_shared_and_resettable():
+    http_client.reset_session()
+    s1 = http_client.get_session()
+    s2 = http_client.get_session()
+    assert s1 is s2
+    http_client.reset_session()
+    assert http_client.get_session() is not s1
+    http_client.reset_session()
+
+
+def test_session_adapter_uses_env_pool_size():
+    http_client.reset_session()
+    with patch.dict(os.environ, {"ACME_HTTP_POOL_SIZE": "7", "ACME_HTTP_RETRIES": "3"}):
+        adapter = http_client.get_session().get_adapter("https://huggingface.co/api")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.connect == 3
+    assert adapter.max_retries.read == 0
+    http_client.reset_session()
+
+
+def test_http_get_and_post_delegate_to_session():
+    fake = Mock()
+    with patch.object(http_client, "get_session", return_value=fake):
+        http_client.http_get("https://example.com/a", headers={"X": "1"})
+        http_client.http_post("https://example.com/b", json={"k": 1})
+    fake.get.assert_called_once_with("https://example.com/a", headers={"X": "1"}, timeout=10)
+    fake.post.assert_called_once_with(
+        "https://example.com/b", headers=None, timeout=20, json={"k": 1}
+    )
+
+
+def _streamed(status, body):
+    r = requests.Response()
+    r.status_code = status
+    r.raw = io.BytesIO(body)
+    return r
+
+
+def test_bounded_get_sends_range_and_caps_body():
+    fake = Mock()
+    fake.get.return_value = _streamed(200, b"x" * 5000)  # server ignored the Range
+    with patch.object(http_client, "get_session", return_value=fake):
+        r = http_client.http_get("https://example.com/README.md", max_bytes=1000)
+    kwargs = fake.get.call_args.kwargs
+    assert kwargs["headers"]["Range"] == "bytes=0-999"
+    assert kwargs["stream"] is True
+    assert r.status_code == 200 and r.text == "x" * 1000
+
+
+def test_read_bounded_maps_partial_and_empty_ranges():
+    r = http_client.read_bounded(_streamed(206, b"# Title"), 100)
+    assert (r.status_code, r.text) == (200, "# Title")
+    r = http_client.read_bounded(_streamed(416, b""), 100)
+    assert (r.status_code, r.text) == (200, "")
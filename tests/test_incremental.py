@@ -0,0 +1,100 @@
+"""
+Tests for incremental re-evaluation (--incremental): reuse of unchanged records.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from acmecli import incremental
+from acmecli.incremental import PreviousRun
+from acmecli.main import process_model
+
+OLD = "1111111111111111111111111111111111111111"
+NEW = "2222222222222222222222222222222222222222"
+
+
+@pytest.fixture
+def previous(tmp_path):
+    path = tmp_path / "prev.jsonl"
+    lines = [
+        json.dumps(
+            {
+                "name": "m",
+                "net_score": 0.5,
+                "sha": OLD,
+                "endpoint": "https://mirror.example",
+                "retry_stats": {"retries": 3},
+                "shard": "1/4",
+                "seq": 7,
+            }
+        ),
+        json.dumps({"name": "no-sha", "net_score": 0.1}),
+        "not json",
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    run = incremental.configure_previous(str(path))
+    yield run
+    incremental.configure_previous(None)
+
+
+def test_load_indexes_records_that_carry_a_sha(previous):
+    assert list(previous.records) == [("m", OLD)]
+
+
+@patch("acmecli.main.build_ctx_from_url")
+@patch("acmecli.incremental.fetch_model_sha", return_value=OLD)
+def test_unchanged_model_reemits_previous_record(mock_sha, mock_build, previous):
+    rec = process_model("https://huggingface.co/org/m")
+    assert rec["net_score"] == 0.5 and rec["sha"] == OLD
+    # The earlier run's shard tag, endpoint and retry counts are not carried over
+    assert "shard" not in rec and "seq" not in rec
+    assert rec["endpoint"] != "https://mirror.example"
+    assert rec["retry_stats"]["retries"] == 0
+    mock_sha.assert_called_once_with("org/m", revision="main")
+    mock_build.assert_not_called()
+    assert previous.summary() == "incremental: 1 of 1 models unchanged (records reused)"
+
+
+@patch("acmecli.incremental.fetch_model_sha", return_value=NEW)
+def test_changed_model_is_evaluated_again(mock_sha, previous):
+    assert previous.unchanged("https://huggingface.co/org/m") is None
+    assert previous.reused == 0 and previous.checked == 1
+
+
+@patch("acmecli.incremental.fetch_model_sha")
+def test_listing_entry_sha_needs_no_request(mock_sha, previous):
+    assert previous.unchanged("https://huggingface.co/org/m", {"sha": OLD}) is not None
+    assert previous.unchanged("https://huggingface.co/org/m", {}) is None
+    mock_sha.assert_not_called()
+
+
+def test_sha_check_asks_only_for_the_sha_and_is_free_for_pinned_urls():
+    from acmecli.metrics.hf_api import fetch_model_sha
+
+    with patch("acmecli.metrics.hf_api.http_get") as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"_id": "x", "sha": NEW}
+        assert fetch_model_sha("org/m") == NEW
+        assert mock_get.call_args.args[0].endswith("/models/org/m?expand%5B%5D=sha")
+        assert "cache_kind" not in mock_get.call_args.kwargs  # always live
+        mock_get.reset_mock()
+        assert fetch_model_sha("org/m", revision=OLD) == OLD
+    mock_get.assert_not_called()
+
+
+def test_async_check_matches_sync(previous):
+    async def fake_sha(session, model_id, token=None, revision="main"):
+        return OLD
+
+    with patch("acmecli.metrics.hf_api_async.afetch_model_sha", fake_sha):
+        rec = asyncio.run(previous.aunchanged(None, "https://huggingface.co/org/m"))
+    assert rec is not None and rec["net_score"] == 0.5
+
+
+def test_empty_previous_run_skips_the_check():
+    with patch("acmecli.incremental.fetch_model_sha") as mock_sha:
+        assert PreviousRun({}).unchanged("https://huggingface.co/org/m") is None
+    mock_sha.assert_not_called()
@@ -18,7 +18,11 @@ Validation Coverage:
 - Cross-platform compatibility for diverse deployment environments
 """
 
+import io
 import json
+import sys
+
+import pytest
 
 from acmecli.io_utils import read_urls, write_ndjson_line
 
@@ -44,6 +48,18 @@ def test_read_urls_skips_blanks(tmp_path):
     assert urls == ["https://huggingface.co/gpt2", "https://huggingface.co/datasets/squad"]
 
 
+def test_read_urls_dash_reads_stdin(monkeypatch):
+    """``-`` streams URLs from stdin, splitting comma-separated lines."""
+    monkeypatch.setattr(sys, "stdin", io.StringIO("https://a, https://b\n\nhttps://c\n"))
+    assert list(read_urls("-")) == ["https://a", "https://b", "https://c"]
+
+
+def test_read_urls_missing_file_fails_up_front(tmp_path):
+    """The file is opened when read_urls is called, not on the first URL."""
+    with pytest.raises(OSError):
+        read_urls(str(tmp_path / "missing.txt"))
+
+
 def test_write_ndjson_line_writes_valid_json(capsys):
     """
     Verify NDJSON output formatting for streaming data processing compatibility.
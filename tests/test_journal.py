@@ -0,0 +1,113 @@
+"""
+Tests for the checkpoint journal and --resume.
+"""
+
+import json
+import sys
+
+import pytest
+
+from acmecli import main as app
+from acmecli.journal import Checkpoint, Journal
+from acmecli.metrics.hf_api import ModelLookupError
+
+
+def _write_journal(path, entries, torn=""):
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries) + torn)
+
+
+def test_checkpoint_tracks_a_watermark_retries_and_output_sizes(tmp_path):
+    j = tmp_path / "run.journal"
+    entries = [
+        {"seq": 0, "status": "ok", "out": 10},
+        {"seq": 2, "status": "failed", "out": 10, "err": 5},
+        {"seq": 1, "status": "retry", "out": 10, "err": 9},
+        {"seq": 4, "status": "ok", "out": 20, "err": 9},
+    ]
+    _write_journal(j, entries, torn='{"seq": 3, "sta')
+    cp = Checkpoint.load(str(j))
+    assert [cp.done(i) for i in range(6)] == [True, False, True, False, True, False]
+    assert (cp.watermark, cp.retries, cp.out, cp.err) == (3, 1, 20, 9)
+
+
+def test_journal_lines_wait_for_the_sync(tmp_path, monkeypatch):
+    monkeypatch.setenv("ACME_JOURNAL_SYNC_EVERY", "2")
+    path = tmp_path / "run.journal"
+    journal = Journal(str(path))
+    assert list(journal.admit(["a", "b", "a"])) == ["a", "b", "a"]
+    journal.settle("a", "ok")
+    assert path.read_text() == ""
+    journal.settle("a", "failed")
+    assert [json.loads(line)["seq"] for line in path.read_text().splitlines()] == [0, 2]
+    journal.settle("b", "ok")
+    journal.close()
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_resume_skips_settled_urls_and_drops_unjournaled_output(tmp_path, monkeypatch):
+    names = ["a", "b", "c", "d", "e"]
+    urls = tmp_path / "urls.txt"
+    urls.write_text("".join(f"https://huggingface.co/org/{n}\n" for n in names))
+    out = tmp_path / "out.ndjson"
+    calls = []
+    down = {"c"}
+    busy = {"e"}
+
+    def flaky(url):
+        name = url.split("/")[-1]
+        calls.append(name)
+        if name == "b":
+            raise ModelLookupError("org/b", 404, "Not Found")
+        if name in down:
+            raise RuntimeError("network error")
+        if name in busy:
+            raise ModelLookupError("org/e", 503, "Service Unavailable")
+        return {"name": name, "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "process_model", flaky)
+    argv = ["prog", str(urls), "--ndjson", str(out), "--preserve-order", "--model-workers", "1"]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit):
+        app.main()
+    assert [json.loads(line)["name"] for line in out.read_text().splitlines()] == ["a", "d"]
+
+    # Crash simulation: "d" was written but its journal entry never reached disk
+    journal = tmp_path / "out.ndjson.journal"
+    lines = journal.read_text().splitlines()
+    # 404 is final; a network error and a 503 out of retries are retried
+    statuses = [json.loads(line)["status"] for line in lines]
+    assert statuses == ["ok", "failed", "retry", "ok", "retry"]
+    journal.write_text("\n".join(lines[:3]) + "\n")
+    with open(out, "a") as fh:
+        fh.write('{"name": "torn')
+
+    calls.clear()
+    down.clear()
+    busy.clear()
+    monkeypatch.setattr(sys, "argv", argv + ["--resume"])
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+    assert exc_info.value.code == 0
+    assert calls == ["c", "d", "e"]
+    written = [json.loads(line)["name"] for line in out.read_text().splitlines()]
+    assert written == ["a", "c", "d", "e"]
+
+
+def test_resume_with_an_empty_journal_starts_the_outputs_over(tmp_path, monkeypatch):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("".join(f"https://huggingface.co/org/{n}\n" for n in "abc"))
+    out = tmp_path / "out.ndjson"
+    # Killed before the first journal sync: records on disk, nothing journaled
+    out.write_text('{"name": "a"}\n{"name": "b"}\n')
+    (tmp_path / "out.ndjson.journal").write_text("")
+
+    def model(url):
+        return {"name": url.split("/")[-1], "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "process_model", model)
+    argv = ["prog", str(urls), "--ndjson", str(out), "--preserve-order", "--resume"]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+    assert exc_info.value.code == 0
+    assert [json.loads(line)["name"] for line in out.read_text().splitlines()] == ["a", "b", "c"]
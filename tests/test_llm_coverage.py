@@ -43,7 +43,7 @@ def test_purdue_api_success():
     }
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", return_value=mock_resp):
+        with patch("acmecli.llm_providers.http_post", return_value=mock_resp):
             result = analyze_readme_with_llm(readme_content, model_name)
 
     assert "documentation_quality" in result
@@ -63,7 +63,7 @@ def test_purdue_api_empty_response_falls_back():
     mock_resp.json.return_value = {"choices": [{"message": {"content": None}}]}
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", return_value=mock_resp):
+        with patch("acmecli.llm_providers.http_post", return_value=mock_resp):
             result = analyze_readme_with_llm(readme_content, model_name)
 
     # Fallback to local analysis
@@ -76,7 +76,7 @@ def test_purdue_api_request_error_falls_back():
     model_name = "test-model"
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", side_effect=Exception("API error")):
+        with patch("acmecli.llm_providers.http_post", side_effect=Exception("API error")):
             result = analyze_readme_with_llm(readme_content, model_name)
 
     assert "examples_present" in result
@@ -97,7 +97,7 @@ def test_enhance_ramp_up_time_with_llm_success():
     }
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", return_value=mock_resp):
+        with patch("acmecli.llm_providers.http_post", return_value=mock_resp):
             result = enhance_ramp_up_time_with_llm(base_score, readme_content, model_name)
 
     assert isinstance(result, float)
@@ -110,7 +110,7 @@ def test_enhance_ramp_up_time_with_llm_api_error():
     model_name = "test-model"
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", side_effect=Exception("API error")):
+        with patch("acmecli.llm_providers.http_post", side_effect=Exception("API error")):
             result = enhance_ramp_up_time_with_llm(base_score, readme_content, model_name)
 
     assert isinstance(result, float)
@@ -127,7 +127,7 @@ def test_enhance_ramp_up_time_with_llm_invalid_response():
     mock_resp.json.return_value = {"choices": [{"message": {"content": "Not valid JSON"}}]}
 
     with patch.dict(os.environ, _env_purdue(), clear=True):
-        with patch("acmecli.llm_providers.requests.post", return_value=mock_resp):
+        with patch("acmecli.llm_providers.http_post", return_value=mock_resp):
             result = enhance_ramp_up_time_with_llm(base_score, readme_content, model_name)
 
     assert isinstance(result, float)
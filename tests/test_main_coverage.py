@@ -2,6 +2,7 @@
 Additional tests to improve code coverage for main.py error handling paths.
 """
 
+import io
 import json
 import sys
 from pathlib import Path
@@ -180,3 +181,132 @@ class DummyPool:
             "code_quality_latency": 0,
         }
         return future
+
+
+def test_main_async_flag_uses_async_engine(tmp_path, monkeypatch, capsys):
+    """--async routes evaluation through the asyncio engine and its outcome callback."""
+    from acmecli import async_engine
+
+    p = tmp_path / "urls.txt"
+    p.write_text("https://huggingface.co/org/a\nhttps://huggingface.co/org/b\n")
+    error_file = tmp_path / "errors.jsonl"
+
+    def fake_run(urls, on_outcome, concurrency):
+        assert concurrency == 5
+        urls = list(urls)  # streamed: pulled by the engine as slots free up
+        on_outcome(urls[0], {"name": "a", "category": "MODEL", "net_score": 0.5}, None)
+        on_outcome(urls[1], None, ModelLookupError("org/b", 404, "Not Found"))
+
+    monkeypatch.setattr(async_engine, "run_models_async", fake_run)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["prog", str(p), "--async", "--concurrency", "5", "--error-file", str(error_file)],
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+
+    assert exc_info.value.code == 1
+    out = capsys.readouterr().out.strip().splitlines()
+    assert [json.loads(line)["name"] for line in out] == ["a"]
+    assert json.loads(error_file.read_text())["kind"] == "lookup"
+
+
+def test_main_evaluates_duplicate_model_urls_once(tmp_path, monkeypatch, capsys):
+    """URL variants of one model are fetched once and fanned out to every input line."""
+    p = tmp_path / "urls.txt"
+    p.write_text(
+        "https://huggingface.co/org/m\n"
+        "https://huggingface.co/org/m/\n"
+        "https://huggingface.co/org/m/tree/main\n"
+        "https://huggingface.co/org/other\n"
+    )
+    calls = []
+
+    def fake_process_model(url):
+        calls.append(url)
+        return {"name": url.rstrip("/").split("/")[-1], "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "process_model", fake_process_model)
+    monkeypatch.setattr(sys, "argv", ["prog", str(p)])
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+
+    assert exc_info.value.code == 0
+    assert sorted(calls) == ["https://huggingface.co/org/m", "https://huggingface.co/org/other"]
+    names = [json.loads(line)["name"] for line in capsys.readouterr().out.strip().splitlines()]
+    assert sorted(names) == ["m", "m", "m", "other"]
+
+
+def test_main_reads_urls_from_stdin(monkeypatch, capsys):
+    calls = []
+
+    def fake_process_model(url):
+        calls.append(url)
+        return {"name": url.split("/")[-1], "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "process_model", fake_process_model)
+    monkeypatch.setattr(sys, "stdin", io.StringIO("https://huggingface.co/org/a\n"))
+    monkeypatch.setattr(sys, "argv", ["prog", "-"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+
+    assert exc_info.value.code == 0
+    assert calls == ["https://huggingface.co/org/a"]
+    assert json.loads(capsys.readouterr().out)["name"] == "a"
+
+
+def test_error_file_flags_negative_cache_hits(tmp_path, monkeypatch):
+    p = tmp_path / "urls.txt"
+    p.write_text("https://huggingface.co/org/gone\n")
+    error_file = tmp_path / "errors.jsonl"
+
+    def known_bad(url):
+        raise ModelLookupError("org/gone", 404, "Not Found", cached=True)
+
+    monkeypatch.setattr(sys, "argv", ["prog", str(p), "--error-file", str(error_file)])
+    monkeypatch.setattr(app, "process_model", known_bad)
+    with pytest.raises(SystemExit):
+        app.main()
+
+    (line,) = error_file.read_text().splitlines()
+    record = json.loads(line)
+    assert record["kind"] == "lookup" and record["cached"] is True
+    assert record["error"] == "model lookup failed: org/gone: HTTP 404 - Not Found"
+
+
+def test_main_author_mode_streams_listing_into_scoring(monkeypatch, capsys):
+    listing = [{"id": "org/a", "downloads": 1}, {"id": "org/b", "downloads": 2}]
+    seen = {}
+
+    def fake_listing(author=None, search=None):
+        assert (author, search) == ("org", None)
+        yield from listing
+
+    def fake_process_model(url, model_info=None):
+        seen[url] = model_info
+        return {"name": url.split("/")[-1], "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "iter_model_listing", fake_listing)
+    monkeypatch.setattr(app, "process_model", fake_process_model)
+    monkeypatch.setattr(sys, "argv", ["prog", "--author", "org"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+
+    assert exc_info.value.code == 0
+    assert seen["https://huggingface.co/org/b"] is listing[1]
+    names = sorted(json.loads(line)["name"] for line in capsys.readouterr().out.splitlines())
+    assert names == ["a", "b"]
+
+
+def test_main_rejects_url_file_with_author(tmp_path, monkeypatch):
+    p = tmp_path / "urls.txt"
+    p.write_text("https://huggingface.co/org/a\n")
+    monkeypatch.setattr(sys, "argv", ["prog", str(p), "--author", "org"])
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+    assert exc_info.value.code == 1
@@ -0,0 +1,99 @@
+"""
+Tests for python -m acmecli.merge (combining sharded outputs).
+"""
+
+import json
+
+import pytest
+
+from acmecli import merge
+
+
+def _write(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    return str(path)
+
+
+def _rec(seq, shard, score=0.5):
+    return {"name": f"m{seq}", "net_score": score, "shard": shard, "seq": seq}
+
+
+def _err(seq, shard):
+    return {
+        "url": f"https://huggingface.co/org/m{seq}",
+        "error": "boom",
+        "shard": shard,
+        "seq": seq,
+    }
+
+
+@pytest.fixture
+def shards(tmp_path):
+    s0 = _write(tmp_path / "s0.jsonl", [_rec(4, "0/2"), _rec(0, "0/2", 0.9), _rec(4, "0/2")])
+    # Shard 1 failed on seq 3 first, then a resume produced its record
+    s1 = _write(tmp_path / "s1.jsonl", [_rec(1, "1/2", 0.1), _rec(3, "1/2")])
+    e1 = _write(tmp_path / "e1.jsonl", [_err(3, "1/2"), _err(2, "1/2")])
+    return tmp_path, [s0, s1], [e1]
+
+
+@pytest.mark.parametrize("order", [False, True])
+def test_merge_writes_each_position_once(shards, capsys, order):
+    tmp_path, records, errors = shards
+    out, err, summary = tmp_path / "out.jsonl", tmp_path / "err.jsonl", tmp_path / "sum.json"
+    argv = records + ["--errors", *errors, "-o", str(out), "--error-file", str(err)]
+    argv += ["--summary", str(summary)] + (["--order"] if order else [])
+    merge.main(argv)
+
+    seqs = [json.loads(line)["seq"] for line in out.read_text().splitlines()]
+    assert sorted(seqs) == [0, 1, 3, 4]
+    if order:
+        assert seqs == [0, 1, 3, 4]
+    assert [json.loads(line)["seq"] for line in err.read_text().splitlines()] == [2]
+    result = json.loads(summary.read_text())
+    assert result["records"] == 4 and result["errors"] == 1
+    assert (result["duplicates"], result["superseded"]) == (1, 1)
+    assert result["shards"] == ["0/2", "1/2"] and result["missing_shards"] == []
+    assert result["categories"]["excellent"] == 1 and result["net_score"]["lowest"] == 0.1
+    assert "merge summary:" in capsys.readouterr().err
+
+
+def test_ordered_merge_spills_sorted_runs_and_counts_gaps(tmp_path):
+    rows = [_rec(seq, "0/1") for seq in (9, 2, 7, 0, 5, 1)]
+    written = []
+    summary = merge.MergeSummary()
+    merge.merge_ordered(
+        [_write(tmp_path / "s.jsonl", rows)],
+        [],
+        lambda kind, line: written.append(json.loads(line)["seq"]),
+        summary,
+        run_size=2,
+    )
+    assert written == [0, 1, 2, 5, 7, 9]
+    assert summary.stats["missing_positions"] == 4
+
+
+def test_merge_fails_when_a_shard_is_missing(tmp_path, capsys):
+    s0 = _write(tmp_path / "s0.jsonl", [_rec(0, "0/3")])
+    with pytest.raises(SystemExit) as exc_info:
+        merge.main([s0, "-o", str(tmp_path / "out.jsonl")])
+    assert exc_info.value.code == 1
+    assert "1/3" in capsys.readouterr().err
+
+
+def test_missing_error_file_counts_as_empty(shards, capsys):
+    tmp_path, records, errors = shards
+    out = tmp_path / "out.jsonl"
+    merge.main(records + ["--errors", *errors, str(tmp_path / "e0.jsonl"), "-o", str(out)])
+    assert len(out.read_text().splitlines()) == 4
+    assert "e0.jsonl not found" in capsys.readouterr().err
+
+
+def test_unreadable_input_leaves_the_output_untouched(shards, capsys):
+    tmp_path, records, _ = shards
+    out = tmp_path / "out.jsonl"
+    out.write_text("previous merge\n")
+    with pytest.raises(SystemExit) as exc_info:
+        merge.main(records + [str(tmp_path / "s9.jsonl"), "-o", str(out)])
+    assert exc_info.value.code == 1
+    assert out.read_text() == "previous merge\n"
+    assert "s9.jsonl" in capsys.readouterr().err
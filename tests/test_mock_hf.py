@@ -0,0 +1,179 @@
+"""
+Tests for the bundled mock Hugging Face server and the configurable HF endpoint.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from acmecli.endpoints import configure_hf_endpoint, get_pool, hf_endpoint, served_scope
+from acmecli.metrics.hf_api import (
+    ModelLookupError,
+    build_context_from_api,
+    fetch_readme_content,
+    fetch_tree_size,
+)
+from acmecli.mock_hf import Faults, SyntheticHub, serve
+
+MODEL = "synthetic/model-00003"
+
+
+@pytest.fixture
+def hub():
+    return SyntheticHub(models=10, blob_sizes=False)
+
+
+@pytest.fixture
+def server(hub):
+    srv = serve(hub, Faults())
+    configure_hf_endpoint(srv.url)
+    with patch.dict(os.environ, {"ACME_RATE_LIMIT": "0", "ACME_RETRY_BASE_MS": "0"}):
+        yield srv
+    configure_hf_endpoint(None)
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_endpoint_defaults_to_the_hub_and_can_be_overridden():
+    assert hf_endpoint() == "https://huggingface.co"
+    with patch.dict(os.environ, {"ACME_HF_ENDPOINT": "http://mirror.local/"}):
+        assert hf_endpoint() == "http://mirror.local"
+        configure_hf_endpoint("http://other:1")
+        assert hf_endpoint() == "http://other:1"
+        configure_hf_endpoint(None)
+
+
+def test_context_is_built_against_the_mock(server, hub):
+    context = build_context_from_api(f"https://huggingface.co/{MODEL}")
+    assert context["sha"] == hub.sha(MODEL)
+    # No sibling sizes: the tree was walked through pages and subdirectories
+    assert context["total_bytes"] == sum(size for _, size in hub.file_list(MODEL))
+    assert context["readme_content"] == hub.readme(MODEL)
+    with pytest.raises(ModelLookupError):
+        build_context_from_api("https://huggingface.co/synthetic/model-99999")
+
+
+def test_tree_pages_and_readme_ranges(server, hub):
+    with patch("acmecli.mock_hf._Handler.tree_page_size", 1):
+        assert fetch_tree_size(MODEL) == sum(size for _, size in hub.file_list(MODEL))
+    with patch.dict(os.environ, {"ACME_README_MAX_BYTES": "10"}):
+        assert fetch_readme_content(MODEL) == hub.readme(MODEL)[:10]
+
+
+def test_injected_throttling_and_errors(hub):
+    srv = serve(hub, Faults(rate_429=1.0, retry_after=3))
+    try:
+        r = requests.get(f"{srv.url}/api/models/{MODEL}", timeout=5)
+        assert (r.status_code, r.headers["Retry-After"]) == (429, "3")
+        srv.faults = Faults(rate_5xx=1.0)
+        assert requests.get(f"{srv.url}/api/models/{MODEL}", timeout=5).status_code >= 500
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    assert srv.stats[429] == 1
+
+
+def test_failover_to_a_healthy_mirror(hub):
+    srv = serve(hub, Faults())
+    dead = "http://127.0.0.1:1"
+    configure_hf_endpoint(f"{dead},{srv.url}")
+    env = {"ACME_RATE_LIMIT": "0", "ACME_RETRY_BASE_MS": "0", "ACME_RETRY_ATTEMPTS": "0"}
+    try:
+        with patch.dict(os.environ, env):
+            pool = get_pool()
+            pool.probed = True  # skip probing: the dead endpoint is tried first
+            with served_scope() as served:
+                context = build_context_from_api(f"https://huggingface.co/{MODEL}")
+        assert context["sha"] == hub.sha(MODEL)
+        assert served == [srv.url]
+        # One failed request re-routes it but doesn't take the mirror out
+        assert pool.summary()[dead]["healthy"] is True
+    finally:
+        configure_hf_endpoint(None)
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_connection_errors_fail_over_without_retrying_the_same_mirror(hub):
+    from acmecli.retry import model_scope
+
+    srv = serve(hub, Faults())
+    configure_hf_endpoint(f"http://127.0.0.1:1,{srv.url}")
+    try:
+        with patch.dict(os.environ, {"ACME_RATE_LIMIT": "0", "ACME_RETRY_BASE_MS": "0"}):
+            get_pool().probed = True  # the dead endpoint is tried first
+            with model_scope() as retries:
+                fetch_readme_content(MODEL)
+        assert retries.as_record()["retries"] == 0
+        assert retries.as_record()["gave_up"] == 0
+    finally:
+        configure_hf_endpoint(None)
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_requests_during_the_probe_wait_for_it(hub):
+    import threading
+
+    dead, srv = "http://127.0.0.1:1", serve(hub, Faults(latency_ms=100))
+    configure_hf_endpoint(f"{dead},{srv.url}")
+    try:
+        with patch.dict(os.environ, {"ACME_RATE_LIMIT": "0"}):
+            pool = get_pool()
+            prober = threading.Thread(target=pool.probe_all)
+            prober.start()
+            while not pool._probing:
+                pass
+            # Not the configured order: the dead mirror was measured and dropped
+            assert hf_endpoint() == srv.url
+            prober.join()
+    finally:
+        configure_hf_endpoint(None)
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_mirror_is_marked_down_after_repeated_failures():
+    configure_hf_endpoint("http://a.local,http://b.local")
+    try:
+        with patch.dict(os.environ, {"ACME_HF_FAIL_THRESHOLD": "3"}):
+            pool = get_pool()
+            pool.probed = True
+            a = pool.endpoints[0]
+            pool.fail(a, "HTTP 503")
+            pool.fail(a, "HTTP 503")
+            assert a.healthy
+            pool.fail(a, "HTTP 503")
+            assert not a.healthy
+            assert hf_endpoint() == "http://b.local"
+    finally:
+        configure_hf_endpoint(None)
+
+
+def test_cache_hits_are_reported_as_served_by_the_cache(server, hub, tmp_path):
+    from acmecli import http_cache
+
+    http_cache.configure_cache(str(tmp_path))
+    try:
+        fetch_readme_content(MODEL)
+        with served_scope() as served:
+            assert fetch_readme_content(MODEL) == hub.readme(MODEL)
+        assert served == ["cache"]
+    finally:
+        http_cache.configure_cache(None)
+
+
+def test_probing_prefers_the_faster_mirror(hub):
+    slow = serve(hub, Faults(latency_ms=200))
+    fast = serve(hub, Faults())
+    configure_hf_endpoint(f"{slow.url},{fast.url}")
+    try:
+        with patch.dict(os.environ, {"ACME_RATE_LIMIT": "0"}):
+            assert hf_endpoint() == fast.url
+    finally:
+        configure_hf_endpoint(None)
+        for srv in (slow, fast):
+            srv.shutdown()
+            srv.server_close()
@@ -0,0 +1,202 @@
+"""
+Tests for the streaming read -> classify -> dedupe stages and the bounded scheduler.
+"""
+
+import itertools
+import json
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from acmecli import main as app
+from acmecli.main import ExecutorUnavailable, evaluate_bounded
+from acmecli.pipeline import Deduper, ModelUrls, ProblemLog, ReorderBuffer
+
+MODEL = "https://huggingface.co/org/m"
+
+
+def _collect():
+    seen = []
+
+    def on_outcome(u, rec, exc):
+        seen.append((u, rec["name"] if rec else None, exc))
+        return True
+
+    return seen, on_outcome
+
+
+def test_model_urls_classifies_lazily():
+    invalid = []
+    urls = iter([MODEL, "https://huggingface.co/datasets/squad", "https://github.com/a/b"])
+    models = ModelUrls(urls, lambda u, why: invalid.append(why))
+    stream = iter(models)
+    assert next(stream) == MODEL
+    assert (models.read, invalid) == (1, [])
+    assert list(stream) == []
+    assert (models.read, models.models) == (3, 1)
+    assert invalid == ["unsupported category: DATASET", "unsupported category: CODE"]
+
+
+def test_deduper_fans_out_in_flight_and_recent_repeats():
+    seen, on_outcome = _collect()
+    dedupe = Deduper(on_outcome, memory=1)
+    stream = dedupe.filter(iter([MODEL, f"{MODEL}/", "https://huggingface.co/org/x"]))
+    assert next(stream) == MODEL
+    assert next(stream) == "https://huggingface.co/org/x"  # the repeat waits on MODEL
+    dedupe.handle(MODEL, {"name": "m"}, None)
+    assert [u for u, _, _ in seen] == [MODEL, f"{MODEL}/"]
+
+    # Finished and remembered: answered without another evaluation
+    assert list(dedupe.filter([f"{MODEL}/tree/main"])) == []
+    assert seen[-1][:2] == (f"{MODEL}/tree/main", "m")
+
+    # memory=1: a newer model pushes MODEL out, so it is evaluated again
+    dedupe.handle("https://huggingface.co/org/x", {"name": "x"}, None)
+    assert list(dedupe.filter([MODEL])) == [MODEL]
+
+
+def test_deduper_stops_pulling_after_a_stop():
+    dedupe = Deduper(lambda u, rec, exc: False)
+    stream = dedupe.filter(itertools.repeat(MODEL))
+    assert next(stream) == MODEL
+    assert dedupe.handle(MODEL, None, RuntimeError("boom")) is False
+    assert list(stream) == []  # an endless source is not drained
+
+
+def test_evaluate_bounded_reads_no_further_than_its_window():
+    pulled = []
+
+    def source():
+        for i in itertools.count():
+            pulled.append(i)
+            yield f"https://huggingface.co/org/m{i}"
+
+    done = []
+
+    def on_outcome(u, rec, exc):
+        done.append(u)
+        return len(done) < 3
+
+    evaluate_bounded(source(), lambda u: {"name": u}, on_outcome, workers=2)
+    assert len(done) == 3
+    assert len(pulled) <= 3 + 4 * 2
+
+
+def test_evaluate_bounded_fails_before_taking_a_url_when_no_thread_starts():
+    pulled = []
+
+    def source():
+        pulled.append(1)
+        yield MODEL
+
+    with patch("threading.Thread.start", side_effect=RuntimeError("can't start new thread")):
+        with pytest.raises(ExecutorUnavailable):
+            evaluate_bounded(source(), lambda u: {"name": u}, lambda u, rec, exc: True)
+    assert pulled == []
+
+
+def test_evaluate_bounded_lets_outcome_errors_propagate():
+    def on_outcome(u, rec, exc):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        evaluate_bounded(iter([MODEL]), lambda u: {"name": u}, on_outcome, workers=1)
+
+
+def test_problem_log_keeps_a_bounded_sample(capsys):
+    log = ProblemLog(limit=2)
+    for i in range(5):
+        log.add(f"u{i}", "bad")
+    log.report("[error] header")
+    err = capsys.readouterr().err.splitlines()
+    assert (log.count, len(log.sample)) == (5, 2)
+    assert err[-1] == "  ... and 3 more"
+
+
+def test_reorder_buffer_releases_in_input_order_and_stalls_when_full():
+    seen, on_outcome = _collect()
+    reorder = ReorderBuffer(on_outcome, window=2)
+    stream = reorder.admit(iter(["a", "b", "c"]))
+    assert [next(stream), next(stream)] == ["a", "b"]
+    assert next(stream) is None  # window full until "a" is answered
+    reorder.deliver("b", {"name": "b"}, None)
+    assert seen == [] and next(stream) is None
+    reorder.deliver("a", {"name": "a"}, None)
+    assert [u for u, _, _ in seen] == ["a", "b"]
+    assert next(stream) == "c"
+
+
+def test_main_preserve_order_writes_input_order(tmp_path, monkeypatch, capsys):
+    names = [f"m{i}" for i in range(12)] + ["m3"]
+    p = tmp_path / "urls.txt"
+    p.write_text("".join(f"https://huggingface.co/org/{n}\n" for n in names))
+
+    def slow_first(url):
+        name = url.split("/")[-1]
+        time.sleep(0.05 if name in ("m0", "m5") else 0)
+        return {"name": name, "category": "MODEL", "net_score": 0.5}
+
+    monkeypatch.setattr(app, "process_model", slow_first)
+    monkeypatch.setattr(sys, "argv", ["prog", str(p), "--preserve-order", "--reorder-window", "4"])
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+    assert exc_info.value.code == 0
+    out = [json.loads(line)["name"] for line in capsys.readouterr().out.splitlines()]
+    assert out == names
+
+
+def _fake_model(url):
+    return {"name": url.split("/")[-1], "category": "MODEL", "net_score": 0.5}
+
+
+def test_main_falls_back_to_sequential_only_when_no_thread_starts(tmp_path, monkeypatch, capsys):
+    p = tmp_path / "urls.txt"
+    p.write_text("".join(f"https://huggingface.co/org/m{i}\n" for i in range(3)))
+    monkeypatch.setattr(app, "process_model", _fake_model)
+    monkeypatch.setattr(sys, "argv", ["prog", str(p)])
+
+    def unavailable(urls, work, on_outcome, workers=None):
+        raise ExecutorUnavailable("can't start new thread")
+
+    monkeypatch.setattr(app, "evaluate_bounded", unavailable)
+    with pytest.raises(SystemExit) as exc_info:
+        app.main()
+    assert exc_info.value.code == 0
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+    def broken(urls, work, on_outcome, workers=None):
+        next(iter(urls))
+        raise ValueError("pipeline bug")
+
+    monkeypatch.setattr(app, "evaluate_bounded", broken)
+    with pytest.raises(ValueError):
+        app.main()
+    assert capsys.readouterr().out == ""  # the rest is not rerun sequentially
+
+
+def test_preserve_order_keeps_invalid_urls_in_the_error_file_order(tmp_path, monkeypatch):
+    lines = [
+        "https://huggingface.co/org/gone",
+        "https://huggingface.co/datasets/squad",
+        "not a url",
+        "https://huggingface.co/org/ok",
+    ]
+    p = tmp_path / "urls.txt"
+    p.write_text("\n".join(lines) + "\n")
+    errors = tmp_path / "errors.jsonl"
+
+    def model(url):
+        if url.endswith("gone"):
+            time.sleep(0.05)  # answered after the invalid lines below it were read
+            raise app.ModelLookupError("org/gone", 404, "Not Found")
+        return _fake_model(url)
+
+    monkeypatch.setattr(app, "process_model", model)
+    argv = ["prog", str(p), "--preserve-order", "--error-file", str(errors)]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit):
+        app.main()
+    written = [json.loads(line)["url"] for line in errors.read_text().splitlines()]
+    assert written == lines[:3]
@@ -0,0 +1,125 @@
+"""
+Tests for the shared adaptive rate limiter and 429/Retry-After handling.
+"""
+
+import os
+import time
+from unittest.mock import Mock, patch
+
+from acmecli import ratelimit
+from acmecli.http_client import rate_limited
+from acmecli.ratelimit import AdaptiveLimiter, get_limiter, parse_retry_after
+
+
+def test_parse_retry_after_formats():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+
+
+def test_throttle_halves_window_and_rate_once_per_event():
+    lim = AdaptiveLimiter(rate=20, burst=20, max_inflight=16)
+    for _ in range(3):
+        assert lim.try_acquire() == 0.0
+    lim.release(429, retry_after=2.0)
+    lim.release(429, retry_after=2.0)  # same congestion event: no second halving
+    lim.release(503)
+
+    assert lim.window == 8.0
+    assert lim.rate == 10.0
+    assert lim.throttled == 3
+    assert lim.try_acquire() > 1.0  # every caller waits out Retry-After
+
+
+def test_healthy_responses_grow_back_to_ceiling():
+    lim = AdaptiveLimiter(rate=10, burst=10, max_inflight=4)
+    lim.window, lim.rate = 1.0, 1.0
+    for _ in range(200):
+        lim.inflight += 1
+        lim.release(200)
+    assert lim.window == 4.0
+    assert lim.rate == 10.0
+
+
+def test_unthrottled_host_is_not_limited():
+    lim = AdaptiveLimiter()
+    assert all(lim.try_acquire() == 0.0 for _ in range(500))
+    assert (lim.rate, lim.window) == (None, None)
+
+
+def test_throttle_limits_an_unbounded_host_until_it_recovers():
+    lim = AdaptiveLimiter()
+    for _ in range(40):
+        lim.try_acquire()
+    lim.release(429, retry_after=0.0)
+    assert lim.window == 20.0  # half of the 40 in flight
+    assert lim.rate is not None and lim.rate >= 20.0
+    for _ in range(1000):
+        lim.inflight += 1
+        lim.release(200)
+    assert (lim.rate, lim.window) == (None, None)
+
+
+def test_repeated_throttling_keeps_the_recovery_goal():
+    lim = AdaptiveLimiter()
+    for _ in range(40):
+        lim.try_acquire()
+    lim.release(429, retry_after=0.0)
+    first = lim.rate
+    # 40 sends within well under a second: far more than 40 req/s, not floored to 1s
+    assert first is not None and first > 20.0
+    goal = lim._rate_goal
+    lim._last_decrease -= 2.0  # a second congestion event, past the cooldown
+    lim.release(429, retry_after=0.0)
+    assert lim.rate == first / 2 and lim.window == 10.0
+    assert lim._rate_goal == goal
+    # The goal is still what the host did before the first cut, so it recovers fully
+    for _ in range(2000):
+        lim.inflight += 1
+        lim.release(200)
+    assert (lim.rate, lim.window) == (None, None)
+
+
+def test_window_caps_inflight_requests():
+    lim = AdaptiveLimiter(rate=100, burst=100, max_inflight=2)
+    assert lim.try_acquire() == 0.0
+    assert lim.try_acquire() == 0.0
+    assert lim.try_acquire() > 0.0
+    lim.release(200)
+    assert lim.try_acquire() == 0.0
+
+
+def test_get_limiter_only_for_hf_and_when_enabled():
+    ratelimit.reset_limiters()
+    assert get_limiter("https://api.github.com/user") is None
+    lim = get_limiter("https://huggingface.co/api/models/x")
+    assert lim is get_limiter("https://huggingface.co/org/m/raw/main/README.md")
+    with patch.dict(os.environ, {"ACME_RATE_LIMIT": "0"}):
+        assert get_limiter("https://huggingface.co/api/models/x") is None
+    ratelimit.reset_limiters()
+
+
+def test_rate_limited_resends_after_429():
+    ratelimit.reset_limiters()
+    throttled = Mock(status_code=429, headers={"Retry-After": "0.01"})
+    ok = Mock(status_code=200, headers={})
+    send = Mock(side_effect=[throttled, ok])
+
+    t0 = time.monotonic()
+    r = rate_limited("https://huggingface.co/api/models/x", send)
+
+    assert r is ok
+    assert send.call_count == 2
+    assert time.monotonic() - t0 >= 0.01
+    ratelimit.reset_limiters()
+
+
+def test_rate_limited_gives_up_after_configured_retries():
+    ratelimit.reset_limiters()
+    send = Mock(return_value=Mock(status_code=429, headers={"Retry-After": "0"}))
+    with patch.dict(os.environ, {"ACME_RATE_RETRIES": "1"}):
+        r = rate_limited("https://huggingface.co/api/models/x", send)
+    assert r.status_code == 429
+    assert send.call_count == 2
+    ratelimit.reset_limiters()
@@ -0,0 +1,102 @@
+"""
+Tests for offline record/replay of HTTP traffic (--record / --replay).
+"""
+
+import asyncio
+import os
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from acmecli import http_client, replay
+from acmecli.endpoints import served_scope
+from acmecli.metrics.hf_api import fetch_model_info
+from acmecli.replay import ReplayMiss, configure_tape
+
+URL = "https://huggingface.co/api/models/org/m?blobs=true"
+
+
+@pytest.fixture(autouse=True)
+def no_tape():
+    yield
+    configure_tape()
+
+
+def _response(status, body, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.reason = "OK" if status == 200 else "Not Found"
+    r._content = body.encode("utf-8")
+    r.headers.update(headers or {})
+    r.elapsed = timedelta(milliseconds=42)
+    return r
+
+
+def test_recorded_get_replays_offline(tmp_path):
+    session = Mock()
+    session.get.return_value = _response(
+        200, '{"id": "org/m"}', {"Link": '<https://next/2>; rel="next"'}
+    )
+    configure_tape(record=str(tmp_path))
+    with patch.object(http_client, "get_session", return_value=session):
+        live = http_client.http_get(URL, headers={"Authorization": "Bearer hf_x"})
+
+    configure_tape(replay=str(tmp_path))
+    with patch.object(http_client, "get_session") as offline, served_scope() as served:
+        again = http_client.http_get(URL)  # credentials are not part of the key
+    offline.assert_not_called()
+    assert served == ["replay"]
+    assert (again.status_code, again.json(), again.links) == (
+        live.status_code,
+        live.json(),
+        live.links,
+    )
+    assert again.elapsed == timedelta(milliseconds=42)
+    assert replay.get_tape().stats["replayed"] == 1
+
+
+def test_replay_miss_is_a_network_error(tmp_path):
+    configure_tape(replay=str(tmp_path))
+    with pytest.raises(ReplayMiss) as miss:
+        http_client.http_get(URL)
+    assert isinstance(miss.value, requests.ConnectionError)
+    with pytest.raises(RuntimeError, match="network error"):
+        fetch_model_info("org/m")
+
+
+def test_posts_are_keyed_by_json_body(tmp_path):
+    session = Mock()
+    session.post.side_effect = [_response(200, "a"), _response(200, "b")]
+    configure_tape(record=str(tmp_path))
+    with patch.object(http_client, "get_session", return_value=session):
+        http_client.http_post("https://llm/v1", json={"prompt": "a"})
+        http_client.http_post("https://llm/v1", json={"prompt": "b"})
+
+    configure_tape(replay=str(tmp_path))
+    assert http_client.http_post("https://llm/v1", json={"prompt": "b"}).text == "b"
+    with pytest.raises(ReplayMiss):
+        http_client.http_post("https://llm/v1", json={"prompt": "c"})
+
+
+def test_thread_recording_replays_on_the_async_path(tmp_path):
+    from acmecli.metrics.hf_api_async import afetch_model_info
+
+    session = Mock()
+    session.get.return_value = _response(200, '{"id": "org/m", "downloads": 7}')
+    configure_tape(record=str(tmp_path))
+    with patch.object(http_client, "get_session", return_value=session):
+        fetch_model_info("org/m")
+
+    configure_tape(replay=str(tmp_path))
+    info, ms = asyncio.run(afetch_model_info(None, "org/m"))
+    assert (info["downloads"], ms) == (7, 42)
+
+
+def test_configure_tape_validates_directories(tmp_path):
+    with pytest.raises(ValueError):
+        configure_tape(record=str(tmp_path), replay=str(tmp_path))
+    with pytest.raises(ValueError):
+        configure_tape(replay=os.path.join(str(tmp_path), "missing"))
+    assert configure_tape() is None
@@ -0,0 +1,107 @@
+"""
+Tests for the GET retry policy (backoff, per-model deadline, run-wide budget).
+"""
+
+import asyncio
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from acmecli import retry
+from acmecli.metrics.hf_api import fetch_model_info
+from acmecli.retry import RetryBudget, acall_with_retries, call_with_retries, model_scope
+
+URL = "https://example.org/api/thing"
+
+
+@pytest.fixture(autouse=True)
+def fast_retries():
+    env = {"ACME_RETRY_BASE_MS": "0", "ACME_RATE_LIMIT": "0"}
+    with patch.dict(os.environ, env):
+        retry.reset_budget()
+        yield
+    retry.reset_budget()
+
+
+def _status(code):
+    return code
+
+
+def test_retries_5xx_then_succeeds_and_counts_per_model():
+    send = Mock(side_effect=[502, 503, 200])
+    with model_scope() as stats:
+        assert call_with_retries(URL, send, _status, requests.ConnectionError) == 200
+    assert stats.as_record() == {"requests": 3, "retries": 2, "gave_up": 0}
+    assert retry.run_summary()["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    send = Mock(return_value=404)
+    assert call_with_retries(URL, send, _status, requests.ConnectionError) == 404
+    assert send.call_count == 1
+
+
+def test_exception_reraised_after_max_attempts():
+    send = Mock(side_effect=requests.ConnectionError("reset"))
+    with patch.dict(os.environ, {"ACME_RETRY_ATTEMPTS": "2"}), model_scope() as stats:
+        with pytest.raises(requests.ConnectionError):
+            call_with_retries(URL, send, _status, requests.ConnectionError)
+    assert send.call_count == 3
+    assert stats.as_record()["gave_up"] == 1
+
+
+def test_failure_counts_as_gave_up_with_retrying_disabled():
+    send = Mock(return_value=503)
+    with patch.dict(os.environ, {"ACME_RETRY_ATTEMPTS": "0"}), model_scope() as stats:
+        assert call_with_retries(URL, send, _status, requests.ConnectionError) == 503
+    assert stats.as_record() == {"requests": 1, "retries": 0, "gave_up": 1}
+    assert retry.run_summary()["gave_up"] == 1
+
+
+def test_deadline_stops_retrying():
+    send = Mock(return_value=500)
+    env = {"ACME_MODEL_DEADLINE_S": "0.05", "ACME_RETRY_BASE_MS": "1000"}
+    with patch.dict(os.environ, env), patch.object(retry._rng, "uniform", return_value=1.0):
+        with model_scope():
+            assert call_with_retries(URL, send, _status, requests.ConnectionError) == 500
+    assert send.call_count == 1
+
+
+def test_run_wide_budget_caps_retries():
+    budget = RetryBudget(ratio=0.0, minimum=1)
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+    assert budget.denied == 1
+
+    with patch.dict(os.environ, {"ACME_RETRY_BUDGET": "0", "ACME_RETRY_BUDGET_MIN": "1"}):
+        retry.reset_budget()
+        send = Mock(return_value=503)
+        call_with_retries(URL, send, _status, requests.ConnectionError)
+        assert send.call_count == 2
+        assert retry.run_summary()["budget_denied"] == 1
+
+
+def test_async_retry_matches_sync_policy():
+    codes = iter([500, 200])
+
+    async def send():
+        return next(codes)
+
+    async def run():
+        with model_scope() as stats:
+            result = await acall_with_retries(URL, send, _status, OSError)
+        return result, stats.as_record()
+
+    assert asyncio.run(run()) == (200, {"requests": 2, "retries": 1, "gave_up": 0})
+
+
+def test_fetch_model_info_survives_connection_reset():
+    ok = Mock(status_code=200, headers={})
+    ok.json.return_value = {"id": "org/m"}
+    session = Mock()
+    session.get.side_effect = [requests.ConnectionError("reset by peer"), ok]
+    with patch("acmecli.http_client.get_session", return_value=session):
+        assert fetch_model_info("org/m") == {"id": "org/m"}
+    assert session.get.call_count == 2
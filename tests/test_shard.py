@@ -0,0 +1,63 @@
+"""
+Tests for --shard: stable selection, exact coverage and seq tags.
+"""
+
+import json
+import sys
+
+import pytest
+
+from acmecli import main as app
+from acmecli.shard import Shard, parse_shard, shard_of
+
+
+def test_parse_shard():
+    assert parse_shard("3/8") == (3, 8)
+    for bad in ("8/8", "-1/4", "1", "a/b", "0/0"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_cover_the_input_exactly_once_and_keep_revisions_together():
+    urls = [f"https://huggingface.co/org/model-{i}" for i in range(200)] + ["not a url"]
+    picked = [u for i in range(4) for u in Shard(i, 4).select(urls)]
+    assert sorted(picked) == sorted(urls)
+    # Stable across processes: a fixed value, not Python's salted hash()
+    assert shard_of("https://huggingface.co/org/model-0", 1000) == shard_of(
+        "https://huggingface.co/org/model-0/tree/v2", 1000
+    )
+
+
+def test_shard_tags_carry_input_positions():
+    shard = Shard(0, 1)
+    urls = [
+        "https://huggingface.co/a/x",
+        "https://huggingface.co/a/y",
+        "https://huggingface.co/a/x",
+    ]
+    assert list(shard.select(urls)) == urls
+    assert shard.tag(urls[1]) == {"shard": "0/1", "seq": 1}
+    assert [shard.tag(urls[0])["seq"], shard.tag(urls[0])["seq"]] == [0, 2]
+
+
+def test_sharded_runs_split_records_and_errors(tmp_path, monkeypatch):
+    urls = tmp_path / "urls.txt"
+    lines = [f"https://huggingface.co/org/m{i}" for i in range(12)]
+    lines.insert(5, "https://github.com/org/repo")
+    urls.write_text("\n".join(lines) + "\n")
+    monkeypatch.setattr(
+        app, "process_model", lambda u: {"name": u.rsplit("/", 1)[-1], "net_score": 0.5}
+    )
+    seqs = []
+    for i in range(3):
+        out, err = tmp_path / f"s{i}.jsonl", tmp_path / f"e{i}.jsonl"
+        argv = ["prog", str(urls), "--ndjson", str(out), "--error-file", str(err)]
+        monkeypatch.setattr(sys, "argv", argv + ["--shard", f"{i}/3"])
+        with pytest.raises(SystemExit):
+            app.main()
+        for path in (out, err):
+            for line in path.read_text().splitlines() if path.exists() else []:
+                rec = json.loads(line)
+                assert rec["shard"] == f"{i}/3"
+                seqs.append(rec["seq"])
+    assert sorted(seqs) == list(range(len(lines)))
@@ -0,0 +1,102 @@
+"""
+Tests for singleflight request coalescing (thread and asyncio groups).
+"""
+
+import asyncio
+import threading
+import time
+
+from acmecli.singleflight import AsyncGroup, Group
+
+
+def _run_concurrently(group, fn, n=5):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(group.do("k", fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    group = Group()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"id": "org/m"}
+
+    results, errors = _run_concurrently(group, slow)
+    assert not errors and len(results) == 5
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert group.coalesced == 4
+
+
+def test_exception_reaches_every_caller_and_nothing_is_cached():
+    group = Group()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    results, errors = _run_concurrently(group, failing, n=3)
+    assert not results and len(errors) == 3
+    assert len(calls) == 1
+    assert group.do("k", lambda: "fresh") == "fresh"
+
+
+def test_async_group_coalesces_and_survives_cancelled_awaiter():
+    group = AsyncGroup()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "readme"
+
+    async def run():
+        first = asyncio.ensure_future(group.do("k", fetch))
+        others = [asyncio.ensure_future(group.do("k", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(run()) == ["readme"] * 3
+    assert len(calls) == 1
+
+
+def test_hf_fetches_coalesce_across_threads():
+    from acmecli.metrics import hf_api
+
+    calls = []
+
+    def info(model_id, token=None, revision="main"):
+        calls.append(model_id)
+        time.sleep(0.2)
+        return {"downloads": 1}
+
+    out = []
+    threads = [
+        threading.Thread(
+            target=lambda: out.append(hf_api._timed_fetch(info, "info", "org/m", None))
+        )
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert len(out) == 4 and all(o == out[0] for o in out)
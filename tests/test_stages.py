@@ -0,0 +1,77 @@
+"""
+Tests for the staged executor (separate hf / llm / cpu pools).
+"""
+
+import contextvars
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from acmecli import stages
+from acmecli.stages import configure_stages, get_stage, model_workers, run_in, submit_to
+
+
+@pytest.fixture(autouse=True)
+def fresh_stages():
+    configure_stages()
+    yield
+    configure_stages()
+
+
+def test_sizes_come_from_flags_then_env_then_defaults():
+    with patch.dict(os.environ, {"ACME_HF_WORKERS": "7", "ACME_CPU_WORKERS": "3"}):
+        configure_stages(llm=2)
+        assert [get_stage(n).workers for n in stages.STAGES] == [7, 2, 3]
+        assert model_workers() == 12
+        configure_stages(hf=5, models=9)
+        assert (get_stage("hf").workers, model_workers()) == (5, 9)
+
+
+def test_steps_run_on_their_stage_with_the_callers_context():
+    var = contextvars.ContextVar("var", default="unset")
+    var.set("model-a")
+    name, seen = run_in("cpu", lambda: (threading.current_thread().name, var.get()))
+    assert name.startswith("acme-cpu_") and seen == "model-a"
+    # Nested use of a one-thread stage runs inline instead of deadlocking
+    configure_stages(cpu=1)
+    assert run_in("cpu", run_in, "cpu", lambda: 42) == 42
+
+
+def test_a_stalled_llm_stage_does_not_hold_up_hf():
+    configure_stages(llm=1, hf=1)
+    release = threading.Event()
+    stuck = submit_to("llm", release.wait, 5)
+    queued = submit_to("llm", lambda: "llm")
+    try:
+        assert run_in("hf", lambda: "fetched") == "fetched"
+        assert not queued.done()
+        assert get_stage("llm").summary()["queued_peak"] >= 1
+    finally:
+        release.set()
+    assert stuck.result() is True and queued.result() == "llm"
+
+
+def test_context_build_uses_the_hf_and_cpu_stages():
+    from acmecli.metrics import hf_api
+
+    threads = {}
+
+    def fake_info(model_id, token=None, revision="main"):
+        threads["info"] = threading.current_thread().name
+        return {"id": model_id, "sha": "a" * 40, "siblings": []}
+
+    real_context = hf_api.context_from_fetches
+
+    def spy_context(*args, **kwargs):
+        threads["context"] = threading.current_thread().name
+        return real_context(*args, **kwargs)
+
+    with patch.object(hf_api, "fetch_model_info", fake_info), patch.object(
+        hf_api, "context_from_fetches", spy_context
+    ):
+        ctx = hf_api.build_context_from_api("https://huggingface.co/org/m")
+    assert ctx["sha"] == "a" * 40
+    assert threads["info"].startswith("acme-hf_")
+    assert threads["context"].startswith("acme-cpu_")